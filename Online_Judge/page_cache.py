@@ -0,0 +1,90 @@
+"""
+Caching of public, read-mostly pages.
+
+Anonymous visitors (most of the traffic when a contest is announced) get whole
+pages from the cache: views decorated with ``cache_anonymous_page`` store
+their response per URL under a namespace. Logged-in users always get a fresh
+page, but the parts that are the same for everyone are template fragments
+({% cache %}): problem statements, the problem list filters and the contest
+lists.
+
+Namespaces are versioned, and ``invalidate`` bumps the version, which orphans
+every page and fragment cached under it. Receivers in problems.models and
+contests.models invalidate on every save and delete of problems, categories,
+test cases and contests, so edits made in the admin site or on the staff pages
+show up at once. Anything else, such as a contest starting, only changes once
+the entry times out (PAGE_CACHE_TIMEOUT).
+"""
+import hashlib
+import time
+from functools import wraps
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.db import transaction
+
+
+def page_cache_timeout():
+    return getattr(settings, 'PAGE_CACHE_TIMEOUT', 120)
+
+
+def statement_cache_timeout():
+    return getattr(settings, 'STATEMENT_CACHE_TIMEOUT', 86400)
+
+
+def namespace_version(namespace):
+    """Current version of ``namespace``, part of every key cached under it"""
+    key = f'page_cache_version:{namespace}'
+    version = cache.get(key)
+    if version is None:
+        # A timestamp, so a version lost to eviction never brings back old entries
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def invalidate(*namespaces):
+    """Drop everything cached under ``namespaces`` once the current transaction commits"""
+    def bump():
+        for namespace in namespaces:
+            cache.set(f'page_cache_version:{namespace}', time.time_ns(), None)
+
+    transaction.on_commit(bump)
+
+
+def forget_fragment(fragment_name, *vary_on):
+    """Drop a {% cache %} fragment once the current transaction commits"""
+    key = make_template_fragment_key(fragment_name, vary_on)
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+def cache_anonymous_page(namespace, timeout=None):
+    """Serve anonymous GET requests of the view from the cache
+
+    ``timeout`` (seconds, or a callable returning them) can only shorten
+    PAGE_CACHE_TIMEOUT. Only plain 200 responses are stored: nothing that sets
+    a cookie, uses the CSRF token or shows a flash message.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            limit = page_cache_timeout()
+            if limit <= 0 or request.method != 'GET' or request.user.is_authenticated or get_messages(request):
+                return view(request, *args, **kwargs)
+
+            url = hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+            key = f'page_cache:{namespace}:{namespace_version(namespace)}:{url}'
+            response = cache.get(key)
+            if response is not None:
+                return response
+
+            response = view(request, *args, **kwargs)
+            if (response.status_code == 200 and not response.streaming and not response.cookies
+                    and not request.META.get('CSRF_COOKIE_NEEDS_UPDATE')):
+                seconds = min(limit, timeout() if callable(timeout) else timeout or limit)
+                if seconds > 0:
+                    cache.set(key, response, seconds)
+            return response
+        return wrapper
+    return decorator
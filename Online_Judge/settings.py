@@ -153,6 +153,33 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Test case input/output files, keyed by content hash (must be shared by web and judge workers)
+TEST_DATA_ROOT = BASE_DIR / 'test_data'
+TEST_DATA_SWEEP_GRACE_MINUTES = 60  # unreferenced files younger than this are kept by sweep_test_data
+
+# Cache shared by the web and judge processes: Redis when REDIS_URL is set
+# (needs the redis package), otherwise files under CACHE_DIR
+REDIS_URL = config('REDIS_URL', default='')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': config('CACHE_DIR', default=str(BASE_DIR / 'cache')),
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        }
+    }
+
+# Public pages (Online_Judge.page_cache)
+PAGE_CACHE_TIMEOUT = 120  # seconds anonymous pages and list fragments are cached (0 disables)
+STATEMENT_CACHE_TIMEOUT = 86400  # seconds a rendered problem statement is kept (dropped on edit)
+
 # Login URLs
 LOGIN_URL = 'accounts:login'
 LOGIN_REDIRECT_URL = '/'
@@ -162,14 +189,28 @@ LOGOUT_REDIRECT_URL = '/'
 JUDGE_TEMP_DIR = BASE_DIR / 'temp'
 JUDGE_TIME_LIMIT = 2  # seconds
 JUDGE_MEMORY_LIMIT = 128  # MB
-
-# Manual queue processing
-ENABLE_MANUAL_QUEUE = True
+JUDGE_PARALLEL_TESTS = config('JUDGE_PARALLEL_TESTS', default=1, cast=int)  # test cases run at once per submission (1 = sequential)
+JUDGE_COMPILE_CACHE_SIZE = 256  # MB of compiled binaries kept under JUDGE_TEMP_DIR (0 disables)
+JUDGE_OUTPUT_LIMIT = 64  # MB of output per test case before Output Limit Exceeded
+JUDGE_TEST_SET_CACHE_SIZE = 64  # problems whose test sets each judge worker keeps cached (0 disables)
+JUDGE_PYTHON_FORK_SERVER = False  # True runs Python solutions in a forked, pre-started interpreter instead of exec'ing a fresh one
+JUDGE_CGROUP_ROOT = config('JUDGE_CGROUP_ROOT', default='') or None  # delegated cgroup v2 dir for memory limits (unset = RLIMIT_AS)
+JUDGE_MAX_IN_FLIGHT_PER_USER = 2  # submissions of one user judged at once, rejudges excepted (0 = no cap)
+JUDGE_CUSTOM_RUN_OUTPUT_LIMIT = 64  # KB of stdout/stderr returned by "Run code"
+JUDGE_CUSTOM_RUN_INPUT_LIMIT = 64  # KB of stdin accepted by the playground
+JUDGE_CUSTOM_RUN_RATE_LIMIT = 10  # test and playground runs per user per minute (0 = unlimited)
+JUDGE_CUSTOM_RUN_CONCURRENCY = config('JUDGE_CUSTOM_RUN_CONCURRENCY', default=4, cast=int)  # test and playground runs at once, site-wide; keep below the web worker count (0 = unlimited)
 
 # Compilation settings
 JUDGE_COMPILATION_TIMEOUT = 10  # seconds
 JUDGE_EXECUTION_TIMEOUT = 3  # seconds per test case
 
+# Notifications (verdicts, announcements, messages) pushed via communications:poll_notifications
+NOTIFICATION_LONG_POLL_TIMEOUT = config('NOTIFICATION_LONG_POLL_TIMEOUT', default=0, cast=int)  # seconds a poll waits; 0 (plain polling) for WSGI, e.g. 25 under ASGI
+NOTIFICATION_POLL_INTERVAL = 5  # seconds between client polls when long-polling is off
+NOTIFICATION_WAIT_INTERVAL = 1  # seconds between checks while a poll waits
+NOTIFICATION_RETENTION_DAYS = 2  # prune_notifications deletes older ones
+
 # Security settings for production
 if not DEBUG and 'PYTHONANYWHERE_DOMAIN' not in os.environ:
     SECURE_BROWSER_XSS_FILTER = True
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import UserProfile
+from .models import SolvedCountRank, UserProfile
 
 
 @admin.register(UserProfile)
@@ -7,4 +7,10 @@ class UserProfileAdmin(admin.ModelAdmin):
     list_display = ['user', 'solved_problems', 'total_submissions', 'get_success_rate', 'created_at']
     list_filter = ['created_at']
     search_fields = ['user__username', 'user__email']
-    readonly_fields = ['created_at']
\ No newline at end of file
+    readonly_fields = ['created_at']
+
+
+@admin.register(SolvedCountRank)
+class SolvedCountRankAdmin(admin.ModelAdmin):
+    list_display = ['rank', 'solved_problems', 'users']
+    readonly_fields = ['rank', 'solved_problems', 'users']
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from django.contrib.auth.models import User
+from accounts.stats import rebuild_user_stats
+
+
+class Command(BaseCommand):
+    help = 'Recompute the submission counters of user profiles from submission history'
+
+    def add_arguments(self, parser):
+        parser.add_argument('usernames', nargs='*', help='Users to rebuild (default: all)')
+
+    def handle(self, *args, **options):
+        user_ids = None
+        if options['usernames']:
+            user_ids = list(User.objects.filter(username__in=options['usernames']).values_list('id', flat=True))
+
+        changed = rebuild_user_stats(user_ids)
+        self.stdout.write(self.style.SUCCESS(f'Updated {changed} profiles.'))
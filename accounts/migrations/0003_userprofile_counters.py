@@ -0,0 +1,85 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:24
+
+from django.db import migrations, models
+
+
+def count_submissions(apps, schema_editor):
+    from accounts.stats import STAT_FIELDS, stats_by_user
+
+    Submission = apps.get_model('submissions', 'Submission')
+    UserProfile = apps.get_model('accounts', 'UserProfile')
+
+    stats = stats_by_user(Submission.objects.all())
+    empty = dict.fromkeys(STAT_FIELDS, 0)
+    profiles = list(UserProfile.objects.all())
+    for profile in profiles:
+        for field, value in stats.get(profile.user_id, empty).items():
+            setattr(profile, field, value)
+    UserProfile.objects.bulk_update(profiles, STAT_FIELDS, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_add_preferred_language'),
+        ('submissions', '0003_userproblemstatus'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='ac_submissions',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='c_submissions',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='ce_submissions',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='cpp_submissions',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='mle_submissions',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='ole_submissions',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='pe_submissions',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='python_submissions',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='re_submissions',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='tle_submissions',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='wa_submissions',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(count_submissions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:25
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def build_ranks(apps, schema_editor):
+    UserProfile = apps.get_model('accounts', 'UserProfile')
+    SolvedCountRank = apps.get_model('accounts', 'SolvedCountRank')
+
+    counts = UserProfile.objects.filter(user__is_staff=False, user__is_superuser=False).order_by().values(
+        'solved_problems'
+    ).annotate(users=Count('id'))
+    rows = []
+    above = 0
+    for row in sorted(counts, key=lambda row: -row['solved_problems']):
+        rows.append(SolvedCountRank(solved_problems=row['solved_problems'], users=row['users'], rank=above + 1))
+        above += row['users']
+    SolvedCountRank.objects.bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_userprofile_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SolvedCountRank',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('solved_problems', models.IntegerField(unique=True)),
+                ('users', models.IntegerField(default=0)),
+                ('rank', models.IntegerField()),
+            ],
+            options={
+                'ordering': ['-solved_problems'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=models.Index(fields=['-solved_problems', 'id'], name='accounts_us_solved__d0d415_idx'),
+        ),
+        migrations.RunPython(build_ranks, migrations.RunPython.noop),
+    ]
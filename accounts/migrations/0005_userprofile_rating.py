@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_solvedcountrank'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='rating',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+    ]
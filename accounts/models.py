@@ -1,10 +1,11 @@
 from django.db import models
 from django.contrib.auth.models import User
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 import random
 from django.utils import timezone
 from datetime import timedelta
+from judge.signals import submission_judged
 
 
 class UserProfile(models.Model):
@@ -15,8 +16,22 @@ class UserProfile(models.Model):
     ]
     
     user = models.OneToOneField(User, on_delete=models.CASCADE)
+    # Submission counters, maintained by accounts.stats (judged submissions, test runs excluded)
     solved_problems = models.IntegerField(default=0)
     total_submissions = models.IntegerField(default=0)
+    ac_submissions = models.IntegerField(default=0)
+    wa_submissions = models.IntegerField(default=0)
+    ce_submissions = models.IntegerField(default=0)
+    re_submissions = models.IntegerField(default=0)
+    tle_submissions = models.IntegerField(default=0)
+    mle_submissions = models.IntegerField(default=0)
+    ole_submissions = models.IntegerField(default=0)
+    pe_submissions = models.IntegerField(default=0)
+    c_submissions = models.IntegerField(default=0)
+    cpp_submissions = models.IntegerField(default=0)
+    python_submissions = models.IntegerField(default=0)
+    # Latest contest rating, maintained by contests.rating (None until the first rated contest)
+    rating = models.IntegerField(null=True, blank=True)
     bio = models.TextField(max_length=500, blank=True)
     preferred_language = models.CharField(max_length=10, choices=LANGUAGE_CHOICES, default='c')
     created_at = models.DateTimeField(auto_now_add=True)
@@ -24,6 +39,7 @@ class UserProfile(models.Model):
     class Meta:
         indexes = [
             models.Index(fields=['solved_problems']),            # Ranking queries
+            models.Index(fields=['-solved_problems', 'id']),     # Ranklist pages
             models.Index(fields=['total_submissions']),          # Stats queries
         ]
     
@@ -31,47 +47,47 @@ class UserProfile(models.Model):
         return f"{self.user.username}'s Profile"
     
     def get_success_rate(self):
-        from submissions.models import Submission
-        
-        # Count unique problems solved (AC)
-        solved_problems = Submission.objects.filter(
-            user=self.user,
-            verdict='AC',
-            is_test=False
-        ).values('problem').distinct().count()
-        
-        # Count wrong answer submissions
-        wrong_answers = Submission.objects.filter(
-            user=self.user,
-            verdict='WA',
-            is_test=False
-        ).count()
-        
-        total_attempts = solved_problems + wrong_answers
+        total_attempts = self.solved_problems + self.wa_submissions
         
         if total_attempts == 0:
             return 0
         
-        return round((solved_problems / total_attempts) * 100, 2)
+        return round((self.solved_problems / total_attempts) * 100, 2)
     
-    def update_stats(self):
-        """Update solved_problems and total_submissions based on actual submissions"""
-        from submissions.models import Submission
-        
-        # Update solved problems count (unique problems with AC)
-        self.solved_problems = Submission.objects.filter(
-            user=self.user,
-            verdict='AC',
-            is_test=False
-        ).values('problem').distinct().count()
+    def get_acceptance_rate(self):
+        """Share of judged submissions that were accepted"""
+        if self.total_submissions == 0:
+            return 0
+        return round((self.ac_submissions / self.total_submissions) * 100, 1)
+    
+    @property
+    def rank(self):
+        """Global rank by solved problems (None for staff)"""
+        from .ranking import rank_of
         
-        # Update total submissions count (exclude test submissions)
-        self.total_submissions = Submission.objects.filter(
-            user=self.user,
-            is_test=False
-        ).count()
+        if self.user.is_staff or self.user.is_superuser:
+            return None
+        return rank_of(self.solved_problems)
+    
+    def update_stats(self):
+        """Recompute the submission counters from this user's submissions"""
+        from .stats import rebuild_user_stats
         
-        self.save()
+        rebuild_user_stats([self.user_id])
+        self.refresh_from_db()
+
+
+class SolvedCountRank(models.Model):
+    """Rank shared by all ranked users with a given solve count, maintained by accounts.ranking"""
+    solved_problems = models.IntegerField(unique=True)
+    users = models.IntegerField(default=0)
+    rank = models.IntegerField()
+    
+    class Meta:
+        ordering = ['-solved_problems']
+    
+    def __str__(self):
+        return f"#{self.rank}: {self.users} users with {self.solved_problems} solved"
 
 
 @receiver(post_save, sender=User)
@@ -95,6 +111,30 @@ def save_user_profile(sender, instance, **kwargs):
         logger.error(f"Error saving user profile for {instance.username}: {e}")
 
 
+@receiver(submission_judged)
+def count_judged_submission(sender, submission, first_judgement, **kwargs):
+    from .stats import record_judgement
+    record_judgement(submission, first_judgement)
+
+
+@receiver(post_save, sender=UserProfile)
+def rank_new_profile(sender, instance, created, **kwargs):
+    if created and not (instance.user.is_staff or instance.user.is_superuser):
+        from .ranking import add_user
+        add_user(instance.solved_problems)
+
+
+@receiver(post_delete, sender=UserProfile)
+def unrank_deleted_profile(sender, instance, **kwargs):
+    try:
+        user = instance.user
+    except User.DoesNotExist:
+        user = None
+    if user is None or not (user.is_staff or user.is_superuser):
+        from .ranking import remove_user
+        remove_user(instance.solved_problems)
+
+
 class OTPVerification(models.Model):
     email = models.EmailField()
     otp = models.CharField(max_length=6)
@@ -0,0 +1,151 @@
+"""
+Global ranklist by number of solved problems.
+
+Users with the same solve count share a rank (1 + users who solved more), so
+ranks are stored per solve count in SolvedCountRank rather than per user: a
+user's rank is one indexed lookup by their solved_problems, and when someone's
+solve count changes only the rows for the counts they passed are updated,
+however many users share them. There are at most as many rows as problems.
+
+Staff users are not ranked. ``rebuild_ranks`` recomputes the table from
+UserProfile (run by rebuild_user_stats), e.g. after users were made staff.
+"""
+from django.db import transaction
+from django.db.models import Count, F, Sum
+
+
+def ranked_profiles():
+    from .models import UserProfile
+
+    return UserProfile.objects.filter(user__is_staff=False, user__is_superuser=False)
+
+
+def _users_above(solved_problems):
+    from .models import SolvedCountRank
+
+    return SolvedCountRank.objects.filter(solved_problems__gt=solved_problems).aggregate(
+        users=Sum('users')
+    )['users'] or 0
+
+
+def move_user(old_solved, new_solved):
+    """Account for one ranked user whose solve count went from ``old_solved`` to ``new_solved``"""
+    from .models import SolvedCountRank
+
+    if old_solved == new_solved:
+        return
+    with transaction.atomic():
+        # Locks the rows whose ranks change, serializing concurrent moves
+        list(SolvedCountRank.objects.select_for_update().filter(
+            solved_problems__gte=min(old_solved, new_solved),
+            solved_problems__lte=max(old_solved, new_solved),
+        ).values_list('id'))
+        if not SolvedCountRank.objects.filter(solved_problems=new_solved).exists():
+            SolvedCountRank.objects.get_or_create(
+                solved_problems=new_solved,
+                defaults={'users': 0, 'rank': _users_above(new_solved) + 1},
+            )
+
+        # Counts in [old, new) now have one more user above them; in [new, old) one fewer
+        if new_solved > old_solved:
+            SolvedCountRank.objects.filter(
+                solved_problems__gte=old_solved, solved_problems__lt=new_solved
+            ).update(rank=F('rank') + 1)
+        else:
+            SolvedCountRank.objects.filter(
+                solved_problems__gte=new_solved, solved_problems__lt=old_solved
+            ).update(rank=F('rank') - 1)
+        SolvedCountRank.objects.filter(solved_problems=old_solved).update(users=F('users') - 1)
+        SolvedCountRank.objects.filter(solved_problems=new_solved).update(users=F('users') + 1)
+
+
+def add_user(solved_problems=0):
+    """Account for a newly ranked user"""
+    from .models import SolvedCountRank
+
+    with transaction.atomic():
+        row, _ = SolvedCountRank.objects.select_for_update().get_or_create(
+            solved_problems=solved_problems,
+            defaults={'users': 0, 'rank': _users_above(solved_problems) + 1},
+        )
+        SolvedCountRank.objects.filter(id=row.id).update(users=F('users') + 1)
+        SolvedCountRank.objects.filter(solved_problems__lt=solved_problems).update(rank=F('rank') + 1)
+
+
+def remove_user(solved_problems):
+    """Account for a ranked user who is gone"""
+    from .models import SolvedCountRank
+
+    with transaction.atomic():
+        SolvedCountRank.objects.filter(solved_problems=solved_problems).update(users=F('users') - 1)
+        SolvedCountRank.objects.filter(solved_problems__lt=solved_problems).update(rank=F('rank') - 1)
+
+
+def rebuild_ranks():
+    """Recompute SolvedCountRank from the solve counts of all ranked users"""
+    from .models import SolvedCountRank
+
+    counts = ranked_profiles().order_by().values('solved_problems').annotate(users=Count('id'))
+    rows = []
+    above = 0
+    for row in sorted(counts, key=lambda row: -row['solved_problems']):
+        rows.append(SolvedCountRank(solved_problems=row['solved_problems'], users=row['users'], rank=above + 1))
+        above += row['users']
+    with transaction.atomic():
+        SolvedCountRank.objects.all().delete()
+        SolvedCountRank.objects.bulk_create(rows)
+
+
+def rank_of(solved_problems):
+    """Rank shared by users with this solve count (None if nobody is ranked there)"""
+    from .models import SolvedCountRank
+
+    return SolvedCountRank.objects.filter(
+        solved_problems=solved_problems, users__gt=0
+    ).values_list('rank', flat=True).first()
+
+
+def ranked_user_count():
+    from .models import SolvedCountRank
+
+    return SolvedCountRank.objects.aggregate(users=Sum('users'))['users'] or 0
+
+
+class Ranklist:
+    """Ranked profiles, best first, sliceable for Paginator without counting or skipping rows
+
+    A slice starts reading at the first user of the solve count that contains
+    its start position (found from SolvedCountRank), so deep pages do not scan
+    every user above them. Each profile gets a ``global_rank`` attribute.
+    """
+
+    def count(self):
+        return ranked_user_count()
+
+    def __getitem__(self, index):
+        from .models import SolvedCountRank
+
+        if not isinstance(index, slice) or index.start is None or index.stop is None:
+            raise TypeError('Ranklist only supports bounded slices')
+        start, stop = index.start, index.stop
+        if stop <= start:
+            return []
+
+        # Rank r means r - 1 users above, so the first user of a solve count is at position rank - 1
+        first = SolvedCountRank.objects.filter(rank__lte=start + 1, users__gt=0).order_by(
+            'rank', '-solved_problems'
+        ).last()
+        if first is None:
+            return []
+        ranks = dict(SolvedCountRank.objects.filter(
+            solved_problems__lte=first.solved_problems
+        ).values_list('solved_problems', 'rank'))
+
+        skip = start - (first.rank - 1)
+        profiles = list(
+            ranked_profiles().filter(solved_problems__lte=first.solved_problems)
+            .select_related('user').order_by('-solved_problems', 'id')[skip:skip + stop - start]
+        )
+        for profile in profiles:
+            profile.global_rank = ranks.get(profile.solved_problems)
+        return profiles
@@ -0,0 +1,120 @@
+"""
+Submission counters on UserProfile.
+
+Profile pages used to run several COUNT/DISTINCT queries over the whole
+Submission table on every view. The counters are now stored on UserProfile
+and bumped with F() expressions when a submission is judged for the first time
+(judge.signals.submission_judged), in the same transaction as the verdict.
+A judged-again submission recomputes its user's counters instead, since its
+previous verdict is gone by then. ``rebuild_user_stats`` recomputes everything
+from history (see the rebuild_user_stats command). Test runs never count.
+Changes to solved_problems are passed on to the ranklist (accounts.ranking).
+"""
+from django.db.models import Count, F, Q
+from .ranking import move_user, ranked_profiles, rebuild_ranks
+
+VERDICT_COUNTERS = {
+    'AC': 'ac_submissions',
+    'WA': 'wa_submissions',
+    'CE': 'ce_submissions',
+    'RE': 're_submissions',
+    'TLE': 'tle_submissions',
+    'MLE': 'mle_submissions',
+    'OLE': 'ole_submissions',
+    'PE': 'pe_submissions',
+}
+LANGUAGE_COUNTERS = {
+    'c': 'c_submissions',
+    'cpp': 'cpp_submissions',
+    'python': 'python_submissions',
+}
+STAT_FIELDS = ['solved_problems', 'total_submissions'] + list(VERDICT_COUNTERS.values()) + list(LANGUAGE_COUNTERS.values())
+
+
+def record_judgement(submission, first_judgement):
+    """Count a judged submission on its user's profile"""
+    from submissions.models import Submission
+    from .models import UserProfile
+
+    if submission.is_test:
+        return
+    if not first_judgement:
+        # Bulk rejudges recount their users once they finish (submissions.rejudge)
+        if submission.rejudge_id is None:
+            rebuild_user_stats([submission.user_id])
+        return
+
+    # The row lock serializes concurrent verdicts of the same user, so the
+    # first-solve check below sees an AC committed meanwhile (Django runs
+    # MySQL at READ COMMITTED)
+    if UserProfile.objects.select_for_update().filter(user_id=submission.user_id).first() is None:
+        return
+
+    updates = {'total_submissions': F('total_submissions') + 1}
+    for field in (VERDICT_COUNTERS.get(submission.verdict), LANGUAGE_COUNTERS.get(submission.language)):
+        if field:
+            updates[field] = F(field) + 1
+    newly_solved = False
+    if submission.verdict == 'AC':
+        newly_solved = not Submission.objects.filter(
+            user_id=submission.user_id, problem_id=submission.problem_id, verdict='AC', is_test=False
+        ).exclude(id=submission.id).exists()
+        if newly_solved:
+            updates['solved_problems'] = F('solved_problems') + 1
+    UserProfile.objects.filter(user_id=submission.user_id).update(**updates)
+
+    if newly_solved:
+        # Reads our own increment: the profile row stays locked until the verdict commits
+        solved = ranked_profiles().filter(user_id=submission.user_id).values_list('solved_problems', flat=True).first()
+        if solved is not None:
+            move_user(solved - 1, solved)
+
+
+def stats_by_user(submissions):
+    """{user_id: {field: value}} for STAT_FIELDS, counted from a Submission queryset"""
+    judged = list(VERDICT_COUNTERS)
+    annotations = {
+        'solved_problems': Count('problem', distinct=True, filter=Q(verdict='AC')),
+        'total_submissions': Count('id', filter=Q(verdict__in=judged)),
+    }
+    for verdict, field in VERDICT_COUNTERS.items():
+        annotations[field] = Count('id', filter=Q(verdict=verdict))
+    for language, field in LANGUAGE_COUNTERS.items():
+        annotations[field] = Count('id', filter=Q(language=language, verdict__in=judged))
+
+    rows = submissions.filter(is_test=False).order_by().values('user_id').annotate(**annotations)
+    return {row.pop('user_id'): row for row in rows}
+
+
+def rebuild_user_stats(user_ids=None):
+    """Recompute the counters of the given users (all users if None) from their submissions"""
+    from submissions.models import Submission
+    from .models import UserProfile
+
+    submissions = Submission.objects.all()
+    profiles = UserProfile.objects.all()
+    if user_ids is not None:
+        submissions = submissions.filter(user_id__in=user_ids)
+        profiles = profiles.filter(user_id__in=user_ids)
+    stats = stats_by_user(submissions)
+
+    empty = dict.fromkeys(STAT_FIELDS, 0)
+    changed = []
+    moves = []
+    ranked = set(ranked_profiles().filter(id__in=profiles.values('id')).values_list('id', flat=True))
+    for profile in profiles.only('id', 'user_id', *STAT_FIELDS).iterator():
+        values = stats.get(profile.user_id, empty)
+        if any(getattr(profile, field) != values[field] for field in STAT_FIELDS):
+            if profile.id in ranked and profile.solved_problems != values['solved_problems']:
+                moves.append((profile.solved_problems, values['solved_problems']))
+            for field in STAT_FIELDS:
+                setattr(profile, field, values[field])
+            changed.append(profile)
+    UserProfile.objects.bulk_update(changed, STAT_FIELDS, batch_size=500)
+
+    if user_ids is None:
+        rebuild_ranks()
+    else:
+        for old_solved, new_solved in moves:
+            move_user(old_solved, new_solved)
+    return len(changed)
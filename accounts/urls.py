@@ -11,5 +11,7 @@ urlpatterns = [
     path('profile/', views.profile, name='profile'),
     path('profile/edit/', views.edit_profile, name='edit_profile'),
     path('user/<str:username>/', views.user_profile, name='user_profile'),
+    path('ranklist/', views.ranklist, name='ranklist'),
+    path('api/my-rank/', views.my_rank_api, name='my_rank_api'),
     path('update-language/', views.update_language_preference, name='update_language'),
 ]
\ No newline at end of file
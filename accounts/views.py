@@ -5,7 +5,7 @@ from django.contrib import messages
 from django.contrib.auth.views import LoginView
 from django.utils._os import safe_join
 from .forms import CustomUserCreationForm, UserProfileForm, UserUpdateForm
-from submissions.models import Submission
+from submissions.models import UserProblemStatus
 from .models import OTPVerification
 from django.core.mail import send_mail
 from django.conf import settings
@@ -71,21 +71,6 @@ def register(request):
 
 @login_required
 def profile(request):
-    # Get solved problems (exclude test submissions)
-    solved_problem_ids = Submission.objects.filter(
-        user=request.user,
-        verdict='AC',
-        is_test=False
-    ).values_list('problem', flat=True).distinct()
-
-    from problems.models import Problem
-    solved_problems = Problem.objects.filter(id__in=solved_problem_ids).select_related('category').prefetch_related('contestproblem_set__contest')[:10]
-    solved_problems_count = solved_problem_ids.count()
-
-    # Calculate stats (exclude test submissions)
-    total_submissions = Submission.objects.filter(user=request.user, is_test=False).count()
-    accepted_submissions = Submission.objects.filter(user=request.user, verdict='AC', is_test=False).count()
-
     # Update user profile with proper error handling
     try:
         profile = request.user.userprofile
@@ -97,15 +82,22 @@ def profile(request):
         from .models import UserProfile
         profile = UserProfile.objects.get_or_create(user=request.user)[0]
 
-    profile.solved_problems = solved_problems_count
-    profile.total_submissions = total_submissions
-    profile.save()
+    # Latest solved problems, from the per-problem status table
+    from problems.models import Problem
+    solved_problem_ids = UserProblemStatus.objects.filter(
+        user=request.user,
+        best_verdict='AC'
+    ).order_by('-first_ac_at').values_list('problem_id', flat=True)[:10]
+    solved_problems = Problem.objects.filter(id__in=list(solved_problem_ids)).select_related('category').prefetch_related('contestproblem_set__contest')
 
+    # Counters are maintained by accounts.stats when submissions are judged
     stats = {
-        'total_submissions': total_submissions,
-        'accepted_submissions': accepted_submissions,
-        'solved_problems': solved_problems_count,
+        'total_submissions': profile.total_submissions,
+        'accepted_submissions': profile.ac_submissions,
+        'solved_problems': profile.solved_problems,
         'success_rate': profile.get_success_rate(),
+        'rank': profile.rank,
+        'rating': profile.rating,
     }
 
     # Add admin statistics if user is staff
@@ -211,6 +203,7 @@ def logout_view(request):
 def user_profile(request, username):
     from django.shortcuts import get_object_or_404
     from django.contrib.auth.models import User
+    from contests.models import RatingChange
     from .models import UserProfile
 
     # Validate username to prevent path traversal
@@ -224,25 +217,57 @@ def user_profile(request, username):
     except UserProfile.DoesNotExist:
         profile = UserProfile.objects.create(user=user)
 
-    # Get user's submission stats (exclude test submissions)
-    total_submissions = Submission.objects.filter(user=user, is_test=False).count()
-    accepted_submissions = Submission.objects.filter(user=user, verdict='AC', is_test=False).count()
-
-    success_rate = 0
-    if total_submissions > 0:
-        success_rate = round((accepted_submissions / total_submissions) * 100, 1)
-
+    # Counters are maintained by accounts.stats when submissions are judged
     context = {
         'profile_user': user,
         'profile': profile,
-        'total_submissions': total_submissions,
-        'accepted_submissions': accepted_submissions,
-        'success_rate': success_rate,
+        'total_submissions': profile.total_submissions,
+        'accepted_submissions': profile.ac_submissions,
+        'success_rate': profile.get_acceptance_rate(),
+        'rank': profile.rank,
+        'rating_history': RatingChange.objects.filter(
+            user=user, contest__is_rated=True
+        ).select_related('contest').order_by('-contest__end_time', '-contest_id')[:10],
     }
 
     return render(request, 'accounts/user_profile.html', context)
 
 
+def ranklist(request):
+    """Global ranklist of non-staff users by problems solved"""
+    from django.core.paginator import Paginator
+    from .ranking import Ranklist
+
+    paginator = Paginator(Ranklist(), 50)
+    page_obj = paginator.get_page(request.GET.get('page'))
+
+    my_rank = None
+    if request.user.is_authenticated:
+        try:
+            my_rank = request.user.userprofile.rank
+        except Exception:
+            pass
+
+    return render(request, 'accounts/ranklist.html', {
+        'page_obj': page_obj,
+        'my_rank': my_rank,
+    })
+
+
+@login_required
+def my_rank_api(request):
+    """Current user's global rank as JSON"""
+    from .models import UserProfile
+    from .ranking import ranked_user_count
+
+    profile, _ = UserProfile.objects.get_or_create(user=request.user)
+    return JsonResponse({
+        'rank': profile.rank,
+        'solved_problems': profile.solved_problems,
+        'ranked_users': ranked_user_count(),
+    })
+
+
 @login_required
 @csrf_exempt
 def update_language_preference(request):
@@ -0,0 +1,17 @@
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from communications.notifications import prune_notifications
+
+
+class Command(BaseCommand):
+    help = 'Delete delivered notifications older than NOTIFICATION_RETENTION_DAYS'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=float, default=getattr(settings, 'NOTIFICATION_RETENTION_DAYS', 2),
+                            help='Keep notifications newer than this many days')
+
+    def handle(self, *args, **options):
+        deleted = prune_notifications(timezone.now() - timedelta(days=options['days']))
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} notifications.'))
@@ -1,6 +1,10 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.db.models.signals import post_save
+from django.dispatch import receiver
 from django.utils import timezone
+from judge.signals import submission_judged
+from .notifications import broadcast, notify
 
 
 class Conversation(models.Model):
@@ -34,4 +38,61 @@ class Message(models.Model):
         ordering = ['-created_at']
     
     def __str__(self):
-        return f"{self.sender.username}: {self.content[:50]}"
\ No newline at end of file
+        return f"{self.sender.username}: {self.content[:50]}"
+
+
+class Notification(models.Model):
+    """An event pushed to a user's open pages; see communications.notifications"""
+    KIND_CHOICES = [
+        ('verdict', 'Verdict'),
+        ('announcement', 'Contest announcement'),
+        ('message', 'Message'),
+    ]
+    
+    user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True,
+                             help_text="Empty for notifications sent to everyone")
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    data = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'id']),                 # Cursor reads
+            models.Index(fields=['created_at']),                 # Pruning
+        ]
+    
+    def __str__(self):
+        return f"{self.kind} for {self.user.username if self.user else 'everyone'}"
+
+
+@receiver(submission_judged)
+def notify_verdict(sender, submission, **kwargs):
+    # A bulk rejudge would flood the users of a popular problem; its verdicts show in the submission lists
+    if submission.rejudge_id:
+        return
+    notify(
+        submission.user, 'verdict',
+        submission_id=submission.id,
+        verdict=submission.verdict,
+        problem_title=submission.problem.title,
+        is_test=submission.is_test,
+    )
+
+
+@receiver(post_save, sender=Message)
+def notify_message(sender, instance, created, **kwargs):
+    if created:
+        for user in instance.conversation.participants.exclude(id=instance.sender_id):
+            notify(user, 'message', conversation_id=instance.conversation_id, sender=instance.sender.username)
+
+
+@receiver(post_save, sender='contests.ContestAnnouncement')
+def notify_announcement(sender, instance, created, **kwargs):
+    if created:
+        broadcast(
+            'announcement',
+            id=instance.id,
+            title=instance.title,
+            message=instance.message,
+            contest=instance.contest.title,
+        )
@@ -0,0 +1,81 @@
+"""
+One notification channel for verdicts, contest announcements and chat messages.
+
+Every event is a Notification row; its id doubles as a cursor. A page keeps a
+single request open against ``poll_notifications`` with the last id it has
+seen, and the request returns as soon as something newer exists for the user
+(or after NOTIFICATION_LONG_POLL_TIMEOUT seconds with nothing). This replaces
+the separate 3-10 second polls of submission status, unread messages and
+announcements, which mostly answered "no change". Notifications are written
+after the transaction that caused them commits, so ids become visible nearly in
+order; pages waiting for a verdict still re-check it now and then in case one
+was skipped.
+
+Waiting checks one indexed query every NOTIFICATION_WAIT_INTERVAL seconds in
+an async view, so it works across processes (the judge daemon writes verdict
+notifications) without a message broker. Under WSGI a waiting request holds a
+worker, so NOTIFICATION_LONG_POLL_TIMEOUT defaults to 0: clients then poll the
+same endpoint every NOTIFICATION_POLL_INTERVAL seconds. ASGI deployments opt
+in to long-polling by setting it (e.g. to 25).
+"""
+import asyncio
+import time
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+
+MAX_NOTIFICATIONS = 50
+
+
+def notify(user, kind, **data):
+    """Queue a notification for one user once the current transaction commits"""
+    _create_on_commit(user, kind, data)
+
+
+def broadcast(kind, **data):
+    """Queue a notification for every user once the current transaction commits"""
+    _create_on_commit(None, kind, data)
+
+
+def _create_on_commit(user, kind, data):
+    from .models import Notification
+
+    # Inserted in its own short transaction: one held open (e.g. by the judge's other
+    # verdict receivers) would commit its id late, after polls had moved past it
+    transaction.on_commit(lambda: Notification.objects.create(user=user, kind=kind, data=data))
+
+
+def latest_notification_id():
+    from .models import Notification
+
+    return Notification.objects.order_by('-id').values_list('id', flat=True).first() or 0
+
+
+def notifications_after(user, cursor):
+    """Notifications of ``user`` (and broadcasts) with an id above ``cursor``, oldest first"""
+    from .models import Notification
+
+    return list(
+        Notification.objects.filter(Q(user=user) | Q(user__isnull=True), id__gt=cursor)
+        .order_by('id')[:MAX_NOTIFICATIONS]
+    )
+
+
+async def wait_for_notifications(user, cursor, timeout):
+    """Notifications after ``cursor``, waiting up to ``timeout`` seconds for the first one"""
+    interval = getattr(settings, 'NOTIFICATION_WAIT_INTERVAL', 1)
+    deadline = time.monotonic() + timeout
+    while True:
+        notifications = await sync_to_async(notifications_after)(user, cursor)
+        if notifications or time.monotonic() >= deadline:
+            return notifications
+        await asyncio.sleep(min(interval, max(0, deadline - time.monotonic())))
+
+
+def prune_notifications(older_than):
+    """Delete notifications created before ``older_than``; returns how many"""
+    from .models import Notification
+
+    deleted, _ = Notification.objects.filter(created_at__lt=older_than).delete()
+    return deleted
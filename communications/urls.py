@@ -7,6 +7,7 @@ urlpatterns = [
     path('', views.chat_list, name='chat_list'),
     path('send/', views.send_message, name='send_message'),
     path('check-unread/', views.check_unread_messages, name='check_unread_messages'),
+    path('notifications/poll/', views.poll_notifications, name='poll_notifications'),
     path('admin/', views.admin_messages, name='admin_messages'),
     path('admin/chat/<int:conversation_id>/', views.admin_chat_detail, name='admin_chat_detail'),
     path('admin/chat-data/<int:conversation_id>/', views.admin_chat_data, name='admin_chat_data'),
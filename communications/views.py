@@ -1,3 +1,4 @@
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User
@@ -272,4 +273,40 @@ def clear_messages(request):
             conv.hidden_for.add(request.user)
         messages.success(request, 'All messages cleared successfully!')
         return redirect('communications:chat_list')
-    return redirect('communications:chat_list')
\ No newline at end of file
+    return redirect('communications:chat_list')
+
+def _authenticated_user(request):
+    return request.user if request.user.is_authenticated else None
+
+
+async def poll_notifications(request):
+    """Long-poll for notifications newer than ``cursor`` (omit it to get the current cursor)"""
+    from django.conf import settings
+    from .notifications import latest_notification_id, wait_for_notifications
+    
+    user = await sync_to_async(_authenticated_user)(request)
+    if user is None:
+        return JsonResponse({'error': 'Login required'}, status=401)
+    
+    timeout = getattr(settings, 'NOTIFICATION_LONG_POLL_TIMEOUT', 0)
+    # Tells the client how long to wait before the next poll when this one did not block
+    retry_after = 0 if timeout > 0 else getattr(settings, 'NOTIFICATION_POLL_INTERVAL', 5)
+    
+    try:
+        cursor = int(request.GET['cursor'])
+    except (KeyError, ValueError):
+        cursor = await sync_to_async(latest_notification_id)()
+        return JsonResponse({'cursor': cursor, 'notifications': [], 'retry_after': 0})
+    
+    notifications = await wait_for_notifications(user, cursor, timeout)
+    if notifications:
+        cursor = notifications[-1].id
+    
+    return JsonResponse({
+        'cursor': cursor,
+        'notifications': [
+            {'id': notification.id, 'kind': notification.kind, **notification.data}
+            for notification in notifications
+        ],
+        'retry_after': retry_after,
+    })
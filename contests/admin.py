@@ -1,13 +1,26 @@
 from django.contrib import admin
-from .models import Contest, ContestProblem, ContestParticipation, ContestAnnouncement
+from .models import Contest, ContestProblem, ContestParticipation, ContestAnnouncement, RatingChange, ScoreboardEntry
 
 
 @admin.register(Contest)
 class ContestAdmin(admin.ModelAdmin):
-    list_display = ['title', 'start_time', 'end_time', 'status', 'created_by']
-    list_filter = ['start_time', 'end_time', 'created_by']
+    list_display = ['title', 'start_time', 'end_time', 'freeze_time', 'status', 'is_rated', 'rated_at', 'created_by']
+    list_filter = ['start_time', 'end_time', 'is_rated', 'created_by']
     search_fields = ['title', 'description']
     prepopulated_fields = {'slug': ('title',)}
+    readonly_fields = ['rated_at']
+    actions = ['rerate_contests']
+    
+    @admin.action(description='Re-rate selected contests (and every later rated contest)')
+    def rerate_contests(self, request, queryset):
+        from .rating import ratable_contests, update_ratings
+        
+        first = ratable_contests().filter(id__in=queryset.values('id')).first()
+        if first is None:
+            self.message_user(request, 'None of the selected contests is rated and ended.', level='warning')
+            return
+        rated = update_ratings(first)
+        self.message_user(request, f'Rated {len(rated)} contest(s).')
 
 
 @admin.register(ContestProblem)
@@ -18,12 +31,28 @@ class ContestProblemAdmin(admin.ModelAdmin):
 
 @admin.register(ContestParticipation)
 class ContestParticipationAdmin(admin.ModelAdmin):
-    list_display = ['contest', 'user', 'total_score', 'problems_solved', 'start_time']
+    list_display = ['contest', 'user', 'problems_solved', 'total_penalty', 'start_time']
+    readonly_fields = ['problems_solved', 'total_penalty']
     list_filter = ['contest', 'start_time']
 
 
+@admin.register(ScoreboardEntry)
+class ScoreboardEntryAdmin(admin.ModelAdmin):
+    list_display = ['contest', 'user', 'problem', 'attempts', 'first_ac_at', 'penalty']
+    list_filter = ['contest']
+    readonly_fields = ['contest', 'user', 'problem', 'attempts', 'first_ac_at', 'penalty']
+
+
 @admin.register(ContestAnnouncement)
 class ContestAnnouncementAdmin(admin.ModelAdmin):
     list_display = ['contest', 'title', 'created_by', 'created_at']
     list_filter = ['contest', 'created_at']
-    search_fields = ['title', 'message']
\ No newline at end of file
+    search_fields = ['title', 'message']
+
+
+@admin.register(RatingChange)
+class RatingChangeAdmin(admin.ModelAdmin):
+    list_display = ['contest', 'user', 'rank', 'old_rating', 'new_rating', 'delta']
+    list_filter = ['contest']
+    search_fields = ['user__username']
+    readonly_fields = ['contest', 'user', 'rank', 'old_rating', 'new_rating']
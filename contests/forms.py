@@ -7,15 +7,26 @@ from problems.models import Problem
 class ContestForm(forms.ModelForm):
     class Meta:
         model = Contest
-        fields = ['title', 'description', 'rules', 'start_time', 'end_time']
+        fields = ['title', 'description', 'rules', 'start_time', 'end_time', 'freeze_time']
         widgets = {
             'title': forms.TextInput(attrs={'class': 'input input-bordered w-full'}),
             'description': forms.Textarea(attrs={'class': 'textarea textarea-bordered w-full', 'rows': 4}),
             'rules': forms.Textarea(attrs={'class': 'textarea textarea-bordered w-full', 'rows': 4}),
             'start_time': forms.DateTimeInput(attrs={'class': 'input input-bordered w-full', 'type': 'datetime-local'}),
             'end_time': forms.DateTimeInput(attrs={'class': 'input input-bordered w-full', 'type': 'datetime-local'}),
+            'freeze_time': forms.DateTimeInput(attrs={'class': 'input input-bordered w-full', 'type': 'datetime-local'}),
         }
     
+    def clean(self):
+        cleaned_data = super().clean()
+        start_time = cleaned_data.get('start_time')
+        end_time = cleaned_data.get('end_time')
+        freeze_time = cleaned_data.get('freeze_time')
+        
+        if freeze_time and start_time and end_time and not start_time <= freeze_time <= end_time:
+            self.add_error('freeze_time', 'Freeze time must be between the contest start and end.')
+        return cleaned_data
+    
     def save(self, commit=True):
         instance = super().save(commit=False)
         
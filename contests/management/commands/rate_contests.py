@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+from contests.models import Contest
+from contests.rating import ratable_contests, update_ratings
+
+
+class Command(BaseCommand):
+    help = 'Compute ratings for rated contests that have ended (run after contests end, e.g. from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='from_slug', help='Re-rate this contest and every later one (e.g. after a rejudge)')
+        parser.add_argument('--all', action='store_true', help='Re-rate every ended rated contest')
+
+    def handle(self, *args, **options):
+        from_contest = None
+        if options['all']:
+            from_contest = ratable_contests().first()
+            if from_contest is None:
+                self.stdout.write('No ended rated contests.')
+                return
+        elif options['from_slug']:
+            try:
+                from_contest = Contest.objects.get(slug=options['from_slug'])
+            except Contest.DoesNotExist:
+                raise CommandError(f"Contest '{options['from_slug']}' does not exist")
+            if not ratable_contests().filter(id=from_contest.id).exists():
+                raise CommandError(f"{from_contest.title} is not rated or has not ended")
+
+        for contest in update_ratings(from_contest):
+            self.stdout.write(f'Rated {contest.title} ({contest.rating_changes.count()} participants)')
+
+        self.stdout.write(self.style.SUCCESS('Done.'))
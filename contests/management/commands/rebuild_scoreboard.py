@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from contests.models import Contest
+from contests.scoreboard import rebuild_contest
+
+
+class Command(BaseCommand):
+    help = 'Recompute contest scoreboards from submissions'
+
+    def add_arguments(self, parser):
+        parser.add_argument('slugs', nargs='*', help='Contests to rebuild (default: all)')
+
+    def handle(self, *args, **options):
+        contests = Contest.objects.all()
+        if options['slugs']:
+            contests = contests.filter(slug__in=options['slugs'])
+
+        for contest in contests.order_by('start_time'):
+            rebuild_contest(contest)
+            self.stdout.write(f'Rebuilt scoreboard of {contest.title}')
+
+        self.stdout.write(self.style.SUCCESS('Done.'))
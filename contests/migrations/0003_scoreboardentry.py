@@ -0,0 +1,93 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:17
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from itertools import groupby
+
+
+def build_scoreboards(apps, schema_editor):
+    from contests.scoreboard import score_problem
+
+    Contest = apps.get_model('contests', 'Contest')
+    ContestProblem = apps.get_model('contests', 'ContestProblem')
+    ContestParticipation = apps.get_model('contests', 'ContestParticipation')
+    ScoreboardEntry = apps.get_model('contests', 'ScoreboardEntry')
+    Submission = apps.get_model('submissions', 'Submission')
+
+    for contest in Contest.objects.iterator():
+        submissions = Submission.objects.filter(
+            problem_id__in=ContestProblem.objects.filter(contest=contest).values('problem_id'),
+            user_id__in=ContestParticipation.objects.filter(contest=contest).values('user_id'),
+            submitted_at__gte=contest.start_time,
+            submitted_at__lte=contest.end_time,
+            is_test=False,
+        ).order_by('user_id', 'problem_id', 'submitted_at', 'id').values_list(
+            'user_id', 'problem_id', 'verdict', 'submitted_at'
+        )
+        entries = []
+        totals = {}
+        for (user_id, problem_id), rows in groupby(submissions, key=lambda row: row[:2]):
+            attempts, first_ac_at, penalty = score_problem(contest, (row[2:] for row in rows))
+            entries.append(ScoreboardEntry(
+                contest=contest, user_id=user_id, problem_id=problem_id,
+                attempts=attempts, first_ac_at=first_ac_at, penalty=penalty,
+            ))
+            solved, total_penalty = totals.get(user_id, (0, 0))
+            totals[user_id] = (solved + (first_ac_at is not None), total_penalty + penalty)
+        ScoreboardEntry.objects.bulk_create(entries, batch_size=500)
+        for user_id, (solved, total_penalty) in totals.items():
+            ContestParticipation.objects.filter(contest=contest, user_id=user_id).update(
+                problems_solved=solved, total_penalty=total_penalty,
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('problems', '0005_problem_test_data_version'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('contests', '0002_contestannouncement'),
+        ('submissions', '0002_alter_submission_verdict'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScoreboardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('attempts', models.IntegerField(default=0, help_text='Wrong attempts before the first AC')),
+                ('first_ac_at', models.DateTimeField(blank=True, null=True)),
+                ('penalty', models.IntegerField(default=0, help_text='Penalty minutes (0 until solved)')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='contestparticipation',
+            name='total_penalty',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='contestparticipation',
+            index=models.Index(fields=['contest', '-problems_solved', 'total_penalty'], name='contests_co_contest_842a5e_idx'),
+        ),
+        migrations.AddField(
+            model_name='scoreboardentry',
+            name='contest',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='scoreboard_entries', to='contests.contest'),
+        ),
+        migrations.AddField(
+            model_name='scoreboardentry',
+            name='problem',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='problems.problem'),
+        ),
+        migrations.AddField(
+            model_name='scoreboardentry',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterUniqueTogether(
+            name='scoreboardentry',
+            unique_together={('contest', 'user', 'problem')},
+        ),
+        migrations.RunPython(build_scoreboards, migrations.RunPython.noop),
+    ]
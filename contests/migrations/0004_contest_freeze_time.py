@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:19
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contests', '0003_scoreboardentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contest',
+            name='freeze_time',
+            field=models.DateTimeField(blank=True, help_text='The public leaderboard stops updating from this time until the contest ends', null=True),
+        ),
+        migrations.CreateModel(
+            name='ScoreboardSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('freeze_time', models.DateTimeField()),
+                ('standings', models.JSONField(help_text='[username, problems solved, penalty] rows, best first')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('contest', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='scoreboard_snapshot', to='contests.contest')),
+            ],
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:29
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('contests', '0004_contest_freeze_time'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contest',
+            name='is_rated',
+            field=models.BooleanField(default=True, help_text="Update participants' ratings once the contest has ended"),
+        ),
+        migrations.AddField(
+            model_name='contest',
+            name='rated_at',
+            field=models.DateTimeField(blank=True, editable=False, help_text='When ratings were last computed (contests.rating)', null=True),
+        ),
+        migrations.CreateModel(
+            name='RatingChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.IntegerField()),
+                ('old_rating', models.IntegerField()),
+                ('new_rating', models.IntegerField()),
+                ('contest', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rating_changes', to='contests.contest')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rating_changes', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('contest', 'user')},
+            },
+        ),
+    ]
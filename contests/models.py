@@ -1,7 +1,10 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
 from problems.models import Problem
 from django.utils import timezone
+from judge.signals import submission_judged
 
 
 class Contest(models.Model):
@@ -17,10 +20,15 @@ class Contest(models.Model):
     rules = models.TextField(blank=True, help_text="Contest rules and guidelines")
     start_time = models.DateTimeField()
     end_time = models.DateTimeField()
+    freeze_time = models.DateTimeField(null=True, blank=True,
+                                       help_text="The public leaderboard stops updating from this time until the contest ends")
     duration = models.IntegerField(help_text="Duration in minutes")
     problems = models.ManyToManyField(Problem, through='ContestProblem')
     created_by = models.ForeignKey(User, on_delete=models.CASCADE)
     is_active = models.BooleanField(default=True)
+    is_rated = models.BooleanField(default=True, help_text="Update participants' ratings once the contest has ended")
+    rated_at = models.DateTimeField(null=True, blank=True, editable=False,
+                                    help_text="When ratings were last computed (contests.rating)")
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
@@ -34,6 +42,15 @@ class Contest(models.Model):
     def __str__(self):
         return self.title
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Compared on save to tell whether the scoreboard must be rebuilt
+        instance._loaded_window = (
+            instance.__dict__.get('start_time'), instance.__dict__.get('end_time'), instance.__dict__.get('freeze_time')
+        )
+        return instance
+    
     @property
     def status(self):
         now = timezone.now()
@@ -44,6 +61,11 @@ class Contest(models.Model):
         else:
             return 'ended'
     
+    @property
+    def is_frozen(self):
+        """Whether the public leaderboard currently shows the frozen snapshot"""
+        return self.freeze_time is not None and self.freeze_time <= timezone.now() <= self.end_time
+    
     def can_participate(self, user):
         return self.status == 'running' and user.is_authenticated
 
@@ -68,12 +90,14 @@ class ContestParticipation(models.Model):
     start_time = models.DateTimeField(auto_now_add=True)
     total_score = models.IntegerField(default=0)
     problems_solved = models.IntegerField(default=0)
+    total_penalty = models.IntegerField(default=0)
     is_banned = models.BooleanField(default=False)
     
     class Meta:
         unique_together = ['contest', 'user']
         indexes = [
             models.Index(fields=['contest', '-total_score']),    # Leaderboard
+            models.Index(fields=['contest', '-problems_solved', 'total_penalty']),  # ICPC leaderboard
             models.Index(fields=['user']),                       # User contests
         ]
     
@@ -84,6 +108,52 @@ class ContestParticipation(models.Model):
         super().save(*args, **kwargs)
 
 
+class ScoreboardEntry(models.Model):
+    """Score of one participant on one contest problem, maintained by contests.scoreboard"""
+    contest = models.ForeignKey(Contest, on_delete=models.CASCADE, related_name='scoreboard_entries')
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    problem = models.ForeignKey(Problem, on_delete=models.CASCADE)
+    attempts = models.IntegerField(default=0, help_text="Wrong attempts before the first AC")
+    first_ac_at = models.DateTimeField(null=True, blank=True)
+    penalty = models.IntegerField(default=0, help_text="Penalty minutes (0 until solved)")
+    
+    class Meta:
+        unique_together = ['contest', 'user', 'problem']
+    
+    def __str__(self):
+        return f"{self.contest.title}: {self.user.username} - {self.problem.title}"
+
+
+class ScoreboardSnapshot(models.Model):
+    """Public standings of a contest at its freeze time, computed once (see contests.scoreboard)"""
+    contest = models.OneToOneField(Contest, on_delete=models.CASCADE, related_name='scoreboard_snapshot')
+    freeze_time = models.DateTimeField()
+    standings = models.JSONField(help_text="[username, problems solved, penalty] rows, best first")
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self):
+        return f"{self.contest.title} frozen at {self.freeze_time}"
+
+
+class RatingChange(models.Model):
+    """A participant's rating before and after a rated contest, written by contests.rating"""
+    contest = models.ForeignKey(Contest, on_delete=models.CASCADE, related_name='rating_changes')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='rating_changes')
+    rank = models.IntegerField()
+    old_rating = models.IntegerField()
+    new_rating = models.IntegerField()
+    
+    class Meta:
+        unique_together = ['contest', 'user']
+    
+    def __str__(self):
+        return f"{self.user.username} in {self.contest.title}: {self.old_rating} -> {self.new_rating}"
+    
+    @property
+    def delta(self):
+        return self.new_rating - self.old_rating
+
+
 class ContestAnnouncement(models.Model):
     contest = models.ForeignKey(Contest, on_delete=models.CASCADE, related_name='announcements')
     title = models.CharField(max_length=200)
@@ -95,4 +165,56 @@ class ContestAnnouncement(models.Model):
         ordering = ['-created_at']
     
     def __str__(self):
-        return f"{self.contest.title}: {self.title}"
\ No newline at end of file
+        return f"{self.contest.title}: {self.title}"
+
+
+@receiver(submission_judged)
+def update_scoreboards_on_verdict(sender, submission, **kwargs):
+    from .scoreboard import update_submission_scoreboards
+    update_submission_scoreboards(submission)
+
+
+@receiver(post_save, sender=ContestParticipation)
+def score_new_participant(sender, instance, created, **kwargs):
+    # Submissions made before joining still count, as they did before
+    if created:
+        from .scoreboard import update_participant
+        update_participant(instance.contest, instance.user_id)
+
+
+@receiver(post_save, sender=ContestProblem)
+@receiver(post_delete, sender=ContestProblem)
+def rebuild_scoreboard_on_problem_change(sender, instance, **kwargs):
+    # After commit, so a cascading contest delete is not raced with new entries
+    contest_id = instance.contest_id
+
+    def rebuild():
+        from .scoreboard import rebuild_contest
+        contest = Contest.objects.filter(id=contest_id).first()
+        if contest is not None:
+            rebuild_contest(contest)
+
+    transaction.on_commit(rebuild)
+
+
+@receiver(post_save, sender=Contest)
+def rebuild_scoreboard_on_contest_change(sender, instance, created, **kwargs):
+    # The start and end time decide which submissions count and their penalty
+    window = (instance.start_time, instance.end_time, instance.freeze_time)
+    loaded_window = getattr(instance, '_loaded_window', None)
+    if not created and window != loaded_window:
+        from .scoreboard import rebuild_contest, discard_snapshot
+        if loaded_window is None or window[:2] != loaded_window[:2]:
+            rebuild_contest(instance)
+        else:
+            discard_snapshot(instance)
+    instance._loaded_window = window
+
+
+@receiver(post_save, sender=Contest)
+@receiver(post_delete, sender=Contest)
+@receiver(post_save, sender=ContestProblem)
+@receiver(post_delete, sender=ContestProblem)
+def invalidate_contest_pages(sender, instance, **kwargs):
+    from Online_Judge.page_cache import invalidate
+    invalidate('contests')
@@ -0,0 +1,144 @@
+"""
+Contest ratings, computed in batch once a rated contest has ended.
+
+Every rated participant plays one Elo game against every other participant
+of the contest: beating someone scores 1, a tie (same solved count and
+penalty) 0.5. A participant's change is K times their actual minus expected
+score, averaged over their opponents, so it stays within +-K whatever the
+contest size. The pairwise games are NumPy matrices, which keeps a
+2,000-participant contest well under a second.
+
+Standings come from the scoreboard (ContestParticipation totals). Banned
+participants and users who never submitted are not rated. Contests are rated
+in end order, each starting from the ratings the previous ones produced, so
+re-rating a contest (e.g. after a rejudge) re-rates every later one too.
+"""
+import numpy as np
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+INITIAL_RATING = 1500
+K_FACTOR = 64
+
+
+def rating_changes(ratings, places, k=K_FACTOR):
+    """Rating deltas for participants with ``ratings`` finishing at ``places`` (1 = best, ties share a place)"""
+    ratings = np.asarray(ratings, dtype=np.float64)
+    places = np.asarray(places)
+    n = len(ratings)
+    if n < 2:
+        return np.zeros(n, dtype=np.int64)
+
+    # expected[i, j]: probability that i finishes ahead of j
+    expected = 1.0 / (1.0 + 10.0 ** ((ratings[np.newaxis, :] - ratings[:, np.newaxis]) / 400.0))
+    actual = (places[:, np.newaxis] < places[np.newaxis, :]) + 0.5 * (places[:, np.newaxis] == places[np.newaxis, :])
+    # The diagonal is 0.5 in both and cancels out
+    return np.rint(k * (actual - expected).sum(axis=1) / (n - 1)).astype(np.int64)
+
+
+def ratable_contests():
+    """Rated contests that have ended, in the order they are rated"""
+    from .models import Contest
+
+    return Contest.objects.filter(is_rated=True, end_time__lte=timezone.now()).order_by('end_time', 'id')
+
+
+def final_standings(contest):
+    """[(user_id, place)] of the contest's rated participants, best first"""
+    from submissions.models import Submission
+    from .models import ContestParticipation, ContestProblem
+
+    # Any submission to a contest problem during the contest, compile errors included
+    submitted = Submission.objects.filter(
+        user_id=OuterRef('user_id'),
+        problem_id__in=ContestProblem.objects.filter(contest=contest).values('problem_id'),
+        submitted_at__gte=contest.start_time,
+        submitted_at__lte=contest.end_time,
+        is_test=False,
+    )
+    rows = ContestParticipation.objects.filter(contest=contest, is_banned=False).filter(
+        Exists(submitted)
+    ).order_by('-problems_solved', 'total_penalty', 'id').values_list('user_id', 'problems_solved', 'total_penalty')
+
+    standings = []
+    previous = None
+    for position, (user_id, solved, penalty) in enumerate(rows, start=1):
+        if (solved, penalty) != previous:
+            place = position
+            previous = (solved, penalty)
+        standings.append((user_id, place))
+    return standings
+
+
+def ratings_before(contest, user_ids):
+    """{user_id: rating} going into ``contest``, from the latest earlier rated contest"""
+    from .models import RatingChange
+
+    earlier = Q(contest__end_time__lt=contest.end_time) | Q(contest__end_time=contest.end_time, contest_id__lt=contest.id)
+    history = RatingChange.objects.filter(earlier, user_id__in=user_ids, contest__is_rated=True).order_by(
+        'user_id', '-contest__end_time', '-contest_id'
+    ).values_list('user_id', 'new_rating')
+
+    ratings = {}
+    for user_id, rating in history:
+        ratings.setdefault(user_id, rating)
+    return ratings
+
+
+def rate_contest(contest):
+    """Replace the contest's RatingChange rows; returns the ids of users whose rating may have changed"""
+    from .models import RatingChange
+
+    standings = final_standings(contest)
+    user_ids = [user_id for user_id, _ in standings]
+    previous = ratings_before(contest, user_ids)
+    old_ratings = [previous.get(user_id, INITIAL_RATING) for user_id in user_ids]
+    deltas = rating_changes(old_ratings, [place for _, place in standings])
+
+    with transaction.atomic():
+        affected = set(RatingChange.objects.filter(contest=contest).values_list('user_id', flat=True))
+        RatingChange.objects.filter(contest=contest).delete()
+        RatingChange.objects.bulk_create([
+            RatingChange(contest=contest, user_id=user_id, rank=place, old_rating=old, new_rating=old + int(delta))
+            for (user_id, place), old, delta in zip(standings, old_ratings, deltas)
+        ], batch_size=500)
+        type(contest).objects.filter(id=contest.id).update(rated_at=timezone.now())
+    return affected | set(user_ids)
+
+
+def sync_profile_ratings(user_ids):
+    """Set UserProfile.rating to each user's latest rating (None if never rated)"""
+    from accounts.models import UserProfile
+    from .models import RatingChange
+
+    latest = {}
+    for user_id, rating in RatingChange.objects.filter(
+        user_id__in=user_ids, contest__is_rated=True
+    ).order_by('user_id', '-contest__end_time', '-contest_id').values_list('user_id', 'new_rating'):
+        latest.setdefault(user_id, rating)
+
+    profiles = list(UserProfile.objects.filter(user_id__in=user_ids).only('id', 'user_id', 'rating'))
+    for profile in profiles:
+        profile.rating = latest.get(profile.user_id)
+    UserProfile.objects.bulk_update(profiles, ['rating'], batch_size=500)
+
+
+def update_ratings(from_contest=None):
+    """Rate contests that ended since the last run, or re-rate ``from_contest`` and every later one
+
+    Returns the contests that were rated.
+    """
+    contests = list(ratable_contests())
+    if from_contest is None:
+        start = next((i for i, contest in enumerate(contests) if contest.rated_at is None), None)
+    else:
+        start = next((i for i, contest in enumerate(contests) if contest.id == from_contest.id), None)
+    if start is None:
+        return []
+
+    affected = set()
+    for contest in contests[start:]:
+        affected |= rate_contest(contest)
+    sync_profile_ratings(affected)
+    return contests[start:]
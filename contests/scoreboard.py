@@ -0,0 +1,248 @@
+"""
+Materialized contest scoreboard.
+
+The leaderboard used to load every contest submission and recompute ICPC
+penalties on each page view. Scores are now kept in ScoreboardEntry (one row
+per participant and problem) and in the totals of ContestParticipation. They
+are brought up to date whenever a verdict is written (judge.signals.
+submission_judged), in the same transaction as the verdict, so the leaderboard
+is a plain indexed query.
+
+Scoring (unchanged): a problem counts once it has an AC inside the contest
+window; its penalty is the minutes from the contest start to the first AC plus
+PENALTY_PER_WRONG_ATTEMPT for each wrong verdict before it.
+
+Contests with a freeze time stop updating the public leaderboard from then on:
+it is served from a ScoreboardSnapshot of the standings counting only
+submissions made before the freeze, computed once and never changed (admins
+keep seeing the live board). The snapshot is only stored once every
+submission made before the freeze has its verdict; until then a provisional
+one is recomputed at most every PROVISIONAL_SNAPSHOT_TIMEOUT seconds.
+"""
+from itertools import groupby
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+WRONG_VERDICTS = ['WA', 'RE', 'TLE', 'MLE', 'OLE', 'PE']
+PENALTY_PER_WRONG_ATTEMPT = 10
+# discard_snapshot also drops the cached copy; this bounds how long one cached
+# by a request racing with the discard can still be served
+SNAPSHOT_CACHE_TIMEOUT = 300
+# Standings while pre-freeze submissions are still judged are shared this long
+PROVISIONAL_SNAPSHOT_TIMEOUT = 15
+
+
+def score_problem(contest, submissions):
+    """(attempts, first_ac_at, penalty) for (verdict, submitted_at) pairs in submission order"""
+    attempts = 0
+    for verdict, submitted_at in submissions:
+        if verdict == 'AC':
+            minutes = int((submitted_at - contest.start_time).total_seconds() / 60)
+            return attempts, submitted_at, minutes + attempts * PENALTY_PER_WRONG_ATTEMPT
+        if verdict in WRONG_VERDICTS:
+            attempts += 1
+    return attempts, None, 0
+
+
+def _contest_submissions(contest):
+    from submissions.models import Submission
+
+    return Submission.objects.filter(
+        submitted_at__gte=contest.start_time,
+        submitted_at__lte=contest.end_time,
+        is_test=False,
+    )
+
+
+def _scored_cells(contest, submissions):
+    """(user_id, problem_id, attempts, first_ac_at, penalty) from (user_id, problem_id, verdict,
+    submitted_at) rows ordered by user, problem and submission order"""
+    for (user_id, problem_id), rows in groupby(submissions, key=lambda row: row[:2]):
+        yield (user_id, problem_id) + score_problem(contest, (row[2:] for row in rows))
+
+
+def _update_totals(participations):
+    """Recompute problems_solved and total_penalty of participations (all of one contest) from their entries"""
+    from .models import ContestParticipation, ScoreboardEntry
+
+    if not participations:
+        return
+    entries = ScoreboardEntry.objects.filter(contest_id=participations[0].contest_id)
+    if len(participations) == 1:
+        entries = entries.filter(user_id=participations[0].user_id)
+    totals = entries.values('user_id').annotate(
+        solved=Count('id', filter=Q(first_ac_at__isnull=False)),
+        penalty=Sum('penalty'),
+    )
+    totals = {row['user_id']: (row['solved'], row['penalty'] or 0) for row in totals}
+    for participation in participations:
+        solved, penalty = totals.get(participation.user_id, (0, 0))
+        if (solved, penalty) == (participation.problems_solved, participation.total_penalty):
+            continue
+        participation.problems_solved = solved
+        participation.total_penalty = penalty
+        # QuerySet.update: ContestParticipation.save() refuses staff users
+        ContestParticipation.objects.filter(id=participation.id).update(
+            problems_solved=solved, total_penalty=penalty,
+        )
+
+
+def update_cell(contest, user_id, problem_id):
+    """Rescore one participant on one problem (no-op if the user is not participating)"""
+    from .models import ContestParticipation, ScoreboardEntry
+
+    with transaction.atomic():
+        # The row lock serializes concurrent verdicts of the same participant
+        participation = ContestParticipation.objects.select_for_update().filter(
+            contest=contest, user_id=user_id
+        ).first()
+        if participation is None:
+            return
+
+        submissions = _contest_submissions(contest).filter(
+            user_id=user_id, problem_id=problem_id
+        ).order_by('submitted_at', 'id').values_list('verdict', 'submitted_at')
+        attempts, first_ac_at, penalty = score_problem(contest, submissions)
+        ScoreboardEntry.objects.update_or_create(
+            contest=contest, user_id=user_id, problem_id=problem_id,
+            defaults={'attempts': attempts, 'first_ac_at': first_ac_at, 'penalty': penalty},
+        )
+        _update_totals([participation])
+
+
+def update_submission_scoreboards(submission):
+    """Rescore the scoreboard cell of every contest a judged submission counts for"""
+    from .models import Contest
+
+    if submission.is_test:
+        return
+    contests = Contest.objects.filter(
+        contestproblem__problem_id=submission.problem_id,
+        contestparticipation__user_id=submission.user_id,
+        start_time__lte=submission.submitted_at,
+        end_time__gte=submission.submitted_at,
+    ).distinct()
+    for contest in contests:
+        update_cell(contest, submission.user_id, submission.problem_id)
+
+
+def update_participant(contest, user_id):
+    """Rescore every problem of one participant"""
+    from .models import ContestProblem
+
+    for problem_id in ContestProblem.objects.filter(contest=contest).values_list('problem_id', flat=True):
+        update_cell(contest, user_id, problem_id)
+
+
+def rebuild_contest(contest):
+    """Recompute the whole scoreboard of a contest from its submissions"""
+    from .models import ContestParticipation, ContestProblem, ScoreboardEntry
+
+    with transaction.atomic():
+        participations = list(
+            ContestParticipation.objects.select_for_update().filter(contest=contest)
+        )
+        problem_ids = ContestProblem.objects.filter(contest=contest).values_list('problem_id', flat=True)
+        submissions = _contest_submissions(contest).filter(
+            problem_id__in=problem_ids,
+            user_id__in=ContestParticipation.objects.filter(contest=contest).values('user_id'),
+        ).order_by('user_id', 'problem_id', 'submitted_at', 'id').values_list(
+            'user_id', 'problem_id', 'verdict', 'submitted_at'
+        )
+
+        entries = [
+            ScoreboardEntry(
+                contest=contest, user_id=user_id, problem_id=problem_id,
+                attempts=attempts, first_ac_at=first_ac_at, penalty=penalty,
+            )
+            for user_id, problem_id, attempts, first_ac_at, penalty in _scored_cells(contest, submissions)
+        ]
+
+        ScoreboardEntry.objects.filter(contest=contest).delete()
+        ScoreboardEntry.objects.bulk_create(entries, batch_size=500)
+        _update_totals(participations)
+        discard_snapshot(contest)
+
+
+def frozen_standings(contest):
+    """[username, problems solved, penalty] rows, best first, counting submissions before the freeze"""
+    from .models import ContestParticipation, ContestProblem
+
+    participations = ContestParticipation.objects.filter(
+        contest=contest, user__is_staff=False, user__is_superuser=False
+    ).order_by('id').values_list('user_id', 'user__username')
+    submissions = _contest_submissions(contest).filter(
+        submitted_at__lt=contest.freeze_time,
+        problem_id__in=ContestProblem.objects.filter(contest=contest).values('problem_id'),
+        user_id__in=ContestParticipation.objects.filter(contest=contest).values('user_id'),
+    ).order_by('user_id', 'problem_id', 'submitted_at', 'id').values_list(
+        'user_id', 'problem_id', 'verdict', 'submitted_at'
+    )
+
+    totals = {}
+    for user_id, problem_id, attempts, first_ac_at, penalty in _scored_cells(contest, submissions):
+        if first_ac_at is not None:
+            solved, total_penalty = totals.get(user_id, (0, 0))
+            totals[user_id] = (solved + 1, total_penalty + penalty)
+
+    standings = [[username, *totals.get(user_id, (0, 0))] for user_id, username in participations]
+    # Stable sort, so ties keep the live leaderboard's order (by participation id)
+    standings.sort(key=lambda row: (-row[1], row[2]))
+    return standings
+
+
+def _snapshot_cache_key(contest):
+    return f'contest_scoreboard_snapshot:{contest.id}'
+
+
+def _provisional_cache_key(contest):
+    return f'contest_scoreboard_snapshot:{contest.id}:provisional'
+
+
+def get_snapshot(contest):
+    """The frozen ScoreboardSnapshot of a contest, taken on first use after its freeze time
+
+    While submissions made before the freeze are still queued, an unsaved
+    snapshot is returned (``pk`` None, ``created_at`` when it was computed) so
+    they can still be counted; it is cached for PROVISIONAL_SNAPSHOT_TIMEOUT.
+    """
+    from .models import ContestProblem, ScoreboardSnapshot
+
+    for key in (_snapshot_cache_key(contest), _provisional_cache_key(contest)):
+        snapshot = cache.get(key)
+        if snapshot is not None and snapshot.freeze_time == contest.freeze_time:
+            return snapshot
+
+    snapshot = ScoreboardSnapshot.objects.filter(contest=contest).first()
+    if snapshot is not None and snapshot.freeze_time != contest.freeze_time:
+        discard_snapshot(contest)
+        snapshot = None
+    if snapshot is None:
+        # Checked first: once nothing before the freeze is pending, the standings are final
+        still_judging = _contest_submissions(contest).filter(
+            submitted_at__lt=contest.freeze_time,
+            problem_id__in=ContestProblem.objects.filter(contest=contest).values('problem_id'),
+            verdict__in=['QUEUED', 'JUDGING'],
+        ).exists()
+        standings = frozen_standings(contest)
+        if still_judging:
+            snapshot = ScoreboardSnapshot(contest=contest, freeze_time=contest.freeze_time, standings=standings,
+                                          created_at=timezone.now())
+            cache.set(_provisional_cache_key(contest), snapshot, PROVISIONAL_SNAPSHOT_TIMEOUT)
+            return snapshot
+        # Two first requests may both compute it; only one row is stored
+        snapshot, _ = ScoreboardSnapshot.objects.get_or_create(
+            contest=contest, defaults={'freeze_time': contest.freeze_time, 'standings': standings},
+        )
+    cache.set(_snapshot_cache_key(contest), snapshot, SNAPSHOT_CACHE_TIMEOUT)
+    return snapshot
+
+
+def discard_snapshot(contest):
+    """Drop a contest's snapshot, e.g. after its problems or times changed"""
+    from .models import ScoreboardSnapshot
+
+    ScoreboardSnapshot.objects.filter(contest=contest).delete()
+    cache.delete_many([_snapshot_cache_key(contest), _provisional_cache_key(contest)])
@@ -23,6 +23,7 @@ urlpatterns = [
     path('admin/<slug:slug>/user/<int:user_id>/submissions/', views.user_submissions, name='user_submissions'),
     path('<slug:slug>/problem/<slug:problem_slug>/', views.contest_problem_solve, name='contest_problem_solve'),
     path('<slug:slug>/problem/<slug:problem_slug>/test/', views.contest_test_code, name='contest_test_code'),
+    path('<slug:slug>/problem/<slug:problem_slug>/run/', views.contest_run_custom_input, name='contest_run_custom_input'),
     path('<slug:slug>/problem/<slug:problem_slug>/submit/', views.contest_submit_ajax, name='contest_submit_ajax'),
     path('<slug:slug>/check-solved/', views.check_solved_status, name='check_solved_status'),
     path('<slug:slug>/discussions/api/', views.contest_discussions_api, name='contest_discussions_api'),
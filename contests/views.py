@@ -3,10 +3,12 @@ from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib.auth.models import User
 from django.contrib import messages
 from django.core.paginator import Paginator
+from django.db.models import Min, Q
 from django.utils import timezone
 from django.utils._os import safe_join
 from django.conf import settings
 from django.http import JsonResponse
+from Online_Judge.page_cache import cache_anonymous_page, namespace_version, page_cache_timeout
 from .models import Contest, ContestParticipation, ContestProblem, ContestAnnouncement
 from .forms import ContestForm, ContestProblemForm, ContestAnnouncementForm
 from submissions.models import Submission
@@ -14,6 +16,21 @@ import os
 import re
 
 
+def contest_cache_timeout():
+    """Seconds contest pages can be cached: until the next contest starts or ends, at most PAGE_CACHE_TIMEOUT"""
+    now = timezone.now()
+    changes = Contest.objects.filter(is_active=True).aggregate(
+        next_start=Min('start_time', filter=Q(start_time__gt=now)),
+        next_end=Min('end_time', filter=Q(end_time__gte=now)),
+    )
+    timeout = page_cache_timeout()
+    for moment in changes.values():
+        if moment is not None:
+            timeout = min(timeout, int((moment - now).total_seconds()) + 1)
+    return timeout
+
+
+@cache_anonymous_page('contests', timeout=contest_cache_timeout)
 def contest_list(request):
     contests = Contest.objects.filter(is_active=True).order_by('-start_time')
     
@@ -27,13 +44,17 @@ def contest_list(request):
     page = request.GET.get('page')
     ended_paginated = paginator.get_page(page)
     
+    # The lists are rendered from a cached fragment (same for every user) while it lasts
     return render(request, 'contests/contest_list.html', {
         'upcoming': upcoming,
         'running': running,
-        'ended': ended_paginated
+        'ended': ended_paginated,
+        'cache_timeout': contest_cache_timeout(),
+        'contests_version': namespace_version('contests'),
     })
 
 
+@cache_anonymous_page('contests', timeout=contest_cache_timeout)
 def contest_detail(request, slug):
     # Validate slug to prevent path traversal
     if not re.match(r'^[a-zA-Z0-9_-]+$', slug):
@@ -146,75 +167,18 @@ def join_contest(request, slug):
 def contest_leaderboard(request, slug):
     contest = get_object_or_404(Contest, slug=slug, is_active=True)
     
-    # Get contest problems with optimization
-    contest_problems = ContestProblem.objects.filter(contest=contest).select_related('problem')
-    contest_problem_ids = [cp.problem.id for cp in contest_problems]
+    if contest.is_frozen and not request.user.is_staff:
+        return frozen_leaderboard(request, contest)
     
-    # Get all participations with user data, excluding admin users
-    participations = ContestParticipation.objects.filter(
+    # Scores are maintained by contests.scoreboard whenever a verdict is written
+    leaderboard = ContestParticipation.objects.filter(
         contest=contest,
         user__is_staff=False,
         user__is_superuser=False
-    ).select_related('user')
-    
-    # Bulk fetch all submissions for the contest period (exclude test submissions)
-    all_submissions = Submission.objects.filter(
-        problem_id__in=contest_problem_ids,
-        submitted_at__gte=contest.start_time,
-        submitted_at__lte=contest.end_time,
-        user__in=[p.user for p in participations],
-        is_test=False
-    ).select_related('user', 'problem').order_by('user_id', 'problem_id', 'submitted_at')
-    
-    # Group submissions by user and problem
-    user_submissions = {}
-    for submission in all_submissions:
-        user_id = submission.user_id
-        problem_id = submission.problem_id
-        if user_id not in user_submissions:
-            user_submissions[user_id] = {}
-        if problem_id not in user_submissions[user_id]:
-            user_submissions[user_id][problem_id] = []
-        user_submissions[user_id][problem_id].append(submission)
-    
-    # Calculate scores for each participant
-    leaderboard_data = []
-    for participation in participations:
-        problems_solved = 0
-        total_penalty = 0
-        user_id = participation.user_id
-        
-        if user_id in user_submissions:
-            for problem_id in contest_problem_ids:
-                if problem_id in user_submissions[user_id]:
-                    submissions = user_submissions[user_id][problem_id]
-                    
-                    # Find AC submission
-                    ac_submission = next((s for s in submissions if s.verdict == 'AC'), None)
-                    if ac_submission:
-                        problems_solved += 1
-                        
-                        # Calculate penalty time
-                        wrong_attempts = sum(1 for s in submissions 
-                                           if s.submitted_at < ac_submission.submitted_at 
-                                           and s.verdict in ['WA', 'RE', 'TLE', 'MLE', 'PE'])
-                        
-                        submission_time_minutes = int((ac_submission.submitted_at - contest.start_time).total_seconds() / 60)
-                        penalty_time = submission_time_minutes + (wrong_attempts * 10)
-                        total_penalty += penalty_time
-        
-        leaderboard_data.append({
-            'user': participation.user,
-            'problems_solved': problems_solved,
-            'total_penalty': total_penalty,
-            'start_time': participation.start_time
-        })
-    
-    # Sort by ACM ICPC rules
-    leaderboard_data.sort(key=lambda x: (-x['problems_solved'], x['total_penalty']))
+    ).select_related('user').order_by('-problems_solved', 'total_penalty', 'id')
     
     # Add pagination
-    paginator = Paginator(leaderboard_data, 20)  # 20 participants per page
+    paginator = Paginator(leaderboard, 20)  # 20 participants per page
     page = request.GET.get('page')
     participations = paginator.get_page(page)
     
@@ -224,6 +188,38 @@ def contest_leaderboard(request, slug):
     })
 
 
+def frozen_leaderboard(request, contest):
+    """Leaderboard page served from the contest's frozen snapshot, pre-rendered per page"""
+    from django.core.cache import cache
+    from django.template.loader import render_to_string
+    from django.utils.safestring import mark_safe
+    from .scoreboard import PROVISIONAL_SNAPSHOT_TIMEOUT, SNAPSHOT_CACHE_TIMEOUT, get_snapshot
+    
+    snapshot = get_snapshot(contest)
+    rows = [
+        {'user': {'username': username}, 'problems_solved': solved, 'total_penalty': penalty}
+        for username, solved, penalty in snapshot.standings
+    ]
+    participations = Paginator(rows, 20).get_page(request.GET.get('page'))
+    
+    def render_table():
+        return render_to_string('contests/leaderboard_table.html', {'participations': participations})
+    
+    if snapshot.pk is None:
+        # Not final yet (submissions before the freeze are still being judged)
+        key = (f'contest_leaderboard_html:{contest.id}:provisional:'
+               f'{snapshot.created_at.timestamp()}:{participations.number}')
+        table = cache.get_or_set(key, render_table, PROVISIONAL_SNAPSHOT_TIMEOUT)
+    else:
+        key = f'contest_leaderboard_html:{contest.id}:{snapshot.pk}:{participations.number}'
+        table = cache.get_or_set(key, render_table, SNAPSHOT_CACHE_TIMEOUT)
+    
+    return render(request, 'contests/leaderboard.html', {
+        'contest': contest,
+        'leaderboard_table': mark_safe(table)
+    })
+
+
 def is_staff(user):
     return user.is_staff
 
@@ -504,6 +500,30 @@ def contest_problem_solve(request, slug, problem_slug):
     })
 
 
+@login_required
+def contest_run_custom_input(request, slug, problem_slug):
+    """AJAX endpoint to run code on custom input for contest problems"""
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Method not allowed'}, status=405)
+    
+    contest = get_object_or_404(Contest, slug=slug, is_active=True)
+    contest_problem = get_object_or_404(ContestProblem, contest=contest, problem__slug=problem_slug)
+    
+    # Same access rules as testing against the samples
+    is_admin = request.user.is_staff or request.user.is_superuser
+    if not is_admin:
+        participation = ContestParticipation.objects.filter(contest=contest, user=request.user).first()
+        if contest.status == 'running' and not participation:
+            return JsonResponse({'error': 'Must join contest first'}, status=403)
+        if participation and participation.is_banned:
+            return JsonResponse({'error': 'Banned from contest'}, status=403)
+    elif contest.status == 'running':
+        return JsonResponse({'error': 'Admin users cannot test code during live contests'}, status=403)
+    
+    from submissions.views import custom_input_response
+    return custom_input_response(request, contest_problem.problem)
+
+
 @login_required
 def contest_test_code(request, slug, problem_slug):
     """AJAX endpoint to test code against sample test cases for contest problems"""
@@ -542,29 +562,30 @@ def contest_test_code(request, slug, problem_slug):
                 'error_message': 'No code provided'
             })
         
-        # Create temporary submission for testing
-        temp_submission = Submission(
-            user=request.user,
-            problem=problem,
-            code=code,
-            language=language,
-            is_test=True
-        )
-        
-        # Evaluate against sample test cases only
-        try:
-            from judge.evaluator import CodeEvaluator
-            evaluator = CodeEvaluator(temp_submission)
-            evaluator.evaluate(sample_only=True)
-            
+        # Sample tests run right away without touching the database (judge.custom_run),
+        # under the same per-user limit and site-wide slots (custom_run_slot) as the playground
+        from judge.custom_run import allow_custom_run, custom_run_slot, run_samples
+        if not allow_custom_run(request.user):
             return JsonResponse({
-                'verdict': temp_submission.verdict,
-                'execution_time': temp_submission.execution_time or 0,
-                'memory_used': temp_submission.memory_used or 0,
-                'test_cases_passed': temp_submission.test_cases_passed or 0,
-                'total_test_cases': temp_submission.total_test_cases or 0,
-                'error_message': temp_submission.compilation_error or temp_submission.runtime_error or None
-            })
+                'verdict': 'RE',
+                'execution_time': 0,
+                'memory_used': 0,
+                'test_cases_passed': 0,
+                'total_test_cases': 0,
+                'error_message': 'Too many runs, please wait a minute'
+            }, status=429)
+        try:
+            with custom_run_slot() as acquired:
+                if not acquired:
+                    return JsonResponse({
+                        'verdict': 'RE',
+                        'execution_time': 0,
+                        'memory_used': 0,
+                        'test_cases_passed': 0,
+                        'total_test_cases': 0,
+                        'error_message': 'The server is busy running code, please try again in a few seconds'
+                    }, status=503)
+                return JsonResponse(run_samples(problem, code, language))
         except Exception as e:
             return JsonResponse({
                 'verdict': 'RE',
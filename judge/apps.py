@@ -3,23 +3,5 @@ from django.apps import AppConfig
 class JudgeConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'judge'
-    
-    def ready(self):
-        # Start queue system for contest submissions
-        import sys
-        if any(cmd in sys.argv for cmd in ['migrate', 'makemigrations', 'collectstatic']):
-            return
-            
-        try:
-            from django.db import connection
-            connection.ensure_connection()
-            
-            from .queue_manager import submission_queue
-            submission_queue.start()
-            
-            from submissions.models import Submission
-            queued_submissions = Submission.objects.filter(verdict='QUEUED').order_by('submitted_at')
-            for submission in queued_submissions:
-                submission_queue.add_submission(submission.id)
-        except Exception:
-            pass
\ No newline at end of file
+    # Queued submissions are judged by the standalone daemon (manage.py run_judge),
+    # not by threads started inside every web worker.
@@ -0,0 +1,114 @@
+"""
+Streaming output checker.
+
+Program output and expected output are compared in fixed-size chunks straight
+from binary file objects, so memory use does not grow with the size of the
+output and the comparison stops at the first mismatching chunk.
+
+Verdicts follow the original string comparison:
+- AC: equal once leading/trailing whitespace is stripped and line endings
+  (``\\r\\n`` and ``\\r``) are normalized to ``\\n``
+- PE: equal (and non-empty) once all whitespace is removed
+- WA: anything else
+"""
+CHUNK_SIZE = 64 * 1024
+WHITESPACE = b' \t\n\r\x0b\x0c'
+PREVIEW_LENGTH = 100
+
+
+def check_output(output, expected):
+    """Compare two seekable binary file objects; returns 'AC', 'PE' or 'WA'"""
+    if _streams_equal(_normalized_chunks(output), _normalized_chunks(expected)):
+        return 'AC'
+
+    if _content_end(output) and _streams_equal(_non_whitespace_chunks(output), _non_whitespace_chunks(expected)):
+        return 'PE'
+    return 'WA'
+
+
+def preview(stream, length=PREVIEW_LENGTH):
+    """First ``length`` characters of a stream (leading whitespace skipped) for WA details"""
+    stream.seek(0)
+    head = b''
+    while len(head) <= length * 4:
+        chunk = stream.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        head = (head + chunk).lstrip(WHITESPACE)
+    text = head.decode('utf-8', errors='replace')
+    if len(text) > length:
+        return text[:length] + '...'
+    return text.rstrip()
+
+
+def _content_end(stream):
+    """Offset just past the last non-whitespace byte, found by reading backwards"""
+    end = stream.seek(0, 2)
+    while end > 0:
+        start = max(0, end - CHUNK_SIZE)
+        stream.seek(start)
+        chunk = stream.read(end - start).rstrip(WHITESPACE)
+        if chunk:
+            return start + len(chunk)
+        end = start
+    return 0
+
+
+def _normalized_chunks(stream):
+    """Chunks of the stripped stream with line endings normalized to \\n"""
+    remaining = _content_end(stream)
+    stream.seek(0)
+    leading = True
+    carry = b''
+    while remaining > 0:
+        chunk = stream.read(min(CHUNK_SIZE, remaining))
+        if not chunk:
+            break
+        remaining -= len(chunk)
+        if leading:
+            chunk = chunk.lstrip(WHITESPACE)
+            if not chunk:
+                continue
+            leading = False
+        chunk = carry + chunk
+        carry = b''
+        # A \r at the end of a chunk may be the first half of \r\n
+        if chunk.endswith(b'\r') and remaining > 0:
+            chunk, carry = chunk[:-1], b'\r'
+            if not chunk:
+                continue
+        yield chunk.replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+    if carry:
+        yield b'\n'
+
+
+def _non_whitespace_chunks(stream):
+    """Chunks of the whole stream with every whitespace byte removed"""
+    stream.seek(0)
+    while True:
+        chunk = stream.read(CHUNK_SIZE)
+        if not chunk:
+            return
+        chunk = chunk.translate(None, WHITESPACE)
+        if chunk:
+            yield chunk
+
+
+def _streams_equal(left_chunks, right_chunks):
+    """Compare two chunk iterators whose chunk boundaries need not line up"""
+    left_iter = iter(left_chunks)
+    right_iter = iter(right_chunks)
+    left = right = b''
+    while True:
+        if not left:
+            left = next(left_iter, b'')
+        if not right:
+            right = next(right_iter, b'')
+        if not left or not right:
+            # Equal only if both ran out together
+            return not left and not right
+        size = min(len(left), len(right))
+        if left[:size] != right[:size]:
+            return False
+        left = left[size:]
+        right = right[size:]
@@ -0,0 +1,103 @@
+"""
+Content-addressed cache of compiled binaries.
+
+Binaries are keyed by (language, compiler flags, compiler version, sha256 of
+the source) and kept under JUDGE_TEMP_DIR/compile_cache, so re-judges, the
+"Test" then "Submit" flow and template code pasted by many contestants only
+compile once. Entries are evicted least recently used first once the cache
+grows past JUDGE_COMPILE_CACHE_SIZE megabytes.
+"""
+import functools
+import hashlib
+import os
+import shutil
+import subprocess
+import tempfile
+from django.conf import settings
+
+
+@functools.lru_cache(maxsize=None)
+def compiler_version(compiler):
+    """First line of ``<compiler> --version``, cached for the life of the process"""
+    try:
+        result = subprocess.run([compiler, '--version'], capture_output=True, text=True, timeout=10)
+        return result.stdout.strip().split('\n')[0]
+    except (OSError, subprocess.TimeoutExpired):
+        return ''
+
+
+def get_compile_cache():
+    """Return the configured cache, or None when JUDGE_COMPILE_CACHE_SIZE is 0"""
+    max_size_mb = getattr(settings, 'JUDGE_COMPILE_CACHE_SIZE', 256)
+    if max_size_mb <= 0:
+        return None
+    return CompileCache(os.path.join(settings.JUDGE_TEMP_DIR, 'compile_cache'), max_size_mb * 1024 * 1024)
+
+
+class CompileCache:
+    def __init__(self, cache_dir, max_size):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def make_key(self, language, compiler, flags, source):
+        digest = hashlib.sha256()
+        for part in (language, compiler_version(compiler), ' '.join(flags)):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        digest.update(source.encode('utf-8'))
+        return digest.hexdigest()
+
+    def fetch(self, key, destination):
+        """Place the cached binary for ``key`` at ``destination``; False on a miss"""
+        path = os.path.join(self.cache_dir, key)
+        try:
+            # Eviction is by modification time, so a hit marks the entry as recently used
+            os.utime(path)
+            try:
+                # A hard link is free and survives the entry being evicted mid-run
+                os.link(path, destination)
+            except OSError:
+                shutil.copy2(path, destination)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def store(self, key, executable):
+        """Copy a freshly compiled binary into the cache"""
+        fd, temp_path = tempfile.mkstemp(prefix='.tmp_', dir=self.cache_dir)
+        os.close(fd)
+        try:
+            shutil.copy2(executable, temp_path)
+            # Atomic publish: concurrent workers compiling the same source just overwrite each other
+            os.replace(temp_path, os.path.join(self.cache_dir, key))
+        except OSError:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return
+        self.evict()
+
+    def evict(self):
+        """Drop least recently used binaries until the cache fits in max_size"""
+        entries = []
+        total_size = 0
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.name.startswith('.') or not entry.is_file():
+                    continue
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total_size += stat.st_size
+
+        if total_size <= self.max_size:
+            return
+
+        entries.sort()
+        for _, size, path in entries:
+            if total_size <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total_size -= size
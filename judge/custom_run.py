@@ -0,0 +1,183 @@
+"""
+"Run code" without the judge queue or the database.
+
+The Test button used to create a Submission row (or an unsaved one whose
+evaluator could still save it on errors) and go through the full judge path.
+A custom run instead evaluates an unsaved Submission with an evaluator that
+never saves, reads the samples from the per-process test set cache
+(judge.test_cache) and reuses compiled binaries (judge.compile_cache), so it
+costs one compile (often a cache hit) plus one run per sample, stopping at
+the first failing sample. Nothing is written to the database.
+
+``run_samples`` judges the problem's sample tests (the Test button);
+``run_with_input`` runs the program once on stdin given by the user (the
+playground). Both run inside the web request, so the views rate limit them per
+user with ``allow_custom_run`` and hold one of JUDGE_CUSTOM_RUN_CONCURRENCY
+site-wide slots (``custom_run_slot``) while they run, which keeps most web
+workers free for pages however many users press Run. Both return plain dicts
+for the views, with stdout/stderr cut to JUDGE_CUSTOM_RUN_OUTPUT_LIMIT
+kilobytes.
+"""
+import os
+import time
+from contextlib import contextmanager
+from django.conf import settings
+from django.core.cache import cache
+from submissions.models import Submission
+from .evaluator import CodeEvaluator
+from .runner import ProcessRunner
+from .test_cache import get_test_set
+
+
+def allow_custom_run(user):
+    """Count a custom run (test or playground) of ``user``; False once JUDGE_CUSTOM_RUN_RATE_LIMIT runs this minute were used"""
+    limit = getattr(settings, 'JUDGE_CUSTOM_RUN_RATE_LIMIT', 10)
+    if limit <= 0:
+        return True
+    key = f'custom_run_count:{user.id}:{int(time.time() // 60)}'
+    cache.add(key, 0, 60)
+    try:
+        return cache.incr(key) <= limit
+    except ValueError:
+        # Expired between add() and incr()
+        cache.set(key, 1, 60)
+        return True
+
+
+# A slot left behind by a killed web worker frees itself after this many seconds
+CUSTOM_RUN_SLOT_TIMEOUT = 120
+
+
+@contextmanager
+def custom_run_slot():
+    """Hold one of JUDGE_CUSTOM_RUN_CONCURRENCY slots shared by all web processes; yields False if all are taken"""
+    limit = getattr(settings, 'JUDGE_CUSTOM_RUN_CONCURRENCY', 4)
+    if limit <= 0:
+        yield True
+        return
+    for slot in range(limit):
+        key = f'custom_run_slot:{slot}'
+        if cache.add(key, 1, CUSTOM_RUN_SLOT_TIMEOUT):
+            try:
+                yield True
+            finally:
+                cache.delete(key)
+            return
+    yield False
+
+
+def read_output(path):
+    """(text, truncated) of an output file, cut to JUDGE_CUSTOM_RUN_OUTPUT_LIMIT"""
+    limit = getattr(settings, 'JUDGE_CUSTOM_RUN_OUTPUT_LIMIT', 64) * 1024
+    try:
+        with open(path, 'rb') as f:
+            data = f.read(limit + 1)
+    except FileNotFoundError:
+        return '', False
+    return data[:limit].decode('utf-8', errors='replace'), len(data) > limit
+
+
+class CustomRunEvaluator(CodeEvaluator):
+    """CodeEvaluator that leaves its results on the unsaved submission"""
+
+    def save_submission(self):
+        pass
+
+    def run_input(self, stdin):
+        """Run the compiled program once on ``stdin``; returns the runner's RunResult"""
+        input_file = os.path.join(self.work_dir, 'input.txt')
+        with open(input_file, 'w', encoding='utf-8', newline='') as f:
+            f.write(stdin)
+
+        runner = ProcessRunner(self.time_limit, self.memory_limit, cwd=self.work_dir,
+                               output_limit=self.output_limit)
+        if self.submission.language == 'python' and self.python_fork_server:
+            return runner.run_python(self.executable, input_file, self.output_path('input'), self.error_path('input'))
+        cmd = self.python_cmd + [self.executable] if self.submission.language == 'python' else [self.executable]
+        return runner.run(cmd, input_file, self.output_path('input'), self.error_path('input'))
+
+    def output_path(self, name):
+        # Same names as run_single_test uses for test cases
+        return os.path.join(self.work_dir, f'output_{name}.txt')
+
+    def error_path(self, name):
+        return os.path.join(self.work_dir, f'error_{name}.txt')
+
+
+def _new_evaluator(problem, code, language):
+    return CustomRunEvaluator(Submission(problem=problem, code=code, language=language, is_test=True))
+
+
+def run_samples(problem, code, language):
+    """Judge ``code`` against the sample tests of ``problem``"""
+    evaluator = _new_evaluator(problem, code, language)
+    submission = evaluator.submission
+    stdout = stderr = ''
+    truncated = False
+    try:
+        if evaluator.compile_code():
+            evaluator.run_test_cases(sample_only=True)
+            samples = get_test_set(problem, sample_only=True)
+            if samples:
+                # Output of the first failing sample, or of the last one if all passed
+                shown = samples[min(submission.test_cases_passed, len(samples) - 1)]
+                stdout, truncated = read_output(evaluator.output_path(shown.id))
+                stderr, _ = read_output(evaluator.error_path(shown.id))
+    except Exception as e:
+        submission.verdict = 'RE'
+        submission.runtime_error = str(e)[:500]
+    finally:
+        evaluator.cleanup()
+
+    return {
+        'verdict': submission.verdict,
+        'execution_time': submission.execution_time or 0,
+        'memory_used': submission.memory_used or 0,
+        'test_cases_passed': submission.test_cases_passed or 0,
+        'total_test_cases': submission.total_test_cases or 0,
+        'error_message': submission.compilation_error or submission.runtime_error or None,
+        'stdout': stdout,
+        'stderr': stderr,
+        'output_truncated': truncated,
+    }
+
+
+def run_with_input(problem, code, language, stdin):
+    """Run ``code`` once on ``stdin`` under the problem's limits"""
+    evaluator = _new_evaluator(problem, code, language)
+    submission = evaluator.submission
+    result = None
+    stdout = stderr = ''
+    truncated = False
+    try:
+        if evaluator.compile_code():
+            result = evaluator.run_input(stdin)
+            stdout, truncated = read_output(evaluator.output_path('input'))
+            stderr, _ = read_output(evaluator.error_path('input'))
+    except Exception as e:
+        submission.verdict = 'RE'
+        submission.runtime_error = str(e)[:500]
+    finally:
+        evaluator.cleanup()
+
+    if result is not None:
+        status = result.status
+        exit_code = result.exit_code
+        execution_time = problem.time_limit if status == 'TLE' else result.cpu_time
+        memory_used = result.memory
+    else:
+        # CE, or the run could not be started
+        status = submission.verdict
+        exit_code = None
+        execution_time = memory_used = 0
+
+    return {
+        'status': status,
+        'exit_code': exit_code,
+        'execution_time': execution_time,
+        'memory_used': memory_used,
+        'stdout': stdout,
+        'stderr': stderr,
+        'output_truncated': truncated,
+        'error_message': submission.compilation_error or submission.runtime_error or None,
+    }
@@ -1,13 +1,16 @@
 import os
 import subprocess
+import sys
 import tempfile
-import time
-import signal
-import psutil
+import threading
 import shutil
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from django.conf import settings
 from submissions.models import Submission
-from problems.models import TestCase
+from .checker import check_output, preview
+from .compile_cache import get_compile_cache
+from .runner import ProcessRunner
+from .test_cache import get_test_set
 
 
 class CodeEvaluator:
@@ -17,17 +20,33 @@ class CodeEvaluator:
         self.temp_dir = settings.JUDGE_TEMP_DIR
         self.time_limit = self.problem.time_limit
         self.memory_limit = self.problem.memory_limit * 1024 * 1024  # Convert MB to bytes
+        self.output_limit = getattr(settings, 'JUDGE_OUTPUT_LIMIT', 64) * 1024 * 1024
         
         # Ensure temp directory exists
         os.makedirs(self.temp_dir, exist_ok=True)
         
+        # Private working directory so concurrent evaluations (and unsaved test
+        # submissions without an id) never share source, input or output files
+        self.work_dir = tempfile.mkdtemp(prefix=f"submission_{self.submission.id}_", dir=self.temp_dir)
+        
+        # Test cases run at once per submission (1 = sequential)
+        self.max_parallel_tests = max(1, getattr(settings, 'JUDGE_PARALLEL_TESTS', 1))
+        self._failure_lock = threading.Lock()
+        self._first_failure_id = None
+        self._failure_details = {}
+        self._active_runners = {}
+        
         # Compiler flags
         self.gcc_flags = ['-O2', '-Wall', '-Wextra', '-std=c11']
         self.gpp_flags = ['-O2', '-Wall', '-Wextra', '-std=c++17']
-        self.python_cmd = ['python', '-u']
+        # The judge's own interpreter: a bare 'python' may resolve to a slow shim
+        self.python_cmd = [sys.executable, '-I']
+        # Run Python solutions in a fork of a pre-started interpreter (see judge.spawner)
+        self.python_fork_server = getattr(settings, 'JUDGE_PYTHON_FORK_SERVER', False)
+        self.compile_cache = get_compile_cache()
 
     
-    def evaluate(self, sample_only=False):
+    def evaluate(self):
         """Main evaluation function"""
         try:
             # Compile the code
@@ -35,26 +54,30 @@ class CodeEvaluator:
                 return
             
             # Run test cases
-            self.run_test_cases(sample_only=sample_only)
+            self.run_test_cases()
             
         except Exception as e:
             self.submission.verdict = 'RE'
             self.submission.runtime_error = str(e)
-            self.submission.save()
+            self.save_submission()
         finally:
             self.cleanup()
     
+    def save_submission(self):
+        """Store the results written to the submission so far"""
+        self.submission.save()
+    
     def compile_code(self):
         """Compile C/C++/Python/Java code"""
         # Handle Python
         if self.submission.language == 'python':
-            source_file = os.path.join(self.temp_dir, f"solution_{self.submission.id}.py")
+            source_file = os.path.join(self.work_dir, "solution.py")
             try:
                 with open(source_file, 'w', encoding='utf-8') as f:
                     if len(self.submission.code) > 100000:
                         self.submission.verdict = 'CE'
                         self.submission.compilation_error = 'Code size exceeds limit (100KB)'
-                        self.submission.save()
+                        self.save_submission()
                         return False
                     f.write(self.submission.code)
                 self.executable = source_file
@@ -62,25 +85,33 @@ class CodeEvaluator:
             except Exception as e:
                 self.submission.verdict = 'CE'
                 self.submission.compilation_error = f'Error writing source file: {str(e)}'
-                self.submission.save()
+                self.save_submission()
                 return False
         
 
         
         # Create temporary files for C/C++
         if self.submission.language == 'c':
-            source_file = os.path.join(self.temp_dir, f"solution_{self.submission.id}.c")
+            source_file = os.path.join(self.work_dir, "solution.c")
             compiler = 'gcc'
             flags = self.gcc_flags
         else:  # cpp
-            source_file = os.path.join(self.temp_dir, f"solution_{self.submission.id}.cpp")
+            source_file = os.path.join(self.work_dir, "solution.cpp")
             compiler = 'g++'
             flags = self.gpp_flags
         
-        executable = os.path.join(self.temp_dir, f"solution_{self.submission.id}")
+        executable = os.path.join(self.work_dir, "solution")
         if os.name == 'nt':  # Windows
             executable += '.exe'
         
+        # Reuse the binary if this exact source was already compiled with the same toolchain
+        cache_key = None
+        if self.compile_cache and len(self.submission.code) <= 100000:
+            cache_key = self.compile_cache.make_key(self.submission.language, compiler, flags, self.submission.code)
+            if self.compile_cache.fetch(cache_key, executable):
+                self.executable = executable
+                return True
+        
         # Write code to file with security checks
         try:
             with open(source_file, 'w', encoding='utf-8') as f:
@@ -88,13 +119,13 @@ class CodeEvaluator:
                 if len(self.submission.code) > 100000:  # 100KB limit
                     self.submission.verdict = 'CE'
                     self.submission.compilation_error = 'Code size exceeds limit (100KB)'
-                    self.submission.save()
+                    self.save_submission()
                     return False
                 f.write(self.submission.code)
         except Exception as e:
             self.submission.verdict = 'CE'
             self.submission.compilation_error = f'Error writing source file: {str(e)}'
-            self.submission.save()
+            self.save_submission()
             return False
         
         # Enhanced compile command with security flags
@@ -106,7 +137,7 @@ class CodeEvaluator:
                 capture_output=True,
                 text=True,
                 timeout=15,  # Increased timeout for complex code
-                cwd=self.temp_dir
+                cwd=self.work_dir
             )
             
             if result.returncode != 0:
@@ -116,52 +147,61 @@ class CodeEvaluator:
                 if len(error_msg) > 2000:  # Limit error message size
                     error_msg = error_msg[:2000] + '...'
                 self.submission.compilation_error = error_msg
-                self.submission.save()
+                self.save_submission()
                 return False
             
             # Check if executable was created
             if not os.path.exists(executable):
                 self.submission.verdict = 'CE'
                 self.submission.compilation_error = 'Executable not generated'
-                self.submission.save()
+                self.save_submission()
                 return False
             
+            if cache_key:
+                self.compile_cache.store(cache_key, executable)
+            
             self.executable = executable
             return True
             
         except subprocess.TimeoutExpired:
             self.submission.verdict = 'CE'
             self.submission.compilation_error = 'Compilation timeout (15s exceeded)'
-            self.submission.save()
+            self.save_submission()
             return False
         except Exception as e:
             self.submission.verdict = 'CE'
             self.submission.compilation_error = f'Compilation error: {str(e)}'
-            self.submission.save()
+            self.save_submission()
             return False
     
     def run_test_cases(self, sample_only=False):
         """Run code against test cases"""
-        if sample_only:
-            # Only run sample test cases (is_sample=True)
-            test_cases = TestCase.objects.filter(problem=self.problem, is_sample=True)
+        # Only sample test cases (is_sample=True) for sample_only runs; the test
+        # set is cached per worker until the problem's test cases change
+        test_cases = get_test_set(self.problem, sample_only=sample_only)
+        
+        total_cases = len(test_cases)
+        if self.max_parallel_tests > 1 and total_cases > 1:
+            results = self._run_tests_parallel(test_cases)
         else:
-            # Run all test cases
-            test_cases = TestCase.objects.filter(problem=self.problem)
-            
-        total_cases = test_cases.count()
+            results = self._run_tests_sequential(test_cases)
+        
         passed_cases = 0
         max_time = 0
         max_memory = 0
         
+        # Results are checked in test order, so the reported verdict is always
+        # the first failing test case, exactly as in a sequential run
         for test_case in test_cases:
-            verdict, exec_time, memory = self.run_single_test(test_case)
+            verdict, exec_time, memory = results[test_case.id]
             
             if verdict == 'AC':
                 passed_cases += 1
             else:
                 # If any test case fails, set the verdict and break
                 self.submission.verdict = verdict
+                if test_case.id in self._failure_details:
+                    self.submission.runtime_error = self._failure_details[test_case.id]
                 break
             
             max_time = max(max_time, exec_time)
@@ -175,165 +215,108 @@ class CodeEvaluator:
         self.submission.total_test_cases = total_cases
         self.submission.execution_time = max_time
         self.submission.memory_used = max_memory
-        self.submission.save()
+        self.save_submission()
+    
+    def _run_tests_sequential(self, test_cases):
+        """Run test cases one by one, stopping at the first failure"""
+        results = {}
+        for test_case in test_cases:
+            results[test_case.id] = self.run_single_test(test_case)
+            if results[test_case.id][0] != 'AC':
+                break
+        return results
+    
+    def _run_tests_parallel(self, test_cases):
+        """Run independent test cases concurrently, bounded by JUDGE_PARALLEL_TESTS.
+        
+        Once a test case fails, every later test case is cancelled (queued ones
+        never start, running ones are killed through their ProcessRunner);
+        earlier ones still finish so the first failing test case is reported.
+        """
+        results = {}
+        workers = min(self.max_parallel_tests, len(test_cases))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(self.run_single_test, test_case): test_case for test_case in test_cases}
+            for future in as_completed(futures):
+                if future.cancelled():
+                    continue
+                test_case = futures[future]
+                results[test_case.id] = future.result()
+                if results[test_case.id][0] not in ('AC', 'CANCELLED'):
+                    self._record_failure(test_case)
+                    for pending, other in futures.items():
+                        if other.id > self._first_failure_id:
+                            pending.cancel()
+        return results
+    
+    def _record_failure(self, test_case):
+        with self._failure_lock:
+            if self._first_failure_id is None or test_case.id < self._first_failure_id:
+                self._first_failure_id = test_case.id
+            # Kill later test cases that are already running
+            for test_case_id, runner in self._active_runners.items():
+                if test_case_id > self._first_failure_id:
+                    runner.kill()
+    
+    def _is_cancelled(self, test_case):
+        """A test case is no longer needed once an earlier one has failed"""
+        return self._first_failure_id is not None and test_case.id > self._first_failure_id
     
     def run_single_test(self, test_case):
-        """Run code against a single test case with enhanced monitoring"""
-        input_file = os.path.join(self.temp_dir, f"input_{self.submission.id}.txt")
-        output_file = os.path.join(self.temp_dir, f"output_{self.submission.id}.txt")
-        error_file = os.path.join(self.temp_dir, f"error_{self.submission.id}.txt")
+        """Run code against a single test case under kernel-enforced limits"""
+        # Per-test file names so test cases can run concurrently; the stored
+        # input file is used as stdin as is
+        output_file = os.path.join(self.work_dir, f"output_{test_case.id}.txt")
+        error_file = os.path.join(self.work_dir, f"error_{test_case.id}.txt")
         
         try:
-            # Write input to file
-            with open(input_file, 'w', encoding='utf-8') as f:
-                f.write(test_case.input_data)
+            # Different execution for different languages
+            if self.submission.language == 'python':
+                cmd = self.python_cmd + [self.executable]
+            else:
+                cmd = [self.executable]
             
-            # Run the executable with enhanced monitoring
-            start_time = time.time()
-            max_memory = 0
+            runner = ProcessRunner(self.time_limit, self.memory_limit, cwd=self.work_dir,
+                                   output_limit=self.output_limit)
+            with self._failure_lock:
+                # An earlier test case already failed
+                if self._is_cancelled(test_case):
+                    return 'CANCELLED', 0, 0
+                self._active_runners[test_case.id] = runner
             
-            with open(input_file, 'r') as input_f, \
-                 open(output_file, 'w') as output_f, \
-                 open(error_file, 'w') as error_f:
-                
-                # Different execution for different languages
-                if self.submission.language == 'python':
-                    cmd = self.python_cmd + [self.executable]
+            try:
+                if self.submission.language == 'python' and self.python_fork_server:
+                    result = runner.run_python(self.executable, test_case.input_path, output_file, error_file)
                 else:
-                    cmd = [self.executable]
-                
-                process = subprocess.Popen(
-                    cmd,
-                    stdin=input_f,
-                    stdout=output_f,
-                    stderr=error_f,
-                    text=True,
-                    cwd=self.temp_dir
-                )
-                
-                try:
-                    # Monitor process with psutil for better resource tracking
-                    ps_process = psutil.Process(process.pid)
-                    
-                    while process.poll() is None:
-                        try:
-                            # Check memory usage
-                            memory_info = ps_process.memory_info()
-                            current_memory = memory_info.rss  # Resident Set Size
-                            max_memory = max(max_memory, current_memory)
-                            
-                            # Check memory limit
-                            if current_memory > self.memory_limit:
-                                process.kill()
-                                return 'MLE', time.time() - start_time, current_memory // 1024  # Convert to KB
-                            
-                            # Check time limit
-                            if time.time() - start_time > self.time_limit:
-                                process.kill()
-                                return 'TLE', self.time_limit, max_memory // 1024
-                            
-                            time.sleep(0.01)  # Small delay to prevent excessive CPU usage
-                            
-                        except (psutil.NoSuchProcess, psutil.AccessDenied):
-                            break
-                    
-                    # Wait for process to complete
-                    process.wait(timeout=0.1)
-                    exec_time = time.time() - start_time
-                    
-                    if process.returncode != 0:
-                        # Read error output
-                        with open(error_file, 'r') as f:
-                            error_output = f.read().strip()
-                        return 'RE', exec_time, max_memory // 1024
-                    
-                    # Check output
-                    with open(output_file, 'r', encoding='utf-8') as f:
-                        actual_output = f.read().strip()
-                    
-                    expected_output = test_case.expected_output.strip()
-                    
-                    # Enhanced output comparison with detailed logging
-                    if self._compare_outputs(actual_output, expected_output):
-                        return 'AC', exec_time, max_memory // 1024
-                    else:
-                        # Check for presentation error
-                        if self._is_presentation_error(actual_output, expected_output):
-                            return 'PE', exec_time, max_memory // 1024
-                        else:
-                            # Debug: Store actual vs expected for debugging
-                            self.submission.runtime_error = f"Expected: '{expected_output}' | Got: '{actual_output}'"
-                            return 'WA', exec_time, max_memory // 1024
-                        
-                except subprocess.TimeoutExpired:
-                    process.kill()
-                    return 'TLE', self.time_limit, max_memory // 1024
-                except Exception as e:
-                    if process.poll() is None:
-                        process.kill()
-                    return 'RE', time.time() - start_time, max_memory // 1024
+                    result = runner.run(cmd, test_case.input_path, output_file, error_file)
+            finally:
+                with self._failure_lock:
+                    self._active_runners.pop(test_case.id, None)
+            
+            if result.status == 'KILLED':
+                return 'CANCELLED', 0, 0
+            if result.status == 'TLE':
+                return 'TLE', self.time_limit, result.memory
+            if result.status in ('MLE', 'OLE', 'RE'):
+                return result.status, result.cpu_time, result.memory
+            
+            # Compare in chunks so huge outputs never have to fit in memory
+            with open(test_case.output_path, 'rb') as expected_stream, \
+                 open(output_file, 'rb') as output_stream:
+                verdict = check_output(output_stream, expected_stream)
+                if verdict == 'WA':
+                    # Debug: Store the start of actual vs expected for debugging
+                    self._failure_details[test_case.id] = (
+                        f"Expected: '{preview(expected_stream)}' | Got: '{preview(output_stream)}'"
+                    )
+            return verdict, result.cpu_time, result.memory
                     
         except Exception as e:
             return 'RE', 0, 0
     
-    def _compare_outputs(self, actual, expected):
-        """Enhanced output comparison with strict matching"""
-        # Strategy 1: Exact match (most strict)
-        if actual == expected:
-            return True
-        
-        # Strategy 2: Only normalize line endings (Windows vs Unix)
-        actual_normalized = actual.replace('\r\n', '\n').replace('\r', '\n')
-        expected_normalized = expected.replace('\r\n', '\n').replace('\r', '\n')
-        if actual_normalized == expected_normalized:
-            return True
-        
-        # No other automatic corrections - let PE detection handle whitespace issues
-        return False
-    
-    def _is_presentation_error(self, actual, expected):
-        """Check if the difference is only in presentation (whitespace/formatting)"""
-        import re
-        
-        # Normalize line endings first
-        actual_norm = actual.replace('\r\n', '\n').replace('\r', '\n')
-        expected_norm = expected.replace('\r\n', '\n').replace('\r', '\n')
-        
-        # If already equal after line ending normalization, not a PE
-        if actual_norm == expected_norm:
-            return False
-        
-        # Remove all whitespace and compare content
-        actual_clean = re.sub(r'\s+', '', actual_norm)
-        expected_clean = re.sub(r'\s+', '', expected_norm)
-        
-        # If content is same after removing all whitespace, it's presentation error
-        if actual_clean == expected_clean and actual_clean != '':
-            return True
-        
-        return False
-    
     def cleanup(self):
-        """Enhanced cleanup of temporary files"""
-        patterns = [
-            f"solution_{self.submission.id}",
-
-            f"input_{self.submission.id}.txt",
-            f"output_{self.submission.id}.txt",
-            f"error_{self.submission.id}.txt"
-        ]
-        
-        for pattern in patterns:
-            for file in os.listdir(self.temp_dir):
-                if file.startswith(pattern):
-                    try:
-                        file_path = os.path.join(self.temp_dir, file)
-                        if os.path.isfile(file_path):
-                            os.remove(file_path)
-                        elif os.path.isdir(file_path):
-                            shutil.rmtree(file_path)
-                    except Exception:
-                        pass  # Ignore cleanup errors
+        """Remove this evaluation's working directory"""
+        shutil.rmtree(self.work_dir, ignore_errors=True)
 
 
 def evaluate_submission(submission):
@@ -0,0 +1,106 @@
+import multiprocessing
+import os
+import signal
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from django.core.management.base import BaseCommand
+from django.db import connections, transaction
+from django.utils import timezone
+
+from judge.queue_manager import (
+    claim_next_submission,
+    init_worker,
+    judge_submission_by_id,
+    requeue_stale_submissions,
+)
+from judge.signals import submission_judged
+from submissions.rejudge import finish_idle_rejudges
+
+
+class Command(BaseCommand):
+    help = 'Run the judge daemon: claim queued submissions and evaluate them in a worker pool'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='Number of evaluator processes (default: CPU count)')
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help='Seconds to wait between queue checks when idle')
+        parser.add_argument('--recover', action='store_true',
+                            help='Requeue submissions stuck in JUDGING before starting '
+                                 '(only safe when no other judge daemon is running)')
+        parser.add_argument('--once', action='store_true',
+                            help='Exit as soon as the queue is empty')
+
+    def handle(self, *args, **options):
+        workers = max(1, options['workers'])
+        poll_interval = options['poll_interval']
+        self.running = True
+
+        if options['recover']:
+            requeued = requeue_stale_submissions()
+            self.stdout.write(f'Requeued {requeued} stale submissions')
+
+        signal.signal(signal.SIGINT, self.stop)
+        signal.signal(signal.SIGTERM, self.stop)
+
+        # Workers are spawned rather than forked so they never share the parent's DB connection
+        connections.close_all()
+        pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=init_worker,
+        )
+        self.stdout.write(self.style.SUCCESS(f'Judge daemon started with {workers} workers'))
+
+        in_flight = {}
+        try:
+            while self.running or in_flight:
+                while self.running and len(in_flight) < workers:
+                    submission_id = claim_next_submission()
+                    if submission_id is None:
+                        break
+                    in_flight[pool.submit(judge_submission_by_id, submission_id)] = submission_id
+
+                if not in_flight:
+                    finish_idle_rejudges()
+                    if options['once']:
+                        break
+                    time.sleep(poll_interval)
+                    continue
+
+                done, _ = wait(in_flight, timeout=poll_interval, return_when=FIRST_COMPLETED)
+                for future in done:
+                    submission_id = in_flight.pop(future)
+                    try:
+                        verdict = future.result()
+                        self.stdout.write(f'Submission {submission_id}: {verdict}')
+                    except Exception as e:
+                        self.mark_failed(submission_id, e)
+                        self.stdout.write(self.style.ERROR(f'Submission {submission_id} error: {str(e)}'))
+        finally:
+            pool.shutdown(wait=True)
+
+        self.stdout.write(self.style.SUCCESS('Judge daemon stopped'))
+
+    def mark_failed(self, submission_id, error):
+        from submissions.models import Submission
+
+        with transaction.atomic():
+            submission = Submission.objects.select_for_update().filter(
+                id=submission_id, verdict='JUDGING'
+            ).first()
+            if submission is None:
+                return
+            first_judgement = submission.judged_at is None
+            submission.verdict = 'RE'
+            submission.runtime_error = str(error)[:500]
+            submission.judged_at = timezone.now()
+            submission.save(update_fields=['verdict', 'runtime_error', 'judged_at'])
+            submission_judged.send(sender=Submission, submission=submission,
+                                   first_judgement=first_judgement)
+
+    def stop(self, signum, frame):
+        if self.running:
+            self.stdout.write('Shutting down after in-flight submissions finish...')
+        self.running = False
@@ -0,0 +1,152 @@
+"""
+Database-backed judge queue.
+
+Submissions are claimed straight from the Submission table, so any number of
+judge daemons (``python manage.py run_judge``), the admin queue page and the
+``process_queue`` command can share the same queue without judging a
+submission twice.
+
+The queue is served by priority class (Submission.priority: live contest,
+practice, rejudge). Within a class users take turns rather than
+being served oldest first: each user's next submission is ranked by how many
+of theirs are ahead of it, counting those being judged, so one user's burst
+only delays their own submissions. A user with JUDGE_MAX_IN_FLIGHT_PER_USER
+submissions being judged waits for one to finish; rejudges are not capped,
+they only run when nothing else is queued.
+"""
+import os
+import signal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, Count, F, IntegerField, Value, When, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from judge.signals import submission_judged
+
+
+def initial_priority(submission):
+    """Queue priority class of a new submission"""
+    from contests.models import ContestParticipation
+    from submissions.models import Submission
+
+    now = timezone.now()
+    in_live_contest = ContestParticipation.objects.filter(
+        user_id=submission.user_id,
+        is_banned=False,
+        contest__start_time__lte=now,
+        contest__end_time__gte=now,
+        contest__contestproblem__problem_id=submission.problem_id,
+    ).exists()
+    return Submission.PRIORITY_CONTEST if in_live_contest else Submission.PRIORITY_PRACTICE
+
+
+def queue_candidates(limit=10):
+    """Ids of the QUEUED submissions to claim next, best first"""
+    from submissions.models import Submission
+
+    cap = getattr(settings, 'JUDGE_MAX_IN_FLIGHT_PER_USER', 2)
+    in_flight = dict(
+        Submission.objects.filter(verdict='JUDGING').exclude(priority=Submission.PRIORITY_REJUDGE)
+        .order_by().values('user_id').annotate(count=Count('id')).values_list('user_id', 'count')
+    )
+
+    queued = Submission.objects.filter(verdict='QUEUED')
+    priorities = queued.order_by('-priority').values_list('priority', flat=True).distinct()
+    for priority in priorities:
+        candidates = queued.filter(priority=priority)
+        judging = {}
+        if priority != Submission.PRIORITY_REJUDGE:
+            judging = in_flight
+            if cap > 0:
+                candidates = candidates.exclude(user_id__in=[user_id for user_id, count in in_flight.items() if count >= cap])
+
+        # A user's n-th queued submission takes turn n, pushed back by their submissions being judged
+        candidates = candidates.annotate(
+            position=Window(RowNumber(), partition_by=[F('user_id')], order_by=[F('submitted_at').asc(), F('id').asc()]),
+        ).annotate(
+            turn=F('position') + Case(
+                *[When(user_id=user_id, then=Value(count)) for user_id, count in judging.items()],
+                default=Value(0), output_field=IntegerField(),
+            ),
+        ).order_by('turn', 'submitted_at', 'id').values_list('id', flat=True)[:limit]
+
+        candidate_ids = list(candidates)
+        if candidate_ids:
+            return candidate_ids
+    return []
+
+
+def claim_next_submission():
+    """Atomically move the next QUEUED submission to JUDGING and return its id"""
+    from submissions.models import Submission
+
+    for submission_id in queue_candidates():
+        # Conditional update keeps the claim atomic when several judges race for the same row
+        claimed = Submission.objects.filter(id=submission_id, verdict='QUEUED').update(verdict='JUDGING')
+        if claimed:
+            return submission_id
+    return None
+
+
+def claim_submissions(limit):
+    """Claim up to ``limit`` queued submissions, in queue order"""
+    claimed = []
+    while len(claimed) < limit:
+        submission_id = claim_next_submission()
+        if submission_id is None:
+            break
+        claimed.append(submission_id)
+    return claimed
+
+
+def judge_submission(submission):
+    """Evaluate a claimed submission and write the verdict back"""
+    from judge.evaluator import CodeEvaluator
+
+    if submission.verdict != 'JUDGING':
+        submission.verdict = 'JUDGING'
+        submission.save(update_fields=['verdict'])
+
+    try:
+        CodeEvaluator(submission).evaluate()
+    except Exception as e:
+        submission.verdict = 'RE'
+        submission.runtime_error = str(e)[:500]
+
+    first_judgement = submission.judged_at is None
+    submission.judged_at = timezone.now()
+    with transaction.atomic():
+        submission.save()
+        submission_judged.send(sender=submission.__class__, submission=submission,
+                               first_judgement=first_judgement)
+    return submission
+
+
+def requeue_stale_submissions():
+    """Put submissions left in JUDGING by a crashed judge back in the queue"""
+    from submissions.models import Submission
+
+    return Submission.objects.filter(verdict='JUDGING').update(verdict='QUEUED')
+
+
+def init_worker():
+    """Process pool initializer: judge workers are spawned, so set Django up again"""
+    import django
+
+    # Ctrl+C reaches the whole process group; let the daemon decide when workers stop
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'Online_Judge.settings')
+    django.setup()
+
+
+def judge_submission_by_id(submission_id):
+    """Worker entry point: load a claimed submission and judge it"""
+    from django.db import close_old_connections
+    from submissions.models import Submission
+
+    close_old_connections()
+    submission = Submission.objects.select_related('problem', 'user').get(id=submission_id)
+    judge_submission(submission)
+    return submission.verdict
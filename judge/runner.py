@@ -0,0 +1,308 @@
+"""
+Process runner for judged programs.
+
+Limits are enforced by the kernel instead of by sampling the child:
+RLIMIT_CPU caps CPU time, RLIMIT_AS (or a cgroup v2 ``memory.max`` when
+JUDGE_CGROUP_ROOT points at a delegated cgroup) caps memory, RLIMIT_FSIZE caps
+output, and a wall-clock watchdog kills programs that sleep or block on input. CPU time and peak RSS
+are read from the child's ``wait4()`` rusage once it exits, so nothing is
+polled while it runs.
+
+Programs are started by a small spawner process (see spawner.py) rather than
+forked from this one: fork would copy the Django process, and the child's
+peak RSS would start out at the judge's own size. Python solutions can also
+run directly in a fork of the spawner, skipping interpreter startup.
+"""
+import itertools
+import json
+import math
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from collections import namedtuple
+from django.conf import settings
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+# status is one of 'OK', 'TLE', 'MLE', 'OLE', 'RE' or 'KILLED'; cpu_time in seconds, memory in KB
+RunResult = namedtuple('RunResult', ['status', 'exit_code', 'cpu_time', 'wall_time', 'memory'])
+
+# Address space is not resident memory: interpreters and shared libraries map far
+# more than they touch, so RLIMIT_AS gets headroom and MLE is decided on peak RSS,
+# or on a failed allocation when a program hits RLIMIT_AS first
+ADDRESS_SPACE_FACTOR = 2
+ADDRESS_SPACE_SLACK = 64 * 1024 * 1024
+# What Python and C++ runtimes print when an allocation fails, looked for at the end of stderr
+ALLOCATION_FAILURES = (b'MemoryError', b'std::bad_alloc')
+
+class Spawner:
+    """Client for the spawner process, shared by all threads of a judge process"""
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def get(cls):
+        """Return the running spawner, starting (or restarting) it if needed"""
+        with cls._instance_lock:
+            if cls._instance is None or cls._instance.process.poll() is not None:
+                cls._instance = cls()
+            return cls._instance
+
+    def __init__(self):
+        script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'spawner.py')
+        # -I, like the interpreter Python solutions get: site-packages and the
+        # exit()/quit() builtins are set up, the environment and user site are not
+        self.process = subprocess.Popen(
+            [sys.executable, '-I', script],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            close_fds=True,
+        )
+        self._ids = itertools.count(1)
+        self._write_lock = threading.Lock()
+        self._pending_lock = threading.Lock()
+        self._pending = {}  # run id -> [threading.Event, response]
+        self._reader = threading.Thread(target=self._read_responses, daemon=True)
+        self._reader.start()
+
+    def start(self, **request):
+        """Ask the spawner to start a program; returns the run id"""
+        run_id = next(self._ids)
+        with self._pending_lock:
+            self._pending[run_id] = [threading.Event(), None]
+        self._send(dict(request, op='run', id=run_id))
+        return run_id
+
+    def wait(self, run_id):
+        """Block until the program has exited; returns the spawner's response"""
+        with self._pending_lock:
+            event = self._pending[run_id][0]
+        event.wait()
+        with self._pending_lock:
+            response = self._pending.pop(run_id)[1]
+        if response is None:
+            raise RuntimeError('Judge spawner process exited unexpectedly')
+        return response
+
+    def kill(self, run_id):
+        """SIGKILL the program; a no-op once it has been reaped"""
+        try:
+            self._send({'op': 'kill', 'id': run_id})
+        except OSError:
+            pass
+
+    def _send(self, message):
+        with self._write_lock:
+            self.process.stdin.write(json.dumps(message).encode('utf-8') + b'\n')
+            self.process.stdin.flush()
+
+    def _read_responses(self):
+        for line in self.process.stdout:
+            response = json.loads(line)
+            with self._pending_lock:
+                entry = self._pending.get(response['id'])
+            if entry is not None:
+                entry[1] = response
+                entry[0].set()
+        # The spawner died: release everyone still waiting
+        with self._pending_lock:
+            for entry in self._pending.values():
+                entry[0].set()
+
+
+class ProcessRunner:
+    """Runs one program once under CPU, memory and wall-clock limits"""
+
+    def __init__(self, time_limit, memory_limit, cwd=None, output_limit=None):
+        self.time_limit = time_limit  # seconds of CPU time
+        self.memory_limit = memory_limit  # bytes
+        self.output_limit = output_limit  # bytes per output file, None for no limit
+        self.wall_time_limit = max(time_limit * 2, time_limit + 1)
+        self.cwd = cwd
+        self.cgroup_root = getattr(settings, 'JUDGE_CGROUP_ROOT', None)
+
+        self._lock = threading.Lock()
+        self._spawner = None
+        self._run_id = None
+        self._process = None  # only set by the portable fallback
+        self._killed = False
+        self._timed_out = False
+
+    def run(self, cmd, stdin_path, stdout_path, stderr_path):
+        """Run ``cmd`` reading stdin from and writing stdout/stderr to the given paths"""
+        if resource is None or not hasattr(os, 'fork'):
+            return self._run_portable(cmd, stdin_path, stdout_path, stderr_path)
+        return self._run_spawned({'argv': list(cmd)}, stdin_path, stdout_path, stderr_path)
+
+    def run_python(self, script, stdin_path, stdout_path, stderr_path):
+        """Run a Python solution in a fork of the spawner's already started interpreter.
+
+        The spawner runs with -I, so the solution sees the same sys.path and builtins as under ``python -I``.
+        """
+        if resource is None or not hasattr(os, 'fork'):
+            return self._run_portable([sys.executable, '-I', script], stdin_path, stdout_path, stderr_path)
+        return self._run_spawned({'python': script}, stdin_path, stdout_path, stderr_path)
+
+    def _run_spawned(self, program, stdin_path, stdout_path, stderr_path):
+        cgroup = self._create_cgroup()
+        address_space = None
+        if not cgroup:
+            address_space = self.memory_limit * ADDRESS_SPACE_FACTOR + ADDRESS_SPACE_SLACK
+
+        spawner = Spawner.get()
+        start_time = time.monotonic()
+        run_id = spawner.start(
+            cwd=self.cwd,
+            stdin=stdin_path,
+            stdout=stdout_path,
+            stderr=stderr_path,
+            cpu=math.ceil(self.time_limit),
+            address_space=address_space,
+            output_limit=self.output_limit,
+            cgroup=cgroup,
+            **program,
+        )
+        with self._lock:
+            self._spawner = spawner
+            self._run_id = run_id
+            if self._killed:
+                spawner.kill(run_id)
+
+        watchdog = threading.Timer(self.wall_time_limit, self._on_wall_timeout)
+        watchdog.daemon = True
+        watchdog.start()
+        try:
+            response = spawner.wait(run_id)
+        finally:
+            watchdog.cancel()
+        wall_time = time.monotonic() - start_time
+
+        exit_code = response['exit_code']
+        cpu_time = response['utime'] + response['stime']
+        memory = response['maxrss']
+        if sys.platform == 'darwin':
+            memory //= 1024  # macOS reports bytes, Linux kilobytes
+        oom_killed = False
+        if cgroup:
+            cgroup_peak, oom_killed = self._read_cgroup(cgroup)
+            memory = max(memory, cgroup_peak // 1024)
+
+        if self._killed and not self._timed_out:
+            result_status = 'KILLED'
+        elif self._timed_out or exit_code == -signal.SIGXCPU or cpu_time > self.time_limit:
+            result_status = 'TLE'
+        elif exit_code == -signal.SIGXFSZ or self._output_limit_reached(stdout_path):
+            result_status = 'OLE'
+        elif oom_killed or memory * 1024 > self.memory_limit:
+            result_status = 'MLE'
+        elif exit_code != 0 and address_space and self._allocation_failed(stderr_path):
+            result_status = 'MLE'
+        elif exit_code != 0:
+            result_status = 'RE'
+        else:
+            result_status = 'OK'
+        return RunResult(result_status, exit_code, cpu_time, wall_time, memory)
+
+    def kill(self):
+        """Kill the program (or stop it from starting) if it is still running"""
+        with self._lock:
+            self._killed = True
+            if self._process is not None:
+                self._process.kill()
+            elif self._run_id is not None:
+                self._spawner.kill(self._run_id)
+
+    def _output_limit_reached(self, stdout_path):
+        # Programs that ignore SIGXFSZ (Python does) see EFBIG and exit on their own
+        try:
+            return self.output_limit is not None and os.path.getsize(stdout_path) >= self.output_limit
+        except OSError:
+            return False
+
+    def _allocation_failed(self, stderr_path):
+        # An allocation past RLIMIT_AS fails before peak RSS gets near the limit
+        try:
+            with open(stderr_path, 'rb') as f:
+                f.seek(max(os.path.getsize(stderr_path) - 4096, 0))
+                tail = f.read()
+        except OSError:
+            return False
+        return any(marker in tail for marker in ALLOCATION_FAILURES)
+
+    def _on_wall_timeout(self):
+        self._timed_out = True
+        self.kill()
+
+    def _create_cgroup(self):
+        """Create a throwaway cgroup v2 with memory.max; None if cgroups are not configured"""
+        if not self.cgroup_root:
+            return None
+        path = os.path.join(self.cgroup_root, f"judge_{uuid.uuid4().hex}")
+        try:
+            os.mkdir(path)
+            with open(os.path.join(path, 'memory.max'), 'w') as f:
+                f.write(str(self.memory_limit))
+            with open(os.path.join(path, 'memory.swap.max'), 'w') as f:
+                f.write('0')
+        except OSError:
+            if os.path.isdir(path):
+                os.rmdir(path)
+            return None
+        return path
+
+    def _read_cgroup(self, path):
+        """Return (peak bytes, oom killed) and remove the cgroup"""
+        peak = 0
+        oom_killed = False
+        try:
+            peak_file = os.path.join(path, 'memory.peak')  # Linux 5.19+
+            if os.path.exists(peak_file):
+                with open(peak_file) as f:
+                    peak = int(f.read().strip())
+            with open(os.path.join(path, 'memory.events')) as f:
+                for line in f:
+                    key, value = line.split()
+                    if key == 'oom_kill' and int(value) > 0:
+                        oom_killed = True
+        except (OSError, ValueError):
+            pass
+        finally:
+            try:
+                os.rmdir(path)
+            except OSError:
+                pass
+        return peak, oom_killed
+
+    def _run_portable(self, cmd, stdin_path, stdout_path, stderr_path):
+        """Fallback without rlimits/rusage (Windows): wall-clock limit only"""
+        start_time = time.monotonic()
+        with open(stdin_path, 'rb') as stdin, \
+             open(stdout_path, 'wb') as stdout, \
+             open(stderr_path, 'wb') as stderr:
+            process = subprocess.Popen(cmd, stdin=stdin, stdout=stdout, stderr=stderr, cwd=self.cwd)
+            with self._lock:
+                self._process = process
+                if self._killed:
+                    process.kill()
+            try:
+                process.wait(timeout=self.time_limit)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+                return RunResult('TLE', process.returncode, self.time_limit, time.monotonic() - start_time, 0)
+        wall_time = time.monotonic() - start_time
+        result_status = 'OK' if process.returncode == 0 else 'RE'
+        if self._output_limit_reached(stdout_path):
+            result_status = 'OLE'
+        if self._killed:
+            result_status = 'KILLED'
+        return RunResult(result_status, process.returncode, wall_time, wall_time, 0)
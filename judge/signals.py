@@ -0,0 +1,7 @@
+from django.dispatch import Signal
+
+
+# Sent by judge.queue_manager once a verdict has been written, inside the same
+# transaction, so tables derived from verdicts commit together with them.
+# Arguments: submission, first_judgement (False when a judged submission is judged again)
+submission_judged = Signal()
@@ -0,0 +1,239 @@
+"""
+Spawner process for judged programs.
+
+Started once per judge process by judge.runner as ``python -I spawner.py``
+and fed line-delimited JSON on stdin. Programs are forked from this small
+interpreter instead of from the Django process, which keeps fork cheap and
+keeps wait4() peak RSS honest: a child's ru_maxrss starts at the RSS of the
+process it was forked from.
+
+Python solutions ("python" instead of "argv") are not exec'd at all: the fork
+of this already running interpreter applies the limits and runs the solution's
+precompiled code, so interpreter startup is paid once per judge process
+instead of once per test case.
+
+Requests:
+    {"op": "run", "id": 1, "argv": [...] or "python": "/path/solution.py", "cwd": "...", "stdin": "...",
+     "stdout": "...", "stderr": "...", "cpu": 2, "address_space": 335544320, "output_limit": 67108864,
+     "cgroup": null}
+    {"op": "kill", "id": 1}
+Responses (one per run, when the program has exited and been reaped):
+    {"id": 1, "exit_code": 0, "utime": 0.01, "stime": 0.0, "maxrss": 1620}
+
+Only the standard library may be imported here.
+"""
+import atexit
+import builtins
+import json
+import os
+import resource
+import select
+import signal
+import sys
+import types
+from collections import OrderedDict
+
+
+# Python solutions compiled in this process, so each test case skips parsing;
+# (path, mtime, size) -> code object
+compiled_scripts = OrderedDict()
+MAX_COMPILED_SCRIPTS = 32
+
+
+def compile_script(path):
+    """Code object for a Python solution, or None if it does not compile (the child reports it)"""
+    stat = os.stat(path)
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    if key in compiled_scripts:
+        compiled_scripts.move_to_end(key)
+        return compiled_scripts[key]
+    try:
+        with open(path, 'rb') as f:
+            code = compile(f.read(), path, 'exec')
+    except Exception:
+        return None
+    compiled_scripts[key] = code
+    while len(compiled_scripts) > MAX_COMPILED_SCRIPTS:
+        compiled_scripts.popitem(last=False)
+    return code
+
+
+def start_child(request):
+    """Fork and exec one program (or run a Python solution in the fork); never returns in the child"""
+    code = None
+    if request.get('python'):
+        try:
+            code = compile_script(request['python'])
+        except OSError:
+            pass
+
+    pid = os.fork()
+    if pid:
+        return pid
+    try:
+        # Other submissions' code has no business in this child
+        compiled_scripts.clear()
+        signal.set_wakeup_fd(-1)
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+        if not request.get('python'):
+            # Python ignores SIGPIPE and SIGXFSZ, and ignored signals survive exec
+            for signum in (signal.SIGPIPE, signal.SIGXFSZ):
+                signal.signal(signum, signal.SIG_DFL)
+
+        stdin_fd = os.open(request['stdin'], os.O_RDONLY)
+        stdout_fd = os.open(request['stdout'], os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        stderr_fd = os.open(request['stderr'], os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        os.dup2(stdin_fd, 0)
+        os.dup2(stdout_fd, 1)
+        os.dup2(stderr_fd, 2)
+        os.closerange(3, os.sysconf('SC_OPEN_MAX'))
+        if request.get('cwd'):
+            os.chdir(request['cwd'])
+
+        cpu = request['cpu']
+        # SIGXCPU at the soft limit, SIGKILL one second later if it is ignored
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu + 1))
+        resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+        if request.get('address_space'):
+            limit = request['address_space']
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        if request.get('output_limit'):
+            # Writes past the limit raise SIGXFSZ (or fail with EFBIG if it is ignored)
+            limit = request['output_limit']
+            resource.setrlimit(resource.RLIMIT_FSIZE, (limit, limit))
+        if request.get('cgroup'):
+            with open(os.path.join(request['cgroup'], 'cgroup.procs'), 'w') as f:
+                f.write(str(os.getpid()))
+
+        if request.get('python'):
+            os._exit(run_python(request['python'], code))
+        os.execvp(request['argv'][0], request['argv'])
+    except BaseException:
+        pass
+    os._exit(127)
+
+
+def run_python(path, code):
+    """Run a Python solution in this (forked) interpreter, set up like ``python -I path``
+
+    The interpreter was started with -I as well, so sys.path, site-packages and
+    the site builtins (exit, quit, help) are the same. Unlike a fresh
+    interpreter, modules the spawner imported are already in sys.modules.
+    """
+    sys.stdin = open(0, 'r', encoding='utf-8', closefd=False)
+    sys.stdout = open(1, 'w', encoding='utf-8', closefd=False)
+    sys.stderr = open(2, 'w', encoding='utf-8', errors='backslashreplace', closefd=False)
+    sys.argv = [path]
+    main_module = types.ModuleType('__main__')
+    main_module.__file__ = path
+    main_module.__builtins__ = builtins
+    sys.modules['__main__'] = main_module
+
+    exit_code = 0
+    try:
+        if code is None:
+            with open(path, 'rb') as f:
+                code = compile(f.read(), path, 'exec')
+        exec(code, main_module.__dict__)
+    except SystemExit as e:
+        exit_code = system_exit_code(e)
+    except BaseException:
+        import traceback
+        traceback.print_exc()
+        exit_code = 1
+
+    # What interpreter shutdown would do: join threads, run atexit hooks, flush
+    try:
+        if 'threading' in sys.modules:
+            sys.modules['threading']._shutdown()
+        atexit._run_exitfuncs()
+    except SystemExit as e:
+        exit_code = system_exit_code(e)
+    except BaseException:
+        exit_code = exit_code or 1
+    for stream in (sys.stdout, sys.stderr):
+        try:
+            stream.flush()
+        except BaseException:
+            # Same status as an interpreter that cannot flush stdout at exit
+            exit_code = exit_code or 120
+    return exit_code
+
+
+def system_exit_code(exc):
+    if exc.code is None:
+        return 0
+    if isinstance(exc.code, int):
+        return exc.code & 0xff
+    try:
+        print(exc.code, file=sys.stderr)
+    except BaseException:
+        pass
+    return 1
+
+
+def main():
+    requests_fd = sys.stdin.fileno()
+    responses = sys.stdout
+
+    # SIGCHLD only has to interrupt select(); the wakeup fd does the rest
+    wakeup_read, wakeup_write = os.pipe()
+    os.set_blocking(wakeup_write, False)
+    signal.set_wakeup_fd(wakeup_write)
+    signal.signal(signal.SIGCHLD, lambda signum, frame: None)
+
+    running = {}  # pid -> run id
+    pids = {}  # run id -> pid
+    buffer = b''
+    parent_alive = True
+
+    while parent_alive or running:
+        readable, _, _ = select.select([requests_fd, wakeup_read] if parent_alive else [wakeup_read], [], [])
+
+        if wakeup_read in readable:
+            os.read(wakeup_read, 4096)
+
+        if requests_fd in readable:
+            data = os.read(requests_fd, 65536)
+            if not data:
+                # The judge process went away: nothing will collect the results
+                parent_alive = False
+                for pid in running:
+                    os.kill(pid, signal.SIGKILL)
+            buffer += data
+            while b'\n' in buffer:
+                line, buffer = buffer.split(b'\n', 1)
+                request = json.loads(line)
+                if request['op'] == 'run':
+                    pid = start_child(request)
+                    running[pid] = request['id']
+                    pids[request['id']] = pid
+                elif request['op'] == 'kill':
+                    # Only pids that have not been reaped yet, so a recycled pid is never hit
+                    pid = pids.get(request['id'])
+                    if pid is not None:
+                        os.kill(pid, signal.SIGKILL)
+
+        # Reap everything that has exited; reaping only happens here, after kills
+        while running:
+            try:
+                pid, status, rusage = os.wait4(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                break
+            run_id = running.pop(pid)
+            del pids[run_id]
+            if parent_alive:
+                responses.write(json.dumps({
+                    'id': run_id,
+                    'exit_code': os.waitstatus_to_exitcode(status),
+                    'utime': rusage.ru_utime,
+                    'stime': rusage.ru_stime,
+                    'maxrss': rusage.ru_maxrss,
+                }) + '\n')
+                responses.flush()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+Per-process cache of problem test sets.
+
+The judge used to query every test case of a problem for every submission.
+Test sets are now cached in each judge process, keyed by
+(problem id, Problem.test_data_version). The version is bumped whenever a
+test case is added, edited or deleted, so a changed test set is simply a
+cache miss. Problems are evicted least recently used first once more than
+JUDGE_TEST_SET_CACHE_SIZE are cached.
+
+Entries only describe where the data lives (the test data itself is in files,
+see problems.test_data), so they stay small however large the tests are.
+"""
+import threading
+from collections import OrderedDict, namedtuple
+from django.conf import settings
+
+
+TestCaseFiles = namedtuple('TestCaseFiles', ['id', 'input_path', 'output_path', 'is_sample'])
+
+
+def load_test_set(problem):
+    """All test cases of ``problem`` in id order, straight from the database"""
+    from problems.models import TestCase
+
+    test_cases = TestCase.objects.filter(problem_id=problem.id).only(
+        'id', 'problem_id', 'input_hash', 'output_hash', 'is_sample'
+    ).order_by('id')
+    return tuple(
+        TestCaseFiles(test_case.id, test_case.input_path, test_case.output_path, test_case.is_sample)
+        for test_case in test_cases
+    )
+
+
+class TestSetCache:
+    def __init__(self, max_problems):
+        self.max_problems = max_problems
+        self._entries = OrderedDict()  # problem id -> (version, test cases)
+        self._lock = threading.Lock()
+
+    def get(self, problem):
+        """Test cases of ``problem``, loading them on a miss"""
+        with self._lock:
+            entry = self._entries.get(problem.id)
+            if entry is not None and entry[0] == problem.test_data_version:
+                self._entries.move_to_end(problem.id)
+                return entry[1]
+
+        test_cases = load_test_set(problem)
+        with self._lock:
+            # Replaces any entry for an older version of the problem
+            self._entries[problem.id] = (problem.test_data_version, test_cases)
+            self._entries.move_to_end(problem.id)
+            while len(self._entries) > self.max_problems:
+                self._entries.popitem(last=False)
+        return test_cases
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_test_set_cache = None
+_test_set_cache_lock = threading.Lock()
+
+
+def get_test_set(problem, sample_only=False):
+    """Test cases of a problem (only samples if ``sample_only``), cached per process"""
+    global _test_set_cache
+
+    max_problems = getattr(settings, 'JUDGE_TEST_SET_CACHE_SIZE', 64)
+    if max_problems > 0:
+        with _test_set_cache_lock:
+            if _test_set_cache is None:
+                _test_set_cache = TestSetCache(max_problems)
+        test_cases = _test_set_cache.get(problem)
+    else:
+        test_cases = load_test_set(problem)
+
+    if sample_only:
+        return [test_case for test_case in test_cases if test_case.is_sample]
+    return list(test_cases)
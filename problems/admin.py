@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import Category, Problem, TestCase
+from .forms import TestCaseForm
+from .models import Category, Problem, ProblemStats, Tag, TestCase
 
 
 @admin.register(Category)
@@ -8,8 +9,15 @@ class CategoryAdmin(admin.ModelAdmin):
     search_fields = ['name']
 
 
+@admin.register(Tag)
+class TagAdmin(admin.ModelAdmin):
+    list_display = ['name', 'problem_count', 'created_at']
+    search_fields = ['name']
+
+
 class TestCaseInline(admin.TabularInline):
     model = TestCase
+    form = TestCaseForm
     extra = 1
 
 
@@ -17,7 +25,8 @@ class TestCaseInline(admin.TabularInline):
 class ProblemAdmin(admin.ModelAdmin):
     list_display = ['title', 'category', 'difficulty', 'created_by', 'is_active', 'created_at']
     list_filter = ['difficulty', 'category', 'is_active', 'created_at']
-    search_fields = ['title', 'tags']
+    search_fields = ['title', 'tags__name']
+    filter_horizontal = ['tags']
     prepopulated_fields = {'slug': ('title',)}
     inlines = [TestCaseInline]
     
@@ -29,6 +38,17 @@ class ProblemAdmin(admin.ModelAdmin):
 
 @admin.register(TestCase)
 class TestCaseAdmin(admin.ModelAdmin):
+    form = TestCaseForm
     list_display = ['problem', 'is_sample', 'created_at']
     list_filter = ['is_sample', 'created_at']
-    search_fields = ['problem__title']
\ No newline at end of file
+    readonly_fields = ['input_hash', 'output_hash']
+    search_fields = ['problem__title']
+
+@admin.register(ProblemStats)
+class ProblemStatsAdmin(admin.ModelAdmin):
+    list_display = ['problem', 'solved_by', 'total_submissions', 'ac_submissions', 'acceptance_rate']
+    search_fields = ['problem__title']
+    
+    def has_change_permission(self, request, obj=None):
+        # Derived from submissions
+        return False
@@ -0,0 +1,56 @@
+"""
+Facet counts of the public problem list.
+
+The filter sidebar shows how many problems each difficulty, category and tag
+has. Those counts are stored rather than computed per request: per tag in
+Tag.problem_count, per (category, difficulty) in ProblemFacet, from which the
+difficulty counts within a category and the category counts within a
+difficulty are summed. ``refresh_facet_counts`` recounts them after any commit
+that changed a problem or its tags (receivers in problems.models); problems
+are edited rarely, the list is read all the time.
+"""
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+
+PUBLIC_PROBLEMS = Q(is_active=True, contest_only=False)
+
+
+def refresh_facet_counts():
+    """Recount ProblemFacet rows and Tag.problem_count from the public problems"""
+    from .models import Problem, ProblemFacet, Tag
+
+    facets = [
+        ProblemFacet(category_id=row['category_id'], difficulty=row['difficulty'], problem_count=row['problems'])
+        for row in Problem.objects.filter(PUBLIC_PROBLEMS).values('category_id', 'difficulty').annotate(
+            problems=Count('id')
+        ).order_by()
+    ]
+    tags = list(Tag.objects.annotate(public_problems=Count(
+        'problems', filter=Q(problems__is_active=True, problems__contest_only=False)
+    )).only('id', 'problem_count'))
+    changed = [tag for tag in tags if tag.problem_count != tag.public_problems]
+    for tag in changed:
+        tag.problem_count = tag.public_problems
+
+    with transaction.atomic():
+        ProblemFacet.objects.all().delete()
+        ProblemFacet.objects.bulk_create(facets)
+        Tag.objects.bulk_update(changed, ['problem_count'], batch_size=500)
+
+
+def facet_counts(category_id=None, difficulty=None):
+    """Sidebar counts: each difficulty within the chosen category, each category within the chosen difficulty,
+    and every tag in use"""
+    from .models import Category, Problem, ProblemFacet, Tag
+
+    in_category = ProblemFacet.objects.filter(category_id=category_id) if category_id else ProblemFacet.objects.all()
+    per_difficulty = dict(in_category.values_list('difficulty').annotate(problems=Sum('problem_count')).order_by())
+
+    at_difficulty = ProblemFacet.objects.filter(difficulty=difficulty) if difficulty else ProblemFacet.objects.all()
+    per_category = dict(at_difficulty.values_list('category_id').annotate(problems=Sum('problem_count')).order_by())
+
+    return {
+        'difficulties': [(value, label, per_difficulty.get(value, 0)) for value, label in Problem.DIFFICULTY_CHOICES],
+        'categories': [(category, per_category.get(category.id, 0)) for category in Category.objects.all()],
+        'tags': Tag.objects.filter(problem_count__gt=0),
+    }
@@ -31,15 +31,28 @@ class ProblemForm(forms.ModelForm):
 
 
 class TestCaseForm(forms.ModelForm):
+    # Test data is stored in files, not model fields (see problems.test_data)
+    input_data = forms.CharField(widget=forms.Textarea(attrs={'class': 'textarea textarea-bordered w-full', 'rows': 4}))
+    expected_output = forms.CharField(widget=forms.Textarea(attrs={'class': 'textarea textarea-bordered w-full', 'rows': 4}))
+    
     class Meta:
         model = TestCase
-        fields = ['input_data', 'expected_output', 'is_sample', 'note']
+        fields = ['is_sample', 'note']
         widgets = {
-            'input_data': forms.Textarea(attrs={'class': 'textarea textarea-bordered w-full', 'rows': 4}),
-            'expected_output': forms.Textarea(attrs={'class': 'textarea textarea-bordered w-full', 'rows': 4}),
             'is_sample': forms.CheckboxInput(attrs={'class': 'checkbox'}),
             'note': forms.TextInput(attrs={'class': 'input input-bordered w-full', 'placeholder': 'Optional note...'}),
         }
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.pk:
+            self.initial.setdefault('input_data', self.instance.input_data)
+            self.initial.setdefault('expected_output', self.instance.expected_output)
+    
+    def save(self, commit=True):
+        self.instance.input_data = self.cleaned_data['input_data']
+        self.instance.expected_output = self.cleaned_data['expected_output']
+        return super().save(commit)
 
 
 class TestCaseFileForm(forms.Form):
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from problems.models import Problem
+from problems.stats import rebuild_problem_stats
+
+
+class Command(BaseCommand):
+    help = 'Recompute problem acceptance stats from submission history (e.g. nightly, to reconcile the live counters)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('slugs', nargs='*', help='Problems to rebuild (default: all)')
+
+    def handle(self, *args, **options):
+        problem_ids = None
+        if options['slugs']:
+            problem_ids = list(Problem.objects.filter(slug__in=options['slugs']).values_list('id', flat=True))
+
+        changed = rebuild_problem_stats(problem_ids)
+        self.stdout.write(self.style.SUCCESS(f'Updated {changed} problem stats.'))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from problems.models import Problem
+from problems.search import index_problems
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the problem search index (it is otherwise updated as problems are edited)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('slugs', nargs='*', help='Problems to reindex (default: all)')
+
+    def handle(self, *args, **options):
+        problems = Problem.objects.all()
+        if options['slugs']:
+            problems = problems.filter(slug__in=options['slugs'])
+
+        problem_ids = list(problems.values_list('id', flat=True))
+        index_problems(problem_ids)
+        self.stdout.write(self.style.SUCCESS(f'Indexed {len(problem_ids)} problems.'))
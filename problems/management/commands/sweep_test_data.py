@@ -0,0 +1,15 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from problems.test_data import sweep_test_data
+
+
+class Command(BaseCommand):
+    help = 'Delete stored test data files that no test case has referred to for a while'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--minutes', type=float, default=getattr(settings, 'TEST_DATA_SWEEP_GRACE_MINUTES', 60),
+                            help='Keep unreferenced files newer than this many minutes')
+
+    def handle(self, *args, **options):
+        removed = sweep_test_data(options['minutes'] * 60)
+        self.stdout.write(self.style.SUCCESS(f'Deleted {removed} test data files.'))
@@ -0,0 +1,46 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:10
+
+from django.db import migrations, models
+
+
+def move_test_data_to_files(apps, schema_editor):
+    from problems.test_data import save_test_data
+
+    TestCase = apps.get_model('problems', 'TestCase')
+    for test_case in TestCase.objects.only('id', 'problem_id', 'input_data', 'expected_output').iterator():
+        test_case.input_hash = save_test_data(test_case.problem_id, test_case.input_data)
+        test_case.output_hash = save_test_data(test_case.problem_id, test_case.expected_output)
+        test_case.save(update_fields=['input_hash', 'output_hash'])
+
+
+def move_test_data_to_database(apps, schema_editor):
+    from problems.test_data import read_test_data
+
+    TestCase = apps.get_model('problems', 'TestCase')
+    for test_case in TestCase.objects.iterator():
+        test_case.input_data = read_test_data(test_case.problem_id, test_case.input_hash)
+        test_case.expected_output = read_test_data(test_case.problem_id, test_case.output_hash)
+        test_case.save(update_fields=['input_data', 'expected_output'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('problems', '0002_problem_sample_note_testcase_note'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='testcase',
+            name='input_hash',
+            field=models.CharField(default='', editable=False, max_length=64),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='testcase',
+            name='output_hash',
+            field=models.CharField(default='', editable=False, max_length=64),
+            preserve_default=False,
+        ),
+        migrations.RunPython(move_test_data_to_files, move_test_data_to_database),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('problems', '0003_testcase_input_hash_output_hash'),
+    ]
+
+    operations = [
+        # A default lets the columns be re-added (and refilled by 0003) on rollback
+        migrations.AlterField(
+            model_name='testcase',
+            name='expected_output',
+            field=models.TextField(default=''),
+        ),
+        migrations.AlterField(
+            model_name='testcase',
+            name='input_data',
+            field=models.TextField(default=''),
+        ),
+        migrations.RemoveField(
+            model_name='testcase',
+            name='expected_output',
+        ),
+        migrations.RemoveField(
+            model_name='testcase',
+            name='input_data',
+        ),
+    ]
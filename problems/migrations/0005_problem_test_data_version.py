@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('problems', '0004_remove_testcase_input_data_expected_output'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='problem',
+            name='test_data_version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
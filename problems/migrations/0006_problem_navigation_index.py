@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('problems', '0005_problem_test_data_version'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='problem',
+            index=models.Index(fields=['is_active', 'contest_only', 'created_at', 'id'], name='problems_pr_is_acti_ff305a_idx'),
+        ),
+    ]
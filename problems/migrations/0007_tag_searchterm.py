@@ -0,0 +1,88 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:41
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def copy_tags(apps, schema_editor):
+    """Turn the comma-separated tag strings into Tag rows"""
+    Problem = apps.get_model('problems', 'Problem')
+    Tag = apps.get_model('problems', 'Tag')
+    tags = {}
+    for problem in Problem.objects.exclude(tag_names='').only('id', 'tag_names'):
+        names = {' '.join(name.lower().split()) for name in problem.tag_names.split(',')}
+        names.discard('')
+        for name in names:
+            if name not in tags:
+                tags[name], _ = Tag.objects.get_or_create(name=name[:50])
+        problem.tags.add(*(tags[name] for name in names))
+
+
+def copy_tags_back(apps, schema_editor):
+    Problem = apps.get_model('problems', 'Problem')
+    for problem in Problem.objects.prefetch_related('tags'):
+        problem.tag_names = ', '.join(tag.name for tag in problem.tags.all())[:200]
+        problem.save(update_fields=['tag_names'])
+
+
+def build_search_index(apps, schema_editor):
+    """Index the existing problems, as rebuild_search_index does"""
+    from problems.search import problem_terms
+
+    Problem = apps.get_model('problems', 'Problem')
+    SearchTerm = apps.get_model('problems', 'SearchTerm')
+    terms = [
+        SearchTerm(problem_id=problem.id, term=term, weight=weight)
+        for problem in Problem.objects.prefetch_related('tags')
+        for term, weight in problem_terms(problem).items()
+    ]
+    SearchTerm.objects.bulk_create(terms, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('problems', '0006_problem_navigation_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.RenameField(
+            model_name='problem',
+            old_name='tags',
+            new_name='tag_names',
+        ),
+        migrations.AddField(
+            model_name='problem',
+            name='tags',
+            field=models.ManyToManyField(blank=True, related_name='problems', to='problems.tag'),
+        ),
+        migrations.RunPython(copy_tags, copy_tags_back),
+        migrations.RemoveField(
+            model_name='problem',
+            name='tag_names',
+        ),
+        migrations.CreateModel(
+            name='SearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=50)),
+                ('weight', models.PositiveIntegerField()),
+                ('problem', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', to='problems.problem')),
+            ],
+            options={
+                'unique_together': {('term', 'problem')},
+            },
+        ),
+        migrations.RunPython(build_search_index, migrations.RunPython.noop),
+    ]
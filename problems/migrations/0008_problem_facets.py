@@ -0,0 +1,47 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:45
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count, Q
+
+
+def count_facets(apps, schema_editor):
+    Problem = apps.get_model('problems', 'Problem')
+    ProblemFacet = apps.get_model('problems', 'ProblemFacet')
+    Tag = apps.get_model('problems', 'Tag')
+    public = Q(is_active=True, contest_only=False)
+    ProblemFacet.objects.bulk_create([
+        ProblemFacet(category_id=row['category_id'], difficulty=row['difficulty'], problem_count=row['problems'])
+        for row in Problem.objects.filter(public).values('category_id', 'difficulty').annotate(problems=Count('id')).order_by()
+    ])
+    for tag in Tag.objects.annotate(public_problems=Count('problems', filter=Q(problems__is_active=True, problems__contest_only=False))):
+        tag.problem_count = tag.public_problems
+        tag.save(update_fields=['problem_count'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('problems', '0007_tag_searchterm'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tag',
+            name='problem_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.CreateModel(
+            name='ProblemFacet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('difficulty', models.CharField(choices=[('Easy', 'Easy'), ('Medium', 'Medium'), ('Hard', 'Hard')], max_length=10)),
+                ('problem_count', models.PositiveIntegerField(default=0)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='facets', to='problems.category')),
+            ],
+            options={
+                'unique_together': {('category', 'difficulty')},
+            },
+        ),
+        migrations.RunPython(count_facets, migrations.RunPython.noop),
+    ]
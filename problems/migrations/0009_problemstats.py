@@ -0,0 +1,50 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:47
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def count_submissions(apps, schema_editor):
+    from problems.stats import STAT_FIELDS, stats_by_problem
+
+    Problem = apps.get_model('problems', 'Problem')
+    ProblemStats = apps.get_model('problems', 'ProblemStats')
+    Submission = apps.get_model('submissions', 'Submission')
+
+    stats = stats_by_problem(Submission.objects.all())
+    empty = dict.fromkeys(STAT_FIELDS, 0)
+    ProblemStats.objects.bulk_create([
+        ProblemStats(problem_id=problem_id, **stats.get(problem_id, empty))
+        for problem_id in Problem.objects.values_list('id', flat=True)
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('problems', '0008_problem_facets'),
+        ('submissions', '0004_rejudge'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProblemStats',
+            fields=[
+                ('problem', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='problems.problem')),
+                ('solved_by', models.IntegerField(default=0, help_text='Users with an accepted submission')),
+                ('total_submissions', models.IntegerField(default=0)),
+                ('ac_submissions', models.IntegerField(default=0)),
+                ('c_submissions', models.IntegerField(default=0)),
+                ('c_ac_submissions', models.IntegerField(default=0)),
+                ('cpp_submissions', models.IntegerField(default=0)),
+                ('cpp_ac_submissions', models.IntegerField(default=0)),
+                ('python_submissions', models.IntegerField(default=0)),
+                ('python_ac_submissions', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'Problem stats',
+                'indexes': [models.Index(fields=['solved_by'], name='problems_pr_solved__45042d_idx')],
+            },
+        ),
+        migrations.RunPython(count_submissions, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,10 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
+from django.db.models import F, Q
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from judge.signals import submission_judged
+from .test_data import read_test_data, save_test_data, test_data_path
 
 
 class Category(models.Model):
@@ -14,6 +19,28 @@ class Category(models.Model):
         return self.name
 
 
+class Tag(models.Model):
+    # Stored lowercase (see normalize_name), so "DP" and "dp" are one tag
+    name = models.CharField(max_length=50, unique=True)
+    # Active problems outside contests with this tag, kept by problems.facets
+    problem_count = models.PositiveIntegerField(default=0, editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['name']
+    
+    def __str__(self):
+        return self.name
+    
+    def save(self, *args, **kwargs):
+        self.name = self.normalize_name(self.name)
+        super().save(*args, **kwargs)
+    
+    @staticmethod
+    def normalize_name(name):
+        return ' '.join(name.lower().split())
+
+
 class Problem(models.Model):
     DIFFICULTY_CHOICES = [
         ('Easy', 'Easy'),
@@ -34,12 +61,14 @@ class Problem(models.Model):
     time_limit = models.IntegerField(default=2)  # seconds
     memory_limit = models.IntegerField(default=128)  # MB
     category = models.ForeignKey(Category, on_delete=models.CASCADE)
-    tags = models.CharField(max_length=200, blank=True, help_text="Comma-separated tags")
+    tags = models.ManyToManyField(Tag, related_name='problems', blank=True)
     created_by = models.ForeignKey(User, on_delete=models.CASCADE)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)
     contest_only = models.BooleanField(default=False, help_text="Hide from public problem list, show only in contests")
+    # Bumped whenever a test case is added, edited or deleted; judge workers key cached test sets on it
+    test_data_version = models.PositiveIntegerField(default=0, editable=False)
     
     class Meta:
         ordering = ['created_at']
@@ -47,6 +76,7 @@ class Problem(models.Model):
             models.Index(fields=['is_active', 'contest_only']),  # Problem list filtering
             models.Index(fields=['category', 'difficulty']),     # Category + difficulty filtering
             models.Index(fields=['created_at']),                 # Ordering
+            models.Index(fields=['is_active', 'contest_only', 'created_at', 'id']),  # Prev/next navigation
             models.Index(fields=['slug']),                       # URL lookups
             models.Index(fields=['created_by']),                 # Admin queries
         ]
@@ -54,14 +84,38 @@ class Problem(models.Model):
     def __str__(self):
         return self.title
     
+    def save(self, *args, **kwargs):
+        # test_data_version is only changed by the TestCase signals; never write
+        # back the stale copy held by an edit form
+        if not self._state.adding and 'update_fields' not in kwargs:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'test_data_version'
+            ]
+        super().save(*args, **kwargs)
+    
     def get_tags_list(self):
-        return [tag.strip() for tag in self.tags.split(',') if tag.strip()]
+        return [tag.name for tag in self.tags.all()]
+    
+    def get_adjacent_problems(self):
+        """(previous, next) practice problem in archive order (created_at, then id)"""
+        if not self.is_active or self.contest_only:
+            return None, None
+        archive = Problem.objects.filter(is_active=True, contest_only=False).only('slug', 'title', 'created_at')
+        prev_problem = archive.filter(
+            Q(created_at__lt=self.created_at) | Q(created_at=self.created_at, id__lt=self.id)
+        ).order_by('-created_at', '-id').first()
+        next_problem = archive.filter(
+            Q(created_at__gt=self.created_at) | Q(created_at=self.created_at, id__gt=self.id)
+        ).order_by('created_at', 'id').first()
+        return prev_problem, next_problem
 
 
 class TestCase(models.Model):
     problem = models.ForeignKey(Problem, on_delete=models.CASCADE, related_name='test_cases')
-    input_data = models.TextField()
-    expected_output = models.TextField()
+    # sha256 of the input / expected output files (see problems.test_data)
+    input_hash = models.CharField(max_length=64, editable=False)
+    output_hash = models.CharField(max_length=64, editable=False)
     is_sample = models.BooleanField(default=False)
     note = models.CharField(max_length=200, blank=True, help_text="Optional note for this test case")
     created_at = models.DateTimeField(auto_now_add=True)
@@ -72,4 +126,215 @@ class TestCase(models.Model):
         ]
     
     def __str__(self):
-        return f"Test case for {self.problem.title}"
\ No newline at end of file
+        return f"Test case for {self.problem.title}"
+    
+    @property
+    def input_data(self):
+        return self._get_test_data('input')
+    
+    @input_data.setter
+    def input_data(self, value):
+        self._set_test_data('input', value)
+    
+    @property
+    def expected_output(self):
+        return self._get_test_data('output')
+    
+    @expected_output.setter
+    def expected_output(self, value):
+        self._set_test_data('output', value)
+    
+    @property
+    def input_path(self):
+        """Stored input file, fed directly to the program as stdin"""
+        return test_data_path(self.problem_id, self.input_hash)
+    
+    @property
+    def output_path(self):
+        return test_data_path(self.problem_id, self.output_hash)
+    
+    def _get_test_data(self, kind):
+        data = self.__dict__.setdefault('_test_data', {})
+        if kind not in data:
+            data[kind] = read_test_data(self.problem_id, getattr(self, f'{kind}_hash'))
+        return data[kind]
+    
+    def _set_test_data(self, kind, value):
+        # Written to storage on save(), once problem_id is known
+        self.__dict__.setdefault('_test_data', {})[kind] = value
+        self.__dict__.setdefault('_unsaved_test_data', set()).add(kind)
+    
+    def save(self, *args, **kwargs):
+        unsaved = self.__dict__.pop('_unsaved_test_data', set())
+        # Empty data is stored too, so input_path always names a real file
+        unsaved.update(kind for kind in ('input', 'output') if not getattr(self, f'{kind}_hash'))
+        for kind in unsaved:
+            field = f'{kind}_hash'
+            setattr(self, field, save_test_data(self.problem_id, self._get_test_data(kind)))
+        # Replaced files stay for judges still using them; sweep_test_data removes them later
+        super().save(*args, **kwargs)
+
+
+class ProblemFacet(models.Model):
+    """Number of problems in the public list per category and difficulty, kept by problems.facets"""
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='facets')
+    difficulty = models.CharField(max_length=10, choices=Problem.DIFFICULTY_CHOICES)
+    problem_count = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        unique_together = ['category', 'difficulty']
+    
+    def __str__(self):
+        return f"{self.category.name} / {self.difficulty}: {self.problem_count}"
+
+
+class ProblemStats(models.Model):
+    """Acceptance counters of a problem, kept by problems.stats (test runs excluded)"""
+    problem = models.OneToOneField(Problem, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    solved_by = models.IntegerField(default=0, help_text="Users with an accepted submission")
+    total_submissions = models.IntegerField(default=0)
+    ac_submissions = models.IntegerField(default=0)
+    c_submissions = models.IntegerField(default=0)
+    c_ac_submissions = models.IntegerField(default=0)
+    cpp_submissions = models.IntegerField(default=0)
+    cpp_ac_submissions = models.IntegerField(default=0)
+    python_submissions = models.IntegerField(default=0)
+    python_ac_submissions = models.IntegerField(default=0)
+    
+    class Meta:
+        verbose_name_plural = 'Problem stats'
+        indexes = [
+            models.Index(fields=['solved_by']),                  # Problem list sorted by solves
+        ]
+    
+    def __str__(self):
+        return f"{self.problem.title}: solved by {self.solved_by}"
+    
+    @property
+    def acceptance_rate(self):
+        """Accepted share of judged submissions, in percent"""
+        if not self.total_submissions:
+            return 0
+        return round(self.ac_submissions * 100 / self.total_submissions, 1)
+    
+    def language_breakdown(self):
+        """[(language name, submissions, accepted)] for languages that were used"""
+        from .stats import LANGUAGE_COUNTERS
+        from submissions.models import Submission
+        
+        names = dict(Submission.LANGUAGE_CHOICES)
+        return [
+            (names.get(language, language), getattr(self, total), getattr(self, accepted))
+            for language, (total, accepted) in LANGUAGE_COUNTERS.items()
+            if getattr(self, total)
+        ]
+
+
+class SearchTerm(models.Model):
+    """A posting of the problem search index (problems.search): a word of the problem and its weight"""
+    problem = models.ForeignKey(Problem, on_delete=models.CASCADE, related_name='search_terms')
+    term = models.CharField(max_length=50)
+    weight = models.PositiveIntegerField()
+    
+    class Meta:
+        unique_together = ['term', 'problem']  # Also serves term (prefix) lookups
+    
+    def __str__(self):
+        return f"{self.term} ({self.problem_id})"
+
+
+@receiver(post_save, sender=TestCase)
+@receiver(post_delete, sender=TestCase)
+def bump_test_data_version(sender, instance, **kwargs):
+    Problem.objects.filter(id=instance.problem_id).update(test_data_version=F('test_data_version') + 1)
+
+
+@receiver(post_save, sender=Problem)
+@receiver(post_delete, sender=Problem)
+def invalidate_problem_pages(sender, instance, **kwargs):
+    from Online_Judge.page_cache import forget_fragment, invalidate
+    forget_fragment('problem_statement', instance.id)
+    invalidate('problems')
+
+
+@receiver(post_save, sender=TestCase)
+@receiver(post_delete, sender=TestCase)
+def invalidate_problem_samples(sender, instance, **kwargs):
+    # Sample test cases are part of the statement
+    from Online_Judge.page_cache import forget_fragment
+    forget_fragment('problem_statement', instance.problem_id)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_pages(sender, instance, **kwargs):
+    from Online_Judge.page_cache import invalidate
+    invalidate('problems')
+
+
+@receiver(post_save, sender=Problem)
+def index_saved_problem(sender, instance, **kwargs):
+    from .search import index_problem
+    index_problem(instance)
+
+
+@receiver(m2m_changed, sender=Problem.tags.through)
+def index_retagged_problems(sender, instance, action, reverse, pk_set, **kwargs):
+    # instance is the problem, or the tag when edited from the tag side
+    if reverse and action == 'pre_clear':
+        instance._retagged_problem_ids = list(instance.problems.values_list('id', flat=True))
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    from Online_Judge.page_cache import invalidate
+    from .search import index_problems
+    if not reverse:
+        index_problems([instance.id])
+    elif action == 'post_clear':
+        index_problems(instance._retagged_problem_ids)
+    else:
+        index_problems(pk_set)
+    invalidate('problems')
+
+
+@receiver(pre_delete, sender=Tag)
+def remember_tagged_problems(sender, instance, **kwargs):
+    instance._retagged_problem_ids = list(instance.problems.values_list('id', flat=True))
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def index_changed_tag(sender, instance, created=False, **kwargs):
+    from Online_Judge.page_cache import invalidate
+    from .search import index_problems
+    if not created:
+        problem_ids = getattr(instance, '_retagged_problem_ids', None)
+        index_problems(instance.problems.values_list('id', flat=True) if problem_ids is None else problem_ids)
+    invalidate('problems')
+
+
+@receiver(post_save, sender=Problem)
+@receiver(post_delete, sender=Problem)
+@receiver(m2m_changed, sender=Problem.tags.through)
+def refresh_problem_facets(sender, instance, action=None, **kwargs):
+    # action is only sent with m2m_changed
+    if action in (None, 'post_add', 'post_remove', 'post_clear'):
+        def refresh():
+            from Online_Judge.page_cache import invalidate
+            from .facets import refresh_facet_counts
+            refresh_facet_counts()
+            # Again, so no page keeps the counts from before the refresh
+            invalidate('problems')
+        
+        transaction.on_commit(refresh)
+
+
+@receiver(post_save, sender=Problem)
+def create_problem_stats(sender, instance, created, **kwargs):
+    if created:
+        ProblemStats.objects.get_or_create(problem=instance)
+
+
+@receiver(submission_judged)
+def count_judged_submission(sender, submission, first_judgement, **kwargs):
+    from .stats import record_judgement
+    record_judgement(submission, first_judgement)
@@ -0,0 +1,105 @@
+"""
+Problem search.
+
+Searching used to be ``icontains`` on title, tags and description: LIKE
+'%...%' scans of the whole problem table. Problems are now indexed into
+SearchTerm rows instead (an inverted index kept in the database, so it works
+the same on SQLite and MySQL): one row per distinct word of a problem, with a
+weight for where the word appears. A query is split into words the same way;
+a problem matches if every word of the query is a word, or for words of
+PREFIX_MIN_LENGTH characters or more the start of a word, of the problem. Each
+query word is one range scan of the (term, problem) index, so the cost grows
+with the number of matches, not with the size of the archive. Results are
+ranked by the summed weights of the matched terms.
+
+The index is updated by receivers in problems.models whenever a problem, its
+tags or a tag changes; ``python manage.py rebuild_search_index`` rebuilds it.
+"""
+import html
+import re
+from collections import Counter
+from django.db import transaction
+from django.db.models import Case, IntegerField, Max, OuterRef, Q, Subquery, Sum, Value, When
+
+TITLE_WEIGHT = 10
+TAG_WEIGHT = 6
+STATEMENT_WEIGHT = 1
+# Repeating a word in the statement stops adding weight after this many times
+MAX_STATEMENT_WEIGHT = 5
+PREFIX_MIN_LENGTH = 3
+MAX_QUERY_TERMS = 8
+
+_TAG_RE = re.compile(r'<[^>]*>')
+_WORD_RE = re.compile(r'\w+')
+
+
+def tokenize(text):
+    """Normalized words of ``text`` (HTML markup dropped), in order"""
+    text = html.unescape(_TAG_RE.sub(' ', text or ''))
+    return [word[:50] for word in _WORD_RE.findall(text.lower())]
+
+
+def problem_terms(problem):
+    """{term: weight} of a problem's title, tags and statement"""
+    weights = Counter()
+    statement = Counter(tokenize(' '.join([
+        problem.description, problem.input_format, problem.output_format, problem.constraints,
+    ])))
+    for term, count in statement.items():
+        weights[term] += min(count, MAX_STATEMENT_WEIGHT) * STATEMENT_WEIGHT
+    for term in set(tokenize(' '.join(tag.name for tag in problem.tags.all()))):
+        weights[term] += TAG_WEIGHT
+    for term in set(tokenize(problem.title)):
+        weights[term] += TITLE_WEIGHT
+    return weights
+
+
+def index_problem(problem):
+    """Replace the search index rows of ``problem``"""
+    from .models import SearchTerm
+
+    with transaction.atomic():
+        SearchTerm.objects.filter(problem=problem).delete()
+        SearchTerm.objects.bulk_create([
+            SearchTerm(problem=problem, term=term, weight=weight)
+            for term, weight in problem_terms(problem).items()
+        ], batch_size=500)
+
+
+def index_problems(problem_ids):
+    from .models import Problem
+
+    for problem in Problem.objects.filter(id__in=list(problem_ids)).prefetch_related('tags'):
+        index_problem(problem)
+
+
+def _term_filter(word):
+    if len(word) < PREFIX_MIN_LENGTH:
+        return Q(term=word)
+    # A range rather than LIKE 'word%', so every backend can use the index
+    return Q(term__gte=word, term__lt=word + '\uffff')
+
+
+def search_problems(problems, query):
+    """``problems`` matching every word of ``query``, best match first (annotated with search_score)"""
+    from .models import SearchTerm
+
+    words = list(dict.fromkeys(tokenize(query)))[:MAX_QUERY_TERMS]
+    if not words:
+        return problems.none()
+
+    filters = [_term_filter(word) for word in words]
+    any_word = Q()
+    for term_filter in filters:
+        any_word |= term_filter
+    # Problems with at least one term per query word
+    postings = SearchTerm.objects.filter(any_word).values('problem_id')
+    matched = postings.annotate(**{
+        f'word_{i}': Max(Case(When(term_filter, then=Value(1)), default=Value(0), output_field=IntegerField()))
+        for i, term_filter in enumerate(filters)
+    }).filter(**{f'word_{i}': 1 for i in range(len(filters))})
+    score = postings.filter(problem_id=OuterRef('pk')).annotate(score=Sum('weight')).values('score')
+
+    return problems.filter(id__in=matched.values('problem_id')).annotate(
+        search_score=Subquery(score, output_field=IntegerField())
+    ).order_by('-search_score', 'created_at', 'id')
@@ -0,0 +1,106 @@
+"""
+Acceptance counters of problems (ProblemStats).
+
+Solve counts per problem would otherwise be a GROUP BY problem over the whole
+Submission table on every problem list. They are stored in one ProblemStats
+row per problem and bumped with F() expressions when a submission is judged
+for the first time (judge.signals.submission_judged), in the same transaction
+as the verdict, so the list can sort on them like any other column. As for
+profile counters (accounts.stats), a judged-again submission recounts its
+problem instead, and bulk rejudges recount their problems once they finish.
+``rebuild_problem_stats`` recomputes everything from history (see the
+rebuild_problem_stats command). Test runs never count.
+"""
+from django.db.models import Count, F, Q
+
+JUDGED_VERDICTS = ['AC', 'WA', 'CE', 'RE', 'TLE', 'MLE', 'OLE', 'PE']
+LANGUAGE_COUNTERS = {
+    'c': ('c_submissions', 'c_ac_submissions'),
+    'cpp': ('cpp_submissions', 'cpp_ac_submissions'),
+    'python': ('python_submissions', 'python_ac_submissions'),
+}
+STAT_FIELDS = ['solved_by', 'total_submissions', 'ac_submissions'] + [
+    field for fields in LANGUAGE_COUNTERS.values() for field in fields
+]
+
+
+def record_judgement(submission, first_judgement):
+    """Count a judged submission on its problem's stats"""
+    from submissions.models import Submission
+    from .models import ProblemStats
+
+    if submission.is_test:
+        return
+    if not first_judgement:
+        # Bulk rejudges recount their problems once they finish (submissions.rejudge)
+        if submission.rejudge_id is None:
+            rebuild_problem_stats([submission.problem_id])
+        return
+
+    # The row lock serializes concurrent verdicts on the same problem, so the
+    # first-solve check below sees an AC committed meanwhile
+    if ProblemStats.objects.select_for_update().filter(problem_id=submission.problem_id).first() is None:
+        return
+
+    total_field, accepted_field = LANGUAGE_COUNTERS.get(submission.language, (None, None))
+    updates = {'total_submissions': F('total_submissions') + 1}
+    if total_field:
+        updates[total_field] = F(total_field) + 1
+    if submission.verdict == 'AC':
+        updates['ac_submissions'] = F('ac_submissions') + 1
+        if accepted_field:
+            updates[accepted_field] = F(accepted_field) + 1
+        if not Submission.objects.filter(
+            user_id=submission.user_id, problem_id=submission.problem_id, verdict='AC', is_test=False
+        ).exclude(id=submission.id).exists():
+            updates['solved_by'] = F('solved_by') + 1
+    ProblemStats.objects.filter(problem_id=submission.problem_id).update(**updates)
+
+
+def stats_by_problem(submissions):
+    """{problem_id: {field: value}} for STAT_FIELDS, counted from a Submission queryset"""
+    judged = Q(verdict__in=JUDGED_VERDICTS)
+    annotations = {
+        'solved_by': Count('user', distinct=True, filter=Q(verdict='AC')),
+        'total_submissions': Count('id', filter=judged),
+        'ac_submissions': Count('id', filter=Q(verdict='AC')),
+    }
+    for language, (total_field, accepted_field) in LANGUAGE_COUNTERS.items():
+        annotations[total_field] = Count('id', filter=judged & Q(language=language))
+        annotations[accepted_field] = Count('id', filter=Q(verdict='AC', language=language))
+
+    rows = submissions.filter(is_test=False).order_by().values('problem_id').annotate(**annotations)
+    return {row.pop('problem_id'): row for row in rows}
+
+
+def rebuild_problem_stats(problem_ids=None):
+    """Recompute the stats of the given problems (all problems if None) from their submissions
+
+    Returns the number of rows that were created or changed.
+    """
+    from submissions.models import Submission
+    from .models import Problem, ProblemStats
+
+    problems = Problem.objects.all()
+    submissions = Submission.objects.all()
+    if problem_ids is not None:
+        problems = problems.filter(id__in=problem_ids)
+        submissions = submissions.filter(problem_id__in=problem_ids)
+    stats = stats_by_problem(submissions)
+    rows = {row.problem_id: row for row in ProblemStats.objects.filter(problem__in=problems)}
+
+    empty = dict.fromkeys(STAT_FIELDS, 0)
+    created = []
+    changed = []
+    for problem_id in problems.values_list('id', flat=True):
+        values = stats.get(problem_id, empty)
+        row = rows.get(problem_id)
+        if row is None:
+            created.append(ProblemStats(problem_id=problem_id, **values))
+        elif any(getattr(row, field) != values[field] for field in STAT_FIELDS):
+            for field in STAT_FIELDS:
+                setattr(row, field, values[field])
+            changed.append(row)
+    ProblemStats.objects.bulk_create(created, batch_size=500)
+    ProblemStats.objects.bulk_update(changed, STAT_FIELDS, batch_size=500)
+    return len(created) + len(changed)
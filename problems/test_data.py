@@ -0,0 +1,112 @@
+"""
+Content-addressed storage for test case data.
+
+Test input and expected output are kept as files under
+TEST_DATA_ROOT/<problem id>/<sha256 of the content> instead of in database
+TextFields. The judge hands the stored input file straight to the program as
+stdin, and identical data within a problem is only stored once.
+
+Files are never removed when a test case changes or is deleted: a judge may
+still be running (or have cached) the old version, and the database change may
+yet roll back. ``sweep_test_data`` (the sweep_test_data command) removes files
+and problem directories nothing refers to once they are older than a grace
+period.
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+from django.conf import settings
+
+
+def get_test_data_root():
+    return getattr(settings, 'TEST_DATA_ROOT', os.path.join(settings.BASE_DIR, 'test_data'))
+
+
+def test_data_path(problem_id, digest):
+    """Absolute path of a stored test data file"""
+    return os.path.join(get_test_data_root(), str(problem_id), digest)
+
+
+def save_test_data(problem_id, content):
+    """Store ``content`` (str or bytes) for a problem and return its sha256 digest"""
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    digest = hashlib.sha256(content).hexdigest()
+    path = test_data_path(problem_id, digest)
+    if os.path.exists(path):
+        try:
+            # Referenced again: restart its grace period, so a sweep does not take it
+            os.utime(path)
+            return digest
+        except FileNotFoundError:
+            pass
+
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(prefix='.tmp_', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+        # Atomic publish, so the judge never sees a half-written file
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return digest
+
+
+def read_test_data(problem_id, digest):
+    """Return stored test data as text ('' for a test case without data)"""
+    if not digest:
+        return ''
+    with open(test_data_path(problem_id, digest), 'r', encoding='utf-8', newline='') as f:
+        return f.read()
+
+
+def _older_than(path, cutoff):
+    try:
+        return os.path.getmtime(path) < cutoff
+    except FileNotFoundError:
+        return False
+
+
+def sweep_test_data(grace_seconds):
+    """Remove stored files (and directories of deleted problems) that nothing has referred to for
+    ``grace_seconds``; returns the number of files removed"""
+    from .models import Problem, TestCase
+
+    root = get_test_data_root()
+    if not os.path.isdir(root):
+        return 0
+    cutoff = time.time() - grace_seconds
+    problem_ids = set(Problem.objects.values_list('id', flat=True))
+    removed = 0
+    for name in os.listdir(root):
+        directory = os.path.join(root, name)
+        if not os.path.isdir(directory):
+            continue
+        if not name.isdigit() or int(name) not in problem_ids:
+            files = os.listdir(directory)
+            if all(_older_than(os.path.join(directory, f), cutoff) for f in files) and _older_than(directory, cutoff):
+                shutil.rmtree(directory, ignore_errors=True)
+                removed += len(files)
+            continue
+
+        # Only files that were already past the grace period before the test cases were read
+        stale = [f for f in os.listdir(directory) if _older_than(os.path.join(directory, f), cutoff)]
+        if not stale:
+            continue
+        referenced = set()
+        for hashes in TestCase.objects.filter(problem_id=int(name)).values_list('input_hash', 'output_hash'):
+            referenced.update(hashes)
+        for filename in stale:
+            if filename not in referenced:
+                try:
+                    os.remove(os.path.join(directory, filename))
+                    removed += 1
+                except FileNotFoundError:
+                    pass
+    return removed
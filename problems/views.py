@@ -2,20 +2,30 @@ from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib import messages
 from django.core.paginator import Paginator
-from django.db.models import Q
 from django.utils._os import safe_join
+from django.utils.functional import SimpleLazyObject
 from django.conf import settings
-from .models import Problem, Category, TestCase
+from Online_Judge.page_cache import namespace_version, page_cache_timeout, statement_cache_timeout
+from .models import Problem, Category, Tag, TestCase
+from .facets import facet_counts
+from .search import search_problems
 from .forms import ProblemForm, TestCaseForm, CategoryForm
-from submissions.models import Submission
+from submissions.models import Submission, UserProblemStatus
 import os
 import re
 
 
+PROBLEM_SORTS = {
+    'most_solved': ['-stats__solved_by', 'created_at', 'id'],
+    'least_solved': ['stats__solved_by', 'created_at', 'id'],
+}
+
+
 @login_required
 def problem_list(request):
-    problems = Problem.objects.filter(is_active=True, contest_only=False).order_by('created_at')
-    categories = Category.objects.all()
+    problems = Problem.objects.filter(is_active=True, contest_only=False).select_related(
+        'category', 'stats'
+    ).prefetch_related('tags').order_by('created_at')
     
     # Filter by category
     category_id = request.GET.get('category')
@@ -27,13 +37,20 @@ def problem_list(request):
     if difficulty:
         problems = problems.filter(difficulty=difficulty)
     
-    # Search
+    # Filter by tag (exact name)
+    tag = request.GET.get('tag')
+    if tag:
+        problems = problems.filter(tags__name=Tag.normalize_name(tag))
+    
+    # Search (problems.search index, best match first)
     search = request.GET.get('search')
     if search:
-        problems = problems.filter(
-            Q(title__icontains=search) | 
-            Q(tags__icontains=search)
-        )
+        problems = search_problems(problems, search)
+    
+    # Sort by solve count (stored in ProblemStats, see problems.stats)
+    sort = request.GET.get('sort')
+    if sort in PROBLEM_SORTS:
+        problems = problems.order_by(*PROBLEM_SORTS[sort])
     
     # Pagination
     paginator = Paginator(problems, 20)
@@ -44,22 +61,26 @@ def problem_list(request):
     solved_problem_ids = set()
     if request.user.is_authenticated:
         solved_problem_ids = set(
-            Submission.objects.filter(
+            UserProblemStatus.objects.filter(
                 user=request.user,
-                verdict='AC',
-                is_test=False
+                best_verdict='AC'
             ).values_list('problem_id', flat=True)
         )
     
     context = {
         'problems': problems,
-        'categories': categories,
+        # Only counted if the sidebar fragment is not cached
+        'facets': SimpleLazyObject(lambda: facet_counts(category_id, difficulty)),
         'current_category': category_id,
         'current_difficulty': difficulty,
+        'current_tag': tag,
+        'current_sort': sort,
         'search_query': search,
         'is_paginated': problems.has_other_pages,
         'page_obj': problems,
         'solved_problem_ids': solved_problem_ids,
+        'cache_timeout': page_cache_timeout(),
+        'problems_version': namespace_version('problems'),
     }
     return render(request, 'problems/problem_list.html', context)
 
@@ -74,7 +95,8 @@ def problem_solve(request, slug):
         messages.error(request, 'Invalid problem identifier.')
         return redirect('problems:problem_list')
     
-    problem = get_object_or_404(Problem.objects.prefetch_related('test_cases'), slug=slug, is_active=True)
+    # Test cases are only loaded to render the statement, which is usually cached
+    problem = get_object_or_404(Problem.objects.select_related('category', 'stats'), slug=slug, is_active=True)
     
     # Get user's latest submission for this problem
     latest_submission = None
@@ -85,30 +107,15 @@ def problem_solve(request, slug):
             is_test=False
         ).order_by('-submitted_at').first()
     
-    # Get prev/next problems
-    all_problems = Problem.objects.filter(is_active=True, contest_only=False).order_by('created_at')
-    problem_list = list(all_problems)
-    
-    current_index = None
-    for i, p in enumerate(problem_list):
-        if p.id == problem.id:
-            current_index = i
-            break
-    
-    prev_problem = None
-    next_problem = None
-    
-    if current_index is not None:
-        if current_index > 0:
-            prev_problem = problem_list[current_index - 1]
-        if current_index < len(problem_list) - 1:
-            next_problem = problem_list[current_index + 1]
+    # Two keyset queries on (created_at, id), however large the archive is
+    prev_problem, next_problem = problem.get_adjacent_problems()
     
     return render(request, 'problems/problem_solve.html', {
         'problem': problem,
         'latest_submission': latest_submission,
         'prev_problem': prev_problem,
-        'next_problem': next_problem
+        'next_problem': next_problem,
+        'statement_cache_timeout': statement_cache_timeout(),
     })
 
 
@@ -136,11 +143,7 @@ def admin_problems(request):
     # Search functionality
     search = request.GET.get('search')
     if search:
-        problems = problems.filter(
-            Q(title__icontains=search) | 
-            Q(description__icontains=search) |
-            Q(tags__icontains=search)
-        )
+        problems = search_problems(problems, search)
     
     # Filter by category
     category_id = request.GET.get('category')
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Submission
+from .models import Rejudge, Submission, UserProblemStatus
 
 
 @admin.register(Submission)
@@ -8,7 +8,37 @@ class SubmissionAdmin(admin.ModelAdmin):
     list_filter = ['verdict', 'language', 'submitted_at']
     search_fields = ['user__username', 'problem__title']
     readonly_fields = ['submitted_at']
+    actions = ['rejudge_submissions']
     
     def has_change_permission(self, request, obj=None):
         # Only allow viewing, not editing submissions
-        return False
\ No newline at end of file
+        return False
+    
+    @admin.action(description='Rejudge selected submissions')
+    def rejudge_submissions(self, request, queryset):
+        from .rejudge import select_submissions, start_rejudge
+        
+        submissions = select_submissions().filter(id__in=queryset.values('id'))
+        rejudge = start_rejudge(submissions, f'{submissions.count()} submissions picked in admin', created_by=request.user)
+        self.message_user(request, f'Rejudge #{rejudge.id}: queued {rejudge.total} submissions.')
+
+
+@admin.register(UserProblemStatus)
+class UserProblemStatusAdmin(admin.ModelAdmin):
+    list_display = ['user', 'problem', 'best_verdict', 'attempts', 'first_ac_at', 'updated_at']
+    list_filter = ['best_verdict']
+    search_fields = ['user__username', 'problem__title']
+    
+    def has_change_permission(self, request, obj=None):
+        # Derived from submissions
+        return False
+
+
+@admin.register(Rejudge)
+class RejudgeAdmin(admin.ModelAdmin):
+    list_display = ['id', 'description', 'total', 'progress', 'created_by', 'created_at', 'finished_at']
+    readonly_fields = ['description', 'total', 'created_by', 'created_at', 'finished_at']
+    
+    @admin.display(description='Progress (%)')
+    def progress(self, obj):
+        return obj.progress()
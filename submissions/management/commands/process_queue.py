@@ -1,6 +1,7 @@
 from django.core.management.base import BaseCommand
 from django.utils import timezone
 from submissions.models import Submission
+from judge.queue_manager import claim_submissions, judge_submission
 
 class Command(BaseCommand):
     help = 'Process queued submissions manually (PythonAnywhere compatible)'
@@ -11,28 +12,20 @@ class Command(BaseCommand):
     def handle(self, *args, **options):
         limit = options['limit']
         
-        queued_submissions = Submission.objects.filter(verdict='QUEUED').order_by('submitted_at')[:limit]
+        claimed_ids = claim_submissions(limit)
         
-        if not queued_submissions:
+        if not claimed_ids:
             self.stdout.write(self.style.SUCCESS('No queued submissions found.'))
             return
         
         processed = 0
         failed = 0
         
-        for submission in queued_submissions:
+        for submission in Submission.objects.filter(id__in=claimed_ids).select_related('problem', 'user').order_by('submitted_at'):
             self.stdout.write(f'Processing submission {submission.id} by {submission.user.username}...')
             
             try:
-                # Process submission directly
-                from judge.evaluator import CodeEvaluator
-                evaluator = CodeEvaluator(submission)
-                submission.verdict = 'JUDGING'
-                submission.save()
-                
-                evaluator.evaluate()
-                submission.judged_at = timezone.now()
-                submission.save()
+                judge_submission(submission)
                 
                 success = submission.verdict != 'RE'
                 if success:
@@ -0,0 +1,86 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from contests.models import Contest
+from problems.models import Problem
+from submissions.models import Rejudge, Submission
+from submissions.rejudge import select_submissions, start_rejudge
+
+
+class Command(BaseCommand):
+    help = ('Send judged submissions back to the judge at low priority, e.g. after test data changed. '
+            'Verdicts are written by the running judge daemons.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--problem', help='Problem slug')
+        parser.add_argument('--contest', help='Contest slug (submissions to its problems during the contest)')
+        parser.add_argument('--verdict', action='append', dest='verdicts', default=[],
+                            choices=[code for code, _ in Submission.VERDICT_CHOICES],
+                            help='Only submissions with this verdict (repeatable)')
+        parser.add_argument('--since', help='Submitted at or after this time (YYYY-MM-DD HH:MM)')
+        parser.add_argument('--until', help='Submitted at or before this time (YYYY-MM-DD HH:MM)')
+        parser.add_argument('--dry-run', action='store_true', help='Only count the matching submissions')
+        parser.add_argument('--wait', action='store_true', help='Report progress until the rejudge finishes')
+        parser.add_argument('--status', type=int, metavar='REJUDGE_ID', help='Report progress of an earlier rejudge')
+
+    def handle(self, *args, **options):
+        if options['status'] is not None:
+            try:
+                rejudge = Rejudge.objects.get(id=options['status'])
+            except Rejudge.DoesNotExist:
+                raise CommandError(f"Rejudge #{options['status']} does not exist")
+            self.report(rejudge, wait=options['wait'])
+            return
+
+        criteria = {}
+        description = []
+        if options['problem']:
+            criteria['problem'] = self.get_object(Problem, options['problem'])
+            description.append(f"problem {options['problem']}")
+        if options['contest']:
+            criteria['contest'] = self.get_object(Contest, options['contest'])
+            description.append(f"contest {options['contest']}")
+        if options['verdicts']:
+            criteria['verdicts'] = options['verdicts']
+            description.append('verdict ' + '/'.join(options['verdicts']))
+        for name in ('since', 'until'):
+            if options[name]:
+                criteria[name] = self.parse_time(options[name])
+                description.append(f'{name} {options[name]}')
+        if not criteria:
+            raise CommandError('Select submissions with at least one of --problem, --contest, --verdict, --since, --until')
+
+        submissions = select_submissions(**criteria)
+        if options['dry_run']:
+            self.stdout.write(f'{submissions.count()} submissions match.')
+            return
+
+        rejudge = start_rejudge(submissions, ', '.join(description))
+        self.stdout.write(self.style.SUCCESS(f'Rejudge #{rejudge.id}: queued {rejudge.total} submissions.'))
+        self.report(rejudge, wait=options['wait'])
+
+    def report(self, rejudge, wait=False):
+        while True:
+            rejudge.refresh_from_db()
+            remaining = rejudge.remaining
+            self.stdout.write(f'Rejudge #{rejudge.id}: {rejudge.total - remaining}/{rejudge.total} judged'
+                              + (' (finished)' if rejudge.finished_at else ''))
+            if not wait or rejudge.finished_at:
+                return
+            time.sleep(5)
+
+    def get_object(self, model, slug):
+        try:
+            return model.objects.get(slug=slug)
+        except model.DoesNotExist:
+            raise CommandError(f"{model.__name__} '{slug}' does not exist")
+
+    def parse_time(self, value):
+        parsed = parse_datetime(value) or parse_datetime(f'{value} 00:00')
+        if parsed is None:
+            raise CommandError(f"Invalid time '{value}'")
+        if timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+        return parsed
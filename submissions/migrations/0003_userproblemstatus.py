@@ -0,0 +1,54 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:22
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from itertools import groupby
+
+
+def build_problem_statuses(apps, schema_editor):
+    from submissions.problem_status import FINAL_VERDICTS, summarize
+
+    Submission = apps.get_model('submissions', 'Submission')
+    UserProblemStatus = apps.get_model('submissions', 'UserProblemStatus')
+
+    submissions = Submission.objects.filter(is_test=False, verdict__in=FINAL_VERDICTS).order_by(
+        'user_id', 'problem_id', '-submitted_at', '-id'
+    ).values_list('user_id', 'problem_id', 'verdict', 'submitted_at')
+    statuses = []
+    for (user_id, problem_id), rows in groupby(submissions.iterator(), key=lambda row: row[:2]):
+        best_verdict, first_ac_at, attempts = summarize(row[2:] for row in rows)
+        statuses.append(UserProblemStatus(
+            user_id=user_id, problem_id=problem_id,
+            best_verdict=best_verdict, first_ac_at=first_ac_at, attempts=attempts,
+        ))
+    UserProblemStatus.objects.bulk_create(statuses, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('problems', '0005_problem_test_data_version'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('submissions', '0002_alter_submission_verdict'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserProblemStatus',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('best_verdict', models.CharField(choices=[('QUEUED', 'Queued'), ('JUDGING', 'Judging'), ('AC', 'Accepted'), ('WA', 'Wrong Answer'), ('CE', 'Compilation Error'), ('RE', 'Runtime Error'), ('TLE', 'Time Limit Exceeded'), ('MLE', 'Memory Limit Exceeded'), ('OLE', 'Output Limit Exceeded'), ('PE', 'Presentation Error')], max_length=10)),
+                ('first_ac_at', models.DateTimeField(blank=True, null=True)),
+                ('attempts', models.IntegerField(default=0, help_text='Judged submissions, test runs excluded')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('problem', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='user_statuses', to='problems.problem')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='problem_statuses', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'User problem statuses',
+                'unique_together': {('user', 'problem')},
+            },
+        ),
+        migrations.RunPython(build_problem_statuses, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:31
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('submissions', '0003_userproblemstatus'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Rejudge',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('description', models.CharField(help_text='Which submissions were selected', max_length=255)),
+                ('total', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='submission',
+            name='priority',
+            field=models.SmallIntegerField(default=10),
+        ),
+        migrations.AddIndex(
+            model_name='submission',
+            index=models.Index(fields=['verdict', '-priority', 'submitted_at'], name='submissions_verdict_caf55a_idx'),
+        ),
+        migrations.AddField(
+            model_name='rejudge',
+            name='created_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='submission',
+            name='rejudge',
+            field=models.ForeignKey(blank=True, help_text='Latest rejudge of this submission', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='submissions', to='submissions.rejudge'),
+        ),
+    ]
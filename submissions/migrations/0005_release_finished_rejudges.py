@@ -0,0 +1,26 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:58
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def release_finished_rejudges(apps, schema_editor):
+    """Submissions of finished rejudges go back to practice priority, as finish_rejudge now leaves them"""
+    Submission = apps.get_model('submissions', 'Submission')
+    Submission.objects.filter(rejudge__finished_at__isnull=False).update(rejudge=None, priority=10)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('submissions', '0004_rejudge'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='submission',
+            name='rejudge',
+            field=models.ForeignKey(blank=True, help_text='Rejudge this submission is queued in (cleared once it finishes)', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='submissions', to='submissions.rejudge'),
+        ),
+        migrations.RunPython(release_finished_rejudges, migrations.RunPython.noop),
+    ]
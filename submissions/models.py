@@ -1,7 +1,9 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
+from django.dispatch import receiver
 from django.utils import timezone
 from problems.models import Problem
+from judge.signals import submission_judged
 
 
 class Submission(models.Model):
@@ -22,9 +24,15 @@ class Submission(models.Model):
         ('RE', 'Runtime Error'),
         ('TLE', 'Time Limit Exceeded'),
         ('MLE', 'Memory Limit Exceeded'),
+        ('OLE', 'Output Limit Exceeded'),
         ('PE', 'Presentation Error'),
     ]
     
+    # Queue priority classes, higher judged first (see judge.queue_manager)
+    PRIORITY_REJUDGE = 0
+    PRIORITY_PRACTICE = 10
+    PRIORITY_CONTEST = 20
+    
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     problem = models.ForeignKey(Problem, on_delete=models.CASCADE)
     language = models.CharField(max_length=10, choices=LANGUAGE_CHOICES)
@@ -39,10 +47,14 @@ class Submission(models.Model):
     is_test = models.BooleanField(default=False)
     submitted_at = models.DateTimeField(auto_now_add=True)
     judged_at = models.DateTimeField(null=True, blank=True)
+    priority = models.SmallIntegerField(default=PRIORITY_PRACTICE)
+    rejudge = models.ForeignKey('Rejudge', on_delete=models.SET_NULL, null=True, blank=True,
+                                related_name='submissions', help_text="Rejudge this submission is queued in (cleared once it finishes)")
     
     class Meta:
         ordering = ['-submitted_at']
         indexes = [
+            models.Index(fields=['verdict', '-priority', 'submitted_at']),  # Judge queue
             models.Index(fields=['user', '-submitted_at']),      # User submissions
             models.Index(fields=['problem', '-submitted_at']),   # Problem submissions
             models.Index(fields=['verdict']),                    # Verdict filtering
@@ -54,6 +66,12 @@ class Submission(models.Model):
     def __str__(self):
         return f"{self.user.username} - {self.problem.title} - {self.verdict}"
     
+    def save(self, *args, **kwargs):
+        if self._state.adding and self.priority == self.PRIORITY_PRACTICE:
+            from judge.queue_manager import initial_priority
+            self.priority = initial_priority(self)
+        super().save(*args, **kwargs)
+    
     def get_verdict_display_class(self):
         verdict_classes = {
             'QUEUED': 'text-blue-500',
@@ -64,6 +82,7 @@ class Submission(models.Model):
             'RE': 'text-orange-600',
             'TLE': 'text-purple-600',
             'MLE': 'text-blue-600',
+            'OLE': 'text-pink-600',
             'PE': 'text-gray-600',
         }
         return verdict_classes.get(self.verdict, 'text-gray-500')
@@ -83,6 +102,8 @@ class Submission(models.Model):
             return f'Time limit exceeded ({self.problem.time_limit}s)'
         elif self.verdict == 'MLE':
             return f'Memory limit exceeded ({self.problem.memory_limit}MB)'
+        elif self.verdict == 'OLE':
+            return 'Output limit exceeded - program printed too much output'
         elif self.verdict == 'WA':
             return 'Wrong answer - output does not match expected result'
         elif self.verdict == 'PE':
@@ -94,7 +115,7 @@ class Submission(models.Model):
     @classmethod
     def get_queued_submissions(cls, limit=None):
         """Get queued submissions for manual processing"""
-        queryset = cls.objects.filter(verdict='QUEUED').order_by('submitted_at')
+        queryset = cls.objects.filter(verdict='QUEUED').order_by('-priority', 'submitted_at')
         if limit:
             queryset = queryset[:limit]
         return queryset
@@ -104,19 +125,79 @@ class Submission(models.Model):
         if self.verdict != 'QUEUED':
             return False
         
+        # Claim the row atomically so a judge daemon cannot pick it up as well
+        claimed = Submission.objects.filter(id=self.id, verdict='QUEUED').update(verdict='JUDGING')
+        if not claimed:
+            return False
         self.verdict = 'JUDGING'
-        self.save()
         
         try:
-            from judge.evaluator import CodeEvaluator
-            evaluator = CodeEvaluator(self)
-            evaluator.evaluate()
-            self.judged_at = timezone.now()
-            self.save()
+            from judge.queue_manager import judge_submission
+            judge_submission(self)
             return True
         except Exception as e:
+            first_judgement = self.judged_at is None
             self.verdict = 'RE'
             self.runtime_error = str(e)
             self.judged_at = timezone.now()
-            self.save()
-            return False
\ No newline at end of file
+            with transaction.atomic():
+                self.save()
+                submission_judged.send(sender=Submission, submission=self, first_judgement=first_judgement)
+            return False
+
+
+class Rejudge(models.Model):
+    """A batch of submissions sent back to the judge; see submissions.rejudge"""
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    description = models.CharField(max_length=255, help_text="Which submissions were selected")
+    total = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"Rejudge #{self.id}: {self.description}"
+    
+    @property
+    def remaining(self):
+        """Submissions of this rejudge still waiting for a verdict"""
+        return self.submissions.filter(verdict__in=['QUEUED', 'JUDGING']).count()
+    
+    def progress(self):
+        """Judged share of the batch, in percent"""
+        if self.finished_at or not self.total:
+            return 100
+        return round((self.total - self.remaining) * 100 / self.total, 1)
+
+
+class UserProblemStatus(models.Model):
+    """A user's verdict summary for one problem, maintained by submissions.problem_status"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='problem_statuses')
+    problem = models.ForeignKey(Problem, on_delete=models.CASCADE, related_name='user_statuses')
+    best_verdict = models.CharField(max_length=10, choices=Submission.VERDICT_CHOICES)
+    first_ac_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.IntegerField(default=0, help_text="Judged submissions, test runs excluded")
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        unique_together = ['user', 'problem']
+        verbose_name_plural = 'User problem statuses'
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.problem.title} - {self.best_verdict}"
+
+
+@receiver(submission_judged)
+def update_problem_status_on_verdict(sender, submission, **kwargs):
+    if not submission.is_test:
+        from .problem_status import update_problem_status
+        update_problem_status(submission.user_id, submission.problem_id)
+
+
+@receiver(submission_judged)
+def finish_rejudge_on_last_verdict(sender, submission, first_judgement, **kwargs):
+    if submission.rejudge_id and not first_judgement:
+        from .rejudge import finish_rejudge
+        finish_rejudge(submission.rejudge_id)
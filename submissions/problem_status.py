@@ -0,0 +1,70 @@
+"""
+Per-user, per-problem verdict summary (UserProblemStatus).
+
+The problem list used to rebuild each user's best-verdict map from every
+submission they ever made. The summary is now stored in one row per
+(user, problem) and refreshed whenever a verdict is written
+(judge.signals.submission_judged), in the same transaction as the verdict.
+
+Best verdict keeps the old rule: AC once any submission is accepted,
+otherwise the verdict of the latest judged submission. Test runs do not count.
+"""
+from django.db import transaction
+from django.db.models import Count, Max, Min, Q
+
+FINAL_VERDICTS = ['AC', 'WA', 'CE', 'RE', 'TLE', 'MLE', 'OLE', 'PE']
+
+
+def summarize(submissions):
+    """(best_verdict, first_ac_at, attempts) from (verdict, submitted_at) pairs, newest first"""
+    best_verdict = None
+    first_ac_at = None
+    attempts = 0
+    for verdict, submitted_at in submissions:
+        attempts += 1
+        if best_verdict is None:
+            best_verdict = verdict
+        if verdict == 'AC':
+            best_verdict = 'AC'
+            first_ac_at = submitted_at
+    return best_verdict, first_ac_at, attempts
+
+
+def update_problem_status(user_id, problem_id):
+    """Recompute one user's summary for one problem from their judged submissions"""
+    from .models import Submission, UserProblemStatus
+
+    judged = Submission.objects.filter(
+        user_id=user_id, problem_id=problem_id, is_test=False, verdict__in=FINAL_VERDICTS
+    )
+    totals = judged.aggregate(
+        attempts=Count('id'),
+        first_ac_at=Min('submitted_at', filter=Q(verdict='AC')),
+    )
+    with transaction.atomic():
+        if not totals['attempts']:
+            UserProblemStatus.objects.filter(user_id=user_id, problem_id=problem_id).delete()
+            return
+        if totals['first_ac_at'] is not None:
+            best_verdict = 'AC'
+        else:
+            best_verdict = judged.order_by('-submitted_at', '-id').values_list('verdict', flat=True).first()
+        UserProblemStatus.objects.update_or_create(
+            user_id=user_id, problem_id=problem_id,
+            defaults={
+                'best_verdict': best_verdict,
+                'first_ac_at': totals['first_ac_at'],
+                'attempts': totals['attempts'],
+            },
+        )
+
+
+def verdict_map_version(user_id):
+    """Cheap fingerprint of a user's verdict map, used as its ETag"""
+    from .models import UserProblemStatus
+
+    totals = UserProblemStatus.objects.filter(user_id=user_id).aggregate(
+        rows=Count('id'), updated_at=Max('updated_at')
+    )
+    updated_at = totals['updated_at'].timestamp() if totals['updated_at'] else 0
+    return f'{totals["rows"]}-{updated_at}'
@@ -0,0 +1,125 @@
+"""
+Bulk rejudges.
+
+``select_submissions`` picks judged submissions by problem, contest, verdict
+and time range; ``start_rejudge`` puts them back in the judge queue at
+Submission.PRIORITY_REJUDGE, so judge daemons only reach them when no live
+submission is waiting. Unchanged sources hit the compile cache
+(judge.compile_cache), so rejudging mostly costs the test runs.
+
+While a rejudge runs, each new verdict still updates its scoreboard cell and
+the user's problem status (judge.signals.submission_judged), but profile
+and problem counters are left alone. When the last submission is judged,
+``finish_rejudge`` releases the submissions from the rejudge (back to
+practice priority, so a later single re-judge counts normally), then recounts
+the affected counters once and re-rates any rated contest whose results may
+have changed. Judge daemons also call
+``finish_idle_rejudges`` when the queue is empty, in case two last verdicts
+raced each other.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+PENDING_VERDICTS = ['QUEUED', 'JUDGING']
+BATCH_SIZE = 500
+
+
+def select_submissions(problem=None, contest=None, verdicts=None, since=None, until=None):
+    """Judged submissions matching every given criterion (test runs excluded)"""
+    from .models import Submission
+
+    submissions = Submission.objects.filter(is_test=False).exclude(verdict__in=PENDING_VERDICTS)
+    if problem is not None:
+        submissions = submissions.filter(problem=problem)
+    if contest is not None:
+        submissions = submissions.filter(
+            problem__in=contest.problems.all(),
+            submitted_at__gte=contest.start_time,
+            submitted_at__lte=contest.end_time,
+        )
+    if verdicts:
+        submissions = submissions.filter(verdict__in=verdicts)
+    if since is not None:
+        submissions = submissions.filter(submitted_at__gte=since)
+    if until is not None:
+        submissions = submissions.filter(submitted_at__lte=until)
+    return submissions
+
+
+def start_rejudge(submissions, description, created_by=None):
+    """Queue ``submissions`` for rejudging at low priority and return the Rejudge"""
+    from .models import Rejudge, Submission
+
+    submission_ids = list(submissions.order_by('submitted_at', 'id').values_list('id', flat=True))
+    with transaction.atomic():
+        rejudge = Rejudge.objects.create(created_by=created_by, description=description[:255])
+        total = 0
+        for start in range(0, len(submission_ids), BATCH_SIZE):
+            # Skips anything that was queued again in the meantime
+            total += Submission.objects.filter(
+                id__in=submission_ids[start:start + BATCH_SIZE]
+            ).exclude(verdict__in=PENDING_VERDICTS).update(
+                verdict='QUEUED',
+                priority=Submission.PRIORITY_REJUDGE,
+                rejudge=rejudge,
+                execution_time=None,
+                memory_used=None,
+                compilation_error='',
+                runtime_error='',
+                test_cases_passed=0,
+            )
+        rejudge.total = total
+        if not total:
+            rejudge.finished_at = timezone.now()
+        rejudge.save(update_fields=['total', 'finished_at'])
+    return rejudge
+
+
+def finish_rejudge(rejudge_id):
+    """Mark the rejudge finished if nothing is left to judge, then apply its results once committed"""
+    from contests.rating import ratable_contests
+    from .models import Rejudge, Submission
+
+    with transaction.atomic():
+        rejudge = Rejudge.objects.select_for_update().filter(id=rejudge_id, finished_at__isnull=True).first()
+        if rejudge is None or rejudge.submissions.filter(verdict__in=PENDING_VERDICTS).exists():
+            return False
+        rejudge.finished_at = timezone.now()
+        rejudge.save(update_fields=['finished_at'])
+
+        submissions = rejudge.submissions.order_by()
+        user_ids = list(submissions.values_list('user_id', flat=True).distinct())
+        problem_ids = list(submissions.values_list('problem_id', flat=True).distinct())
+        # Ratable contests come in rating order, and later contests are re-rated as well
+        rerate_from = next((
+            contest
+            for contest in ratable_contests().filter(rated_at__isnull=False, problems__in=problem_ids).distinct()
+            if select_submissions(contest=contest).filter(rejudge=rejudge).exists()
+        ), None)
+        # Later verdicts of these submissions are not part of this rejudge any more
+        submissions.update(rejudge=None, priority=Submission.PRIORITY_PRACTICE)
+
+        transaction.on_commit(lambda: apply_rejudge_results(user_ids, problem_ids, rerate_from))
+    return True
+
+
+def finish_idle_rejudges():
+    """Finish every unfinished rejudge with no submissions left in the queue"""
+    from .models import Rejudge
+
+    finished = 0
+    for rejudge_id in Rejudge.objects.filter(finished_at__isnull=True).values_list('id', flat=True):
+        finished += finish_rejudge(rejudge_id)
+    return finished
+
+
+def apply_rejudge_results(user_ids, problem_ids, rerate_from=None):
+    """Recount the profile and problem counters a finished rejudge touched, and re-rate from ``rerate_from``"""
+    from accounts.stats import rebuild_user_stats
+    from contests.rating import update_ratings
+    from problems.stats import rebuild_problem_stats
+
+    rebuild_user_stats(user_ids)
+    rebuild_problem_stats(problem_ids)
+    if rerate_from is not None:
+        update_ratings(from_contest=rerate_from)
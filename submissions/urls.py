@@ -6,6 +6,7 @@ app_name = 'submissions'
 urlpatterns = [
     path('submit/<slug:slug>/', views.submit_solution, name='submit_solution'),
     path('test/<slug:slug>/', views.test_code, name='test_code'),
+    path('run/<slug:slug>/', views.run_custom_input, name='run_custom_input'),
     path('ajax/<slug:slug>/', views.submit_ajax, name='submit_ajax'),
     path('detail/<int:submission_id>/', views.submission_detail, name='submission_detail'),
     path('my-submissions/', views.my_submissions, name='my_submissions'),
@@ -10,7 +10,6 @@ from django.utils import timezone
 from problems.models import Problem
 from .models import Submission
 from .forms import SubmissionForm
-from judge.evaluator import CodeEvaluator
 import json
 
 
@@ -34,7 +33,8 @@ def submit_solution(request, slug):
                     'total_test_cases': 0
                 })
             
-            # Create submission first
+            # Judged asynchronously by the judge daemon; the page polls
+            # submission_status_api for the verdict
             submission = Submission.objects.create(
                 user=request.user,
                 problem=problem,
@@ -42,52 +42,16 @@ def submit_solution(request, slug):
                 language=language
             )
             
-            # Check if manual queue is enabled for contest problems
-            from django.conf import settings
-            if getattr(settings, 'ENABLE_MANUAL_QUEUE', False) and problem.contest_only:
-                # Queue contest submissions for manual processing
-                return JsonResponse({
-                    'verdict': 'QUEUED',
-                    'message': 'Contest submission queued for manual processing',
-                    'submission_id': submission.id,
-                    'execution_time': 0,
-                    'memory_used': 0,
-                    'test_cases_passed': 0,
-                    'total_test_cases': 0,
-                    'add_to_pending': True
-                })
-            else:
-                # Direct evaluation for regular problems
-                try:
-                    evaluator = CodeEvaluator(submission)
-                    evaluator.evaluate()
-                    
-                    return JsonResponse({
-                        'verdict': submission.verdict,
-                        'message': 'Submission evaluated',
-                        'submission_id': submission.id,
-                        'execution_time': float(submission.execution_time) if submission.execution_time else 0,
-                        'memory_used': submission.memory_used or 0,
-                        'test_cases_passed': submission.test_cases_passed or 0,
-                        'total_test_cases': submission.total_test_cases or 0,
-                        'compilation_error': submission.compilation_error or None,
-                        'runtime_error': submission.runtime_error or None
-                    })
-                except Exception as e:
-                    submission.verdict = 'RE'
-                    submission.runtime_error = str(e)[:500]
-                    submission.save()
-                    
-                    return JsonResponse({
-                        'verdict': 'RE',
-                        'message': 'Runtime error during evaluation',
-                        'submission_id': submission.id,
-                        'execution_time': 0,
-                        'memory_used': 0,
-                        'test_cases_passed': 0,
-                        'total_test_cases': 0,
-                        'error_message': str(e)[:200]
-                    })
+            return JsonResponse({
+                'verdict': 'QUEUED',
+                'message': 'Submission queued for judging',
+                'submission_id': submission.id,
+                'execution_time': 0,
+                'memory_used': 0,
+                'test_cases_passed': 0,
+                'total_test_cases': 0,
+                'add_to_pending': True
+            })
         
         # Handle regular form submission
         code = request.POST.get('code', '').strip()
@@ -97,30 +61,14 @@ def submit_solution(request, slug):
             messages.error(request, 'Please provide your code before submitting.')
             return render(request, 'submissions/submit.html', {'problem': problem})
         
-        # Create submission first
+        # Judged asynchronously by the judge daemon
         submission = Submission.objects.create(
             user=request.user,
             problem=problem,
             code=code,
             language=language
         )
-        
-        # Check if manual queue is enabled for contest problems
-        from django.conf import settings
-        if getattr(settings, 'ENABLE_MANUAL_QUEUE', False) and problem.contest_only:
-            # Queue contest submissions for manual processing
-            messages.success(request, 'Contest submission queued for manual processing!')
-        else:
-            # Direct evaluation for regular problems
-            try:
-                evaluator = CodeEvaluator(submission)
-                evaluator.evaluate()
-                messages.success(request, 'Submission evaluated successfully!')
-            except Exception as e:
-                submission.verdict = 'RE'
-                submission.runtime_error = str(e)[:500]
-                submission.save()
-                messages.error(request, f'Evaluation failed: {str(e)[:100]}')
+        messages.success(request, 'Submission queued for judging!')
         
         # Redirect to submission detail page
         return redirect('submissions:submission_detail', submission_id=submission.id)
@@ -212,25 +160,25 @@ def test_code(request, slug):
                 'error_message': 'No code provided'
             })
         
-        # Create temporary submission for testing (not saved to DB)
-        temp_submission = Submission(
-            user=request.user,
-            problem=problem,
-            code=code,
-            language=language,
-            is_test=True
-        )
-        
-        # Evaluate against sample test cases only
-        evaluator = CodeEvaluator(temp_submission)
-        evaluator.evaluate(sample_only=True)
-        
-        return JsonResponse({
-            'verdict': temp_submission.verdict,
-            'test_cases_passed': temp_submission.test_cases_passed or 0,
-            'total_test_cases': temp_submission.total_test_cases or 0,
-            'error_message': temp_submission.compilation_error or temp_submission.runtime_error or None
-        })
+        # Sample tests run right away without touching the database (judge.custom_run),
+        # under the same per-user limit and site-wide slots (custom_run_slot) as the playground
+        from judge.custom_run import allow_custom_run, custom_run_slot, run_samples
+        if not allow_custom_run(request.user):
+            return JsonResponse({
+                'verdict': 'RE',
+                'test_cases_passed': 0,
+                'total_test_cases': 0,
+                'error_message': 'Too many runs, please wait a minute'
+            }, status=429)
+        with custom_run_slot() as acquired:
+            if not acquired:
+                return JsonResponse({
+                    'verdict': 'RE',
+                    'test_cases_passed': 0,
+                    'total_test_cases': 0,
+                    'error_message': 'The server is busy running code, please try again in a few seconds'
+                }, status=503)
+            return JsonResponse(run_samples(problem, code, language))
         
     except json.JSONDecodeError:
         return JsonResponse({'error': 'Invalid JSON'}, status=400)
@@ -243,6 +191,46 @@ def test_code(request, slug):
         }, status=500)
 
 
+def custom_input_response(request, problem):
+    """Run the posted code on the posted stdin (the playground); shared with contest problems"""
+    from django.conf import settings
+    from judge.custom_run import allow_custom_run, custom_run_slot, run_with_input
+    
+    try:
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({'error': 'Invalid JSON'}, status=400)
+    
+    code = data.get('code', '').strip()
+    language = data.get('language', 'cpp')
+    stdin = data.get('stdin', '')
+    if not code:
+        return JsonResponse({'error': 'No code provided'}, status=400)
+    if language not in dict(Submission.LANGUAGE_CHOICES):
+        return JsonResponse({'error': 'Invalid language'}, status=400)
+    input_limit = getattr(settings, 'JUDGE_CUSTOM_RUN_INPUT_LIMIT', 64)
+    if not isinstance(stdin, str) or len(stdin.encode('utf-8')) > input_limit * 1024:
+        return JsonResponse({'error': f'Input must be text of at most {input_limit} KB'}, status=400)
+    if not allow_custom_run(request.user):
+        return JsonResponse({'error': 'Too many runs, please wait a minute'}, status=429)
+    
+    with custom_run_slot() as acquired:
+        if not acquired:
+            return JsonResponse({'error': 'The server is busy running code, please try again in a few seconds'},
+                                status=503)
+        return JsonResponse(run_with_input(problem, code, language, stdin))
+
+
+@login_required
+def run_custom_input(request, slug):
+    """AJAX endpoint to run code on custom input"""
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Method not allowed'}, status=405)
+    
+    problem = get_object_or_404(Problem, slug=slug, is_active=True)
+    return custom_input_response(request, problem)
+
+
 @login_required
 def submit_ajax(request, slug):
     """AJAX endpoint to submit code for full evaluation"""
@@ -262,7 +250,8 @@ def submit_ajax(request, slug):
                 'error_message': 'No code provided'
             })
         
-        # Create submission first
+        # Judged asynchronously by the judge daemon; the page polls
+        # submission_status_api for the verdict
         submission = Submission.objects.create(
             user=request.user,
             problem=problem,
@@ -270,49 +259,16 @@ def submit_ajax(request, slug):
             language=language
         )
         
-        # Check if manual queue is enabled for contest problems
-        from django.conf import settings
-        if getattr(settings, 'ENABLE_MANUAL_QUEUE', False) and problem.contest_only:
-            # Queue contest submissions for manual processing
-            return JsonResponse({
-                'verdict': 'QUEUED',
-                'submission_id': submission.id,
-                'execution_time': 0,
-                'memory_used': 0,
-                'test_cases_passed': 0,
-                'total_test_cases': 0,
-                'error_message': None,
-                'add_to_pending': True
-            })
-        else:
-            # Direct evaluation for regular problems
-            try:
-                evaluator = CodeEvaluator(submission)
-                evaluator.evaluate()
-                
-                return JsonResponse({
-                    'verdict': submission.verdict,
-                    'submission_id': submission.id,
-                    'execution_time': float(submission.execution_time) if submission.execution_time else 0,
-                    'memory_used': submission.memory_used or 0,
-                    'test_cases_passed': submission.test_cases_passed or 0,
-                    'total_test_cases': submission.total_test_cases or 0,
-                    'error_message': submission.compilation_error or submission.runtime_error or None
-                })
-            except Exception as e:
-                submission.verdict = 'RE'
-                submission.runtime_error = str(e)[:500]
-                submission.save()
-                
-                return JsonResponse({
-                    'verdict': 'RE',
-                    'submission_id': submission.id,
-                    'execution_time': 0,
-                    'memory_used': 0,
-                    'test_cases_passed': 0,
-                    'total_test_cases': 0,
-                    'error_message': str(e)[:200]
-                })
+        return JsonResponse({
+            'verdict': 'QUEUED',
+            'submission_id': submission.id,
+            'execution_time': 0,
+            'memory_used': 0,
+            'test_cases_passed': 0,
+            'total_test_cases': 0,
+            'error_message': None,
+            'add_to_pending': True
+        })
         
     except json.JSONDecodeError:
         return JsonResponse({'error': 'Invalid JSON'}, status=400)
@@ -376,8 +332,14 @@ def recent_submissions(request):
 def process_queue_manual(request):
     """Fast manual queue processing"""
     if request.method == 'POST':
+        from judge.queue_manager import claim_submissions, judge_submission
+        
         limit = int(request.POST.get('limit', 5))
-        queued_submissions = Submission.get_queued_submissions(limit=limit)
+        # Claim atomically so a running judge daemon never picks the same rows
+        claimed_ids = claim_submissions(limit)
+        queued_submissions = Submission.objects.filter(
+            id__in=claimed_ids
+        ).select_related('problem', 'user').order_by('submitted_at')
         
         results = []
         processed = 0
@@ -386,13 +348,7 @@ def process_queue_manual(request):
         # Process submissions with minimal overhead
         for submission in queued_submissions:
             try:
-                # Set judging status immediately
-                submission.verdict = 'JUDGING'
-                submission.save(update_fields=['verdict'])
-                
-                from judge.evaluator import CodeEvaluator
-                evaluator = CodeEvaluator(submission)
-                evaluator.evaluate()
+                judge_submission(submission)
                 
                 success = submission.verdict in ['AC', 'WA', 'PE']
                 
@@ -479,7 +435,7 @@ def check_pending_submissions(request):
     recent_completed = Submission.objects.filter(
         user=request.user,
         judged_at__gte=timezone.now() - timezone.timedelta(seconds=60),
-        verdict__in=['AC', 'WA', 'CE', 'RE', 'TLE', 'MLE', 'PE'],
+        verdict__in=['AC', 'WA', 'CE', 'RE', 'TLE', 'MLE', 'OLE', 'PE'],
         is_test=False
     ).values('id', 'verdict', 'problem__title', 'judged_at')
     
@@ -513,23 +469,24 @@ def submission_status_api(request, submission_id):
 @login_required
 def problem_verdicts_api(request):
     """API endpoint to get best verdicts for all problems (prioritizing AC)"""
-    from django.db.models import Q
-    
-    # Get all user submissions
-    submissions = Submission.objects.filter(
-        user=request.user,
-        is_test=False
-    ).select_related('problem')
-    
-    verdicts = {}
-    for submission in submissions:
-        problem_id = str(submission.problem_id)
-        current_verdict = verdicts.get(problem_id)
-        
-        # If no verdict yet or current submission is AC, use it
-        if not current_verdict or submission.verdict == 'AC':
-            verdicts[problem_id] = submission.verdict
-        # If current verdict is not AC and this submission is not AC, keep the existing
-        # This ensures AC always takes priority
+    from django.http import HttpResponseNotModified
+    from django.utils.http import quote_etag
+    from .models import UserProblemStatus
+    from .problem_status import verdict_map_version
     
-    return JsonResponse(verdicts)
\ No newline at end of file
+    # Maintained by submissions.problem_status whenever a verdict is written
+    etag = quote_etag(verdict_map_version(request.user.id))
+    if etag in [tag.strip() for tag in request.headers.get('If-None-Match', '').split(',')]:
+        response = HttpResponseNotModified()
+    else:
+        verdicts = {
+            str(problem_id): verdict
+            for problem_id, verdict in UserProblemStatus.objects.filter(
+                user=request.user
+            ).values_list('problem_id', 'best_verdict')
+        }
+        response = JsonResponse(verdicts)
+    response['ETag'] = etag
+    # Revalidate every time; an unchanged map costs one aggregate query and no body
+    response['Cache-Control'] = 'private, no-cache'
+    return response
\ No newline at end of file